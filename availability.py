@@ -0,0 +1,279 @@
+import argparse
+import csv
+import json
+import os
+from datetime import datetime
+import pandas as pd
+from quotas import QuotaTracker
+
+IN_HOUSE = (2, 3)
+CALENDAR_FILE = "availability_calendar.csv"  # name,start,end (inclusive YYYY-MM-DD dates)
+CONFIG_FILE = "cleanup_config.json"
+EXCEL_FILE = "actives.xlsx"
+
+
+# ---------------------------
+# Availability changes as events
+# ---------------------------
+# An availability change only touches the changed members: their roster row and
+# one QuotaTracker step each for in-house members. It is journaled as
+#
+#   {"seq": 15, "event": "availability", "week": 6, "changes": {"Name": 0}, "quotas": {...}}
+#
+# where "week" is the next week to schedule and "quotas" the tracker state after
+# the change (per_week_actual, removed slots, remaining-week targets). Replaying
+# it sets checkpoint["quotas"], which build_people then reads instead of
+# counting the roster's unavailable in-house members.
+
+def unavailable_inhouse(df):
+    """Number of in-house (2 & 3) members marked unavailable."""
+    inhouse = pd.to_numeric(df["inhouse"], errors="coerce")
+    return int((inhouse.isin(IN_HOUSE) & (df["availability"].astype(int) == 0)).sum())
+
+
+def available_out_of_house(df):
+    """Available out-of-house (0 & 1) members in roster order, like build_people."""
+    inhouse = pd.to_numeric(df["inhouse"], errors="coerce")
+    return df.loc[~inhouse.isin(IN_HOUSE) & (df["availability"].astype(int) == 1), "name"].tolist()
+
+
+def quota_tracker(df, config, checkpoint=None):
+    """
+    QuotaTracker for the current availability: the journaled state when the
+    checkpoint has one, else counted from the roster.
+    """
+    checkpoint = checkpoint or {}
+    if "quotas" in checkpoint:
+        return QuotaTracker.from_state(config, checkpoint["quotas"])
+    weeks_left = max(config["num_weeks"] - checkpoint.get("current_week", 0), 0)
+    return QuotaTracker.from_config(config, unavailable_inhouse(df), weeks_left)
+
+
+def apply_availability(df, changes, quotas, index=None):
+    """
+    Set availability (name -> 0/1) in df and step `quotas` for every in-house
+    member whose value actually changed. Raises LookupError for unknown names.
+
+    Returns {name: new value} for the members that changed.
+    """
+    index = index if index is not None else {name: i for i, name in enumerate(df["name"])}
+    missing = [name for name in changes if name not in index]
+    if missing:
+        raise LookupError(f"Not found: {', '.join(missing)}")
+
+    changed = {}
+    for name, value in changes.items():
+        i = index[name]
+        value = 1 if int(value) else 0
+        if int(df.at[i, "availability"]) == value:
+            continue
+        df.at[i, "availability"] = value
+        changed[name] = value
+        if int(float(str(df.at[i, "inhouse"]))) in IN_HOUSE:
+            quotas.change(-1 if value else 1)
+    return changed
+
+
+def week_quotas(df, config, quotas, week):
+    """The per_week_actual `week` will use: its calendar row if there is one, else the tracker's."""
+    _, table_row = week_availability(df, config, week)
+    return table_row if table_row is not None else dict(quotas.per_week_actual)
+
+
+def availability_event(week, changed, quotas):
+    return {
+        "event": "availability",
+        "week": week,
+        "changes": changed,
+        "quotas": quotas.state(),
+    }
+
+
+def quota_preview(before, after, cleanup_types, remaining=None):
+    """
+    Lines describing how per-week quotas change from `before` to `after`, with
+    the tracker's slots left over the remaining weeks when `remaining` is given
+    as (before, after).
+    """
+    lines = []
+    for c in cleanup_types:
+        old, new = before.get(c, 0), after.get(c, 0)
+        if old != new and remaining:
+            lines.append(f"{c}: {old} → {new} per week ({remaining[0][c]} → {remaining[1][c]} slots left)")
+        elif old != new:
+            lines.append(f"{c}: {old} → {new} per week")
+    if not lines:
+        lines.append("per-week quotas unchanged")
+    return lines
+
+
+# ---------------------------
+# Availability calendar (date ranges per member)
+# ---------------------------
+# init.py turns availability_calendar.csv into two cleanup_config.json keys:
+#
+#   "away_by_week":   {"<week>": [names away that week]}   (weeks with absences only)
+#   "per_week_table": {"<week>": per_week_actual}           (every week)
+#
+# so schedule.py looks up its week instead of toggling availability by hand.
+# A member is away in a week when one of their ranges overlaps any day of it.
+
+def read_calendar(path, roster_names=None):
+    """
+    Calendar rows (name, start, end) with dates parsed. Raises ValueError
+    listing every invalid row (and unknown names when roster_names is given).
+    """
+    with open(path, "r", newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    entries = []
+    errors = []
+    for i, row in enumerate(rows, 1):
+        try:
+            name = str(row["name"]).strip()
+            start = datetime.strptime(str(row["start"]).strip(), "%Y-%m-%d").date()
+            end = datetime.strptime(str(row["end"]).strip(), "%Y-%m-%d").date()
+        except (KeyError, TypeError, ValueError):
+            errors.append(f"entry {i} needs name, start and end (YYYY-MM-DD): {row}")
+            continue
+        if end < start:
+            errors.append(f"entry {i}: {name} ends before it starts ({start} → {end})")
+        elif roster_names is not None and name not in roster_names:
+            errors.append(f"entry {i}: {name} not found in the roster")
+        else:
+            entries.append((name, start, end))
+
+    if errors:
+        raise ValueError(f"❌ {path} rejected:\n  " + "\n  ".join(errors))
+    return entries
+
+
+def write_calendar(entries, path=CALENDAR_FILE):
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "start", "end"])
+        for name, start, end in sorted(entries, key=lambda e: (e[1], e[0])):
+            writer.writerow([name, start.isoformat(), end.isoformat()])
+    os.replace(tmp_file, path)
+
+
+def away_by_week(entries, start_date, num_weeks, roster_names=None):
+    """{week: sorted names away} for the weeks with at least one absence."""
+    start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+    away = {}
+    for name, start, end in entries:
+        if roster_names is not None and name not in roster_names:
+            continue  # e.g. removed with remove_person.py
+        first = max((start - start_date).days // 7 + 1, 1)
+        last = min((end - start_date).days // 7 + 1, num_weeks)
+        for week in range(first, last + 1):
+            away.setdefault(week, set()).add(name)
+    return {week: sorted(names) for week, names in sorted(away.items())}
+
+
+def quota_table(df, config, away):
+    """
+    per_week_actual for every week with that week's in-house absences taken
+    out: one QuotaTracker stepped from week to week.
+    """
+    inhouse = set(df.loc[pd.to_numeric(df["inhouse"], errors="coerce").isin(IN_HOUSE), "name"])
+    quotas = QuotaTracker.from_config(config)
+    table = {}
+    for week in range(1, config["num_weeks"] + 1):
+        quotas.set_unavailable(len(inhouse.intersection(away.get(week, ()))))
+        if quotas.short:
+            print(f"⚠ Warning: week {week} cannot reduce per_week_actual further, below minimums!")
+        table[str(week)] = dict(quotas.per_week_actual)
+    return table
+
+
+def calendar_config(df, config, calendar_file=CALENDAR_FILE):
+    """
+    The "away_by_week" and "per_week_table" config keys for the calendar file
+    ({} without one). config needs "start_date" and "num_weeks".
+    """
+    if not os.path.exists(calendar_file):
+        return {}
+    away = away_by_week(read_calendar(calendar_file), config["start_date"], config["num_weeks"], set(df["name"]))
+    return {
+        "away_by_week": {str(week): names for week, names in away.items()},
+        "per_week_table": quota_table(df, config, away),
+    }
+
+
+def week_availability(df, config, week):
+    """
+    (names away in `week`, that week's per_week_actual) from the precomputed
+    table, or (set(), None) when the config has none. In-house members also
+    marked unavailable in the roster are taken out on top of the table row.
+    """
+    table = config.get("per_week_table")
+    if not table or str(week) not in table:
+        return set(), None
+
+    away = set(config.get("away_by_week", {}).get(str(week), ()))
+    inhouse = pd.to_numeric(df["inhouse"], errors="coerce").isin(IN_HOUSE)
+    is_away = df["name"].isin(away)
+    extra = int((inhouse & ~is_away & (df["availability"].astype(int) == 0)).sum())
+    if not extra:
+        return away, dict(table[str(week)])
+
+    quotas = QuotaTracker.from_config(config, int((inhouse & is_away).sum()) + extra)
+    return away, quotas.per_week_actual
+
+
+def lookahead_calendar(df, config, week, per_week_actual):
+    """
+    (per_week_actual, away) for the weeks after `week` that the rolling
+    horizon looks at ("lookahead_weeks"); weeks without a table row use
+    per_week_actual with nobody away.
+    """
+    last = min(week + config.get("lookahead_weeks", 0), config["num_weeks"])
+    calendar = []
+    for later in range(week + 1, last + 1):
+        away, table_row = week_availability(df, config, later)
+        calendar.append((per_week_actual if table_row is None else table_row, away))
+    return calendar
+
+
+# ---------------------------
+# Bulk import
+# ---------------------------
+def main():
+    parser = argparse.ArgumentParser(description=f"Availability calendar ({CALENDAR_FILE}).")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("import", help="import date ranges from a CSV (name,start,end) and rebuild the quota table")
+    p.add_argument("file")
+    p.add_argument("--append", action="store_true", help=f"add to the existing {CALENDAR_FILE} instead of replacing it")
+    args = parser.parse_args()
+
+    # schedule.py imports this module, so the roster helpers are imported here
+    from schedule import load_actives
+
+    df = load_actives(EXCEL_FILE)
+    entries = read_calendar(args.file, set(df["name"]))
+    if args.append and os.path.exists(CALENDAR_FILE):
+        entries = read_calendar(CALENDAR_FILE) + entries
+    write_calendar(entries)
+    print(f"✅ {len(entries)} date ranges saved to {CALENDAR_FILE}")
+
+    if not os.path.exists(CONFIG_FILE):
+        print("ℹ Run init.py to build the per-week quota table.")
+        return
+
+    with open(CONFIG_FILE, "r") as f:
+        config = json.load(f)
+    if "start_date" not in config:
+        print("ℹ cleanup_config.json has no start_date; run init.py to build the per-week quota table.")
+        return
+
+    config.update(calendar_config(df, config))
+    with open(CONFIG_FILE, "w") as f:
+        json.dump(config, f, indent=4)
+    print(f"✅ Per-week quota table updated in {CONFIG_FILE} "
+          f"({len(config['away_by_week'])} weeks with absences)")
+
+
+if __name__ == "__main__":
+    main()
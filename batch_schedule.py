@@ -0,0 +1,92 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from schedule import EXCEL_FILE, CONFIG_FILE, run_week
+
+REPORT_FILE = "batch_report.json"
+
+
+def find_chapters(root):
+    """
+    Per-chapter workspaces: direct subdirectories of `root` holding actives.xlsx
+    and cleanup_config.json.
+    """
+    chapters = []
+    for entry in sorted(os.scandir(root), key=lambda e: e.name):
+        if entry.is_dir() and all(
+            os.path.exists(os.path.join(entry.path, f)) for f in (EXCEL_FILE, CONFIG_FILE)
+        ):
+            chapters.append(entry.path)
+    return chapters
+
+
+def schedule_chapter(workdir):
+    """
+    Run schedule.py's week step for one chapter. Never raises: failures are
+    reported in the returned status dict so other chapters keep going.
+    """
+    log = io.StringIO()
+    status = {"chapter": os.path.basename(os.path.normpath(workdir)), "path": workdir}
+    start = time.perf_counter()
+
+    try:
+        with contextlib.redirect_stdout(log):
+            week, weekly_assignments, stats = run_week(workdir)
+        status.update({
+            "status": "ok",
+            "week": week,
+            "assigned": len(weekly_assignments),
+            "counters": dict(stats.counters) if stats is not None else None,
+        })
+    except Exception as e:
+        status.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+
+    status["seconds"] = round(time.perf_counter() - start, 3)
+    status["warnings"] = [line for line in log.getvalue().splitlines() if line.startswith(("⚠", "❌"))]
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Schedule the next week for every chapter workspace in a directory.")
+    parser.add_argument("root", help="directory containing one workspace directory per chapter")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--report", default=None, help=f"combined JSON report (default: <root>/{REPORT_FILE})")
+    args = parser.parse_args()
+
+    chapters = find_chapters(args.root)
+    if not chapters:
+        raise RuntimeError(f"❌ No chapter workspaces with {EXCEL_FILE} and {CONFIG_FILE} found in {args.root}")
+
+    print(f"▶ Scheduling {len(chapters)} chapters...")
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(schedule_chapter, chapters))
+
+    # ---------------------------
+    # Combined status report
+    # ---------------------------
+    print("\n📋 Batch status:")
+    for r in results:
+        if r["status"] == "ok":
+            print(f"✅ {r['chapter']:<24} week {r['week']:<3} {r['assigned']} assigned  ({r['seconds']}s)")
+        else:
+            print(f"❌ {r['chapter']:<24} {r['error']}")
+        for line in r["warnings"]:
+            print(f"   {line}")
+
+    failed = [r for r in results if r["status"] != "ok"]
+    report_file = args.report or os.path.join(args.root, REPORT_FILE)
+    with open(report_file, "w") as f:
+        json.dump({"chapters": results, "ok": len(results) - len(failed), "failed": len(failed)}, f, indent=4)
+
+    print(f"\n{'✅' if not failed else '⚠'} {len(results) - len(failed)}/{len(results)} chapters scheduled. Report saved to {report_file}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
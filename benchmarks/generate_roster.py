@@ -0,0 +1,87 @@
+import argparse
+import json
+import os
+import random
+import sys
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from quotas import (
+    CLEANUP_TYPES,
+    MIN_PER_WEEK,
+    compute_per_week_actual,
+    compute_global_base,
+    compute_base_by_inhouse,
+)
+
+DEFAULT_MIX = (0.1, 0.15, 0.35, 0.4)  # share of inhouse 0, 1, 2, 3
+DEFAULT_WEEKS = 17
+
+
+def generate_roster(size, inhouse_mix=DEFAULT_MIX, availability_rate=1.0, seed=0):
+    """
+    Synthetic actives.xlsx-shaped roster: name, inhouse (0-3), availability (0/1)
+    and zeroed cleanup count columns.
+    """
+    rng = random.Random(seed)
+    inhouse = rng.choices([0, 1, 2, 3], weights=inhouse_mix, k=size)
+    df = pd.DataFrame({
+        "name": [f"Member {i:06d}" for i in range(size)],
+        "inhouse": inhouse,
+        "availability": [1 if rng.random() < availability_rate else 0 for _ in range(size)],
+    })
+    for c in CLEANUP_TYPES:
+        df[c] = 0
+    return df
+
+
+def build_config(df, num_weeks=DEFAULT_WEEKS):
+    """
+    cleanup_config.json contents for a roster, computed the same way as init.py.
+    """
+    inhouse_count = int(df["inhouse"].isin([2, 3]).sum())
+    per_week_actual = compute_per_week_actual(MIN_PER_WEEK, inhouse_count)
+    global_base = compute_global_base(per_week_actual, num_weeks, inhouse_count)
+    return {
+        "num_people": len(df),
+        "num_weeks": num_weeks,
+        "cleanup_types": CLEANUP_TYPES.copy(),
+        "min_per_week": MIN_PER_WEEK.copy(),
+        "per_week_actual": per_week_actual,
+        "global_base": global_base,
+        "base_by_inhouse": {str(k): v for k, v in compute_base_by_inhouse(global_base).items()},
+    }
+
+
+def write_workspace(path, size, inhouse_mix=DEFAULT_MIX, availability_rate=1.0, seed=0, num_weeks=DEFAULT_WEEKS):
+    """
+    Create a ready-to-schedule workspace (actives.xlsx + cleanup_config.json).
+    """
+    os.makedirs(path, exist_ok=True)
+    df = generate_roster(size, inhouse_mix, availability_rate, seed)
+    df.to_excel(os.path.join(path, "actives.xlsx"), index=False)
+    with open(os.path.join(path, "cleanup_config.json"), "w") as f:
+        json.dump(build_config(df, num_weeks), f, indent=4)
+    return df
+
+
+def parse_mix(text):
+    mix = tuple(float(x) for x in text.split(","))
+    if len(mix) != 4:
+        raise argparse.ArgumentTypeError("mix needs 4 comma-separated weights (inhouse 0,1,2,3)")
+    return mix
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic cleanup workspace.")
+    parser.add_argument("path", help="workspace directory to create")
+    parser.add_argument("--size", type=int, default=50)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="weights for inhouse 0,1,2,3")
+    parser.add_argument("--availability", type=float, default=1.0, help="share of available members")
+    parser.add_argument("--weeks", type=int, default=DEFAULT_WEEKS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    write_workspace(args.path, args.size, args.mix, args.availability, args.seed, args.weeks)
+    print(f"✅ Workspace with {args.size} members written to {args.path}")
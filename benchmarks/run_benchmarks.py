@@ -0,0 +1,223 @@
+import argparse
+import contextlib
+import copy
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from generate_roster import DEFAULT_MIX, DEFAULT_WEEKS, parse_mix, write_workspace
+from cleanup import ENGINES, schedule_one_week_final, week_rng
+from quotas import MIN_PER_WEEK, compute_per_week_actual, compute_global_base, compute_base_by_inhouse
+from journal import save_checkpoint
+from schedule import build_people, save_weekly_excel
+from semester import load_inputs, simulate_semester
+from state import SchedulerState
+
+SCRIPTS = ["summary.py", "rebuild.py", "rollback.py"]
+
+
+def best_of(repeat, fn, setup=None):
+    """
+    Minimum wall time over `repeat` runs; setup() output is passed to fn and not timed.
+    """
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        fn(arg) if setup else fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench_init_quotas(df, config):
+    inhouse_count = int(df["inhouse"].isin([2, 3]).sum())
+    per_week_actual = compute_per_week_actual(MIN_PER_WEEK, inhouse_count)
+    global_base = compute_global_base(per_week_actual, config["num_weeks"], inhouse_count)
+    compute_base_by_inhouse(global_base)
+
+
+def bench_schedule_week(inputs, engine):
+    df, config, checkpoint = inputs
+    _, out_house_people, per_week_actual = build_people(df, config)
+    state = SchedulerState.from_checkpoint(checkpoint, df, config)
+    schedule_one_week_final(
+        checkpoint["current_week"] + 1,
+        df,
+        config["cleanup_types"],
+        per_week_actual,
+        state.base_by_person,
+        state.assigned_so_far,
+        state.last_cleanup,
+        config["num_weeks"],
+        out_house_people,
+        state.round_robin_index,
+        engine=engine,
+        rng=week_rng(0, 1)
+    )
+
+
+def run_script(script, workdir):
+    result = subprocess.run(
+        [sys.executable, os.path.join(REPO_DIR, script)],
+        cwd=workdir,
+        capture_output=True,
+        text=True,
+        stdin=subprocess.DEVNULL
+    )
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"exit code {result.returncode}")
+
+
+def bench_size(size, engines, repeat, mix, availability, weeks, scratch):
+    """
+    Returns a list of result dicts for one roster size.
+    """
+    results = []
+    workdir = os.path.join(scratch, f"roster_{size}")
+    write_workspace(workdir, size, mix, availability, seed=size, num_weeks=weeks)
+    df, config, checkpoint = load_inputs(workdir)
+
+    def record(name, fn, setup=None, engine=None, reps=repeat):
+        entry = {"name": name, "size": size, "engine": engine}
+        try:
+            # Scheduler progress prints are silenced so they do not flood the report
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                seconds = best_of(reps, fn, setup)
+            entry["seconds"] = round(seconds, 6)
+            entry["status"] = "ok"
+        except Exception as e:
+            entry["seconds"] = None
+            entry["status"] = f"error: {e}"
+        results.append(entry)
+        print(f"  {name:<16} {engine or '':<8} {entry['seconds'] if entry['seconds'] is not None else entry['status']}")
+
+    def fresh():
+        return df.copy(), config, copy.deepcopy(checkpoint)
+
+    record("init_quotas", lambda: bench_init_quotas(df, config))
+
+    for engine in engines:
+        record("schedule_week", lambda inputs: bench_schedule_week(inputs, engine), fresh, engine)
+        record(
+            "semester",
+            lambda inputs: simulate_semester(*inputs, engine=engine, seed=0),
+            fresh,
+            engine,
+            reps=1
+        )
+
+    # ---------------------------
+    # Script-level benchmarks on a scheduled semester (includes interpreter startup)
+    # ---------------------------
+    sem_df, sem_config, sem_checkpoint = fresh()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        simulate_semester(sem_df, sem_config, sem_checkpoint, engine=engines[0], seed=0)
+    save_checkpoint(sem_checkpoint, os.path.join(workdir, "checkpoint.json"))
+    sem_df.to_excel(os.path.join(workdir, "actives.xlsx"), index=False)
+    try:
+        save_weekly_excel(sem_checkpoint, os.path.join(workdir, "weekly_assignments.xlsx"))
+    except ValueError as e:
+        print(f"  ⚠ weekly_assignments.xlsx not written: {e}")
+
+    def copy_workspace():
+        target = os.path.join(scratch, f"run_{size}")
+        shutil.rmtree(target, ignore_errors=True)
+        shutil.copytree(workdir, target)
+        return target
+
+    for script in SCRIPTS:
+        record(script.replace(".py", ""), lambda target: run_script(script, target), copy_workspace)
+
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline):
+    """
+    Print new vs baseline seconds for every benchmark present in both reports.
+    """
+    key = lambda r: (r["name"], r["size"], r["engine"])
+    old = {key(r): r for r in baseline["results"]}
+
+    print(f"\n📊 Compared with {baseline.get('commit')} ({baseline.get('timestamp')}):")
+    for r in report["results"]:
+        o = old.get(key(r))
+        if not o or o["seconds"] is None or r["seconds"] is None:
+            continue
+        ratio = r["seconds"] / o["seconds"] if o["seconds"] else float("inf")
+        flag = "  ⚠ slower" if ratio > 1.1 else ""
+        print(f"  {r['name']:<16} {r['size']:>7} {r['engine'] or '':<8} "
+              f"{o['seconds']:>10.4f}s → {r['seconds']:>10.4f}s  x{ratio:.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cleanup scheduler on synthetic rosters.")
+    parser.add_argument("--sizes", default="50,500,5000", help="comma-separated roster sizes (50 to 100000)")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="comma-separated scheduling engines")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="weights for inhouse 0,1,2,3")
+    parser.add_argument("--availability", type=float, default=1.0, help="share of available members")
+    parser.add_argument("--weeks", type=int, default=DEFAULT_WEEKS)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark (best time is kept)")
+    parser.add_argument("--output", default="benchmark_report.json", help="machine-readable report path")
+    parser.add_argument("--compare", default=None, help="previous report to compare against")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    engines = args.engines.split(",")
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "mix": list(args.mix),
+            "availability": args.availability,
+            "weeks": args.weeks,
+            "repeat": args.repeat,
+        },
+        "results": [],
+    }
+
+    scratch = tempfile.mkdtemp(prefix="cleanup_bench_")
+    try:
+        for size in sizes:
+            print(f"\n⏱  Roster size {size}")
+            report["results"].extend(
+                bench_size(size, engines, args.repeat, args.mix, args.availability, args.weeks, scratch)
+            )
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"\n✅ Benchmark report saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
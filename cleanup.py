@@ -1,6 +1,526 @@
+import json
 import random
+import time
 from collections import defaultdict
+import numpy as np
 import pandas as pd
+from roster import apply_count_deltas
+
+
+def week_rng(seed, week):
+    """
+    Random generator for one week of a seeded run. Derived from (seed, week)
+    so a semester gives the same result week-by-week or in one process.
+    """
+    return random.Random(f"{seed}:{week}")
+
+
+class ScheduleStats:
+    """
+    Optional instrumentation for schedule_one_week_final: wall time per phase
+    (seconds) and counters for retries, swaps, last-resort assignments and
+    forced back-to-backs.
+    """
+
+    def __init__(self):
+        self.week = None
+        self.engine = None
+        self.phase_seconds = defaultdict(float)
+        self.counters = defaultdict(int)
+        self._mark = time.perf_counter()
+
+    def mark(self):
+        """Start timing a new phase."""
+        self._mark = time.perf_counter()
+
+    def lap(self, phase):
+        """Add the time since the last mark/lap to `phase`."""
+        now = time.perf_counter()
+        self.phase_seconds[phase] += now - self._mark
+        self._mark = now
+
+    def count(self, counter, n=1):
+        self.counters[counter] += n
+
+    def to_dict(self):
+        return {
+            "week": self.week,
+            "engine": self.engine,
+            "phase_seconds": {k: round(v, 6) for k, v in self.phase_seconds.items()},
+            "counters": dict(self.counters),
+        }
+
+    def append_jsonl(self, path):
+        """Append this week's stats as one JSON line (e.g. next to checkpoint.json)."""
+        with open(path, "a") as f:
+            f.write(json.dumps(self.to_dict()) + "\n")
+
+
+def _assign_in_house_python(
+    in_house_people,
+    cleanup_types,
+    per_week_actual,
+    base_by_person,
+    assigned_so_far,
+    last_cleanup,
+    rng,
+    stats
+):
+    """
+    Greedy in-house assignment, one cleanup at a time (most constrained first).
+
+    Returns a dict person -> cleanup for the selected in-house people.
+    """
+    selected_people = {}
+    person_deficit = {}
+    person_remaining = {}
+    person_last = {}
+
+    # Read each person's state once; the loops below only touch these locals
+    for person in in_house_people:
+        person_base = base_by_person.get(person, {})
+        person_counts = assigned_so_far[person]
+        person_deficit[person] = {}
+        person_last[person] = last_cleanup.get(person)
+        remaining = 0
+
+        for c in person_base:
+            max_allowed = person_base[c]
+            deficit = max_allowed - person_counts.get(c, 0)
+            person_deficit[person][c] = deficit
+            if deficit >= 0:  # i.e. assigned < base + 1
+                remaining += 1
+
+        person_remaining[person] = remaining
+
+    eligible_counts = {c: sum(1 for p in in_house_people if c in person_deficit[p]) for c in cleanup_types}
+    sorted_cleanup_types = sorted(cleanup_types, key=lambda c: eligible_counts[c])
+    stats.lap("in_house_setup")
+
+    for cleanup in sorted_cleanup_types:
+        slots = per_week_actual[cleanup]
+        candidates = []
+
+        for person in in_house_people:
+            if person in selected_people:
+                continue
+            if cleanup not in person_deficit[person]:
+                continue
+            if person_deficit[person][cleanup] < 0:  # already at base + 1
+                continue
+
+            total_person_deficit = sum(person_deficit[person].values())
+
+            # Penalize back-to-back assignments heavily in the initial candidate sort
+            is_b2b = 1 if person_last[person] == cleanup else 0
+
+            candidates.append(
+                (
+                    -is_b2b,                            # primary: strongly avoid back-to-back
+                    person_deficit[person][cleanup],    # secondary: deficit for THIS cleanup
+                    total_person_deficit,               # tertiary: total remaining deficit
+                    -person_remaining[person],          # quaternary: fewer types left to do
+                    rng.random(),                       # tie-breaker
+                    person
+                )
+            )
+
+        candidates.sort(reverse=True)
+        selected = [p for *_, p in candidates[:slots]]
+
+        for person in selected:
+            selected_people[person] = cleanup
+
+    stats.lap("in_house_scoring")
+    return selected_people
+
+
+def _in_house_arrays(people, cleanup_types, base_by_person, assigned_so_far, last_cleanup):
+    """
+    Build person x cleanup arrays (base, assigned, eligible) and the
+    last-cleanup index per person (-1 if none) for the given people.
+
+    When the inputs are views of one SchedulerState (state.py), the arrays
+    are sliced from it directly instead of being rebuilt from dicts.
+    """
+    state = getattr(assigned_so_far, "state", None)
+    if (
+        state is not None
+        and getattr(base_by_person, "state", None) is state
+        and getattr(last_cleanup, "state", None) is state
+        and state.cleanup_types[:len(cleanup_types)] == list(cleanup_types)
+    ):
+        ids = state.ids(people)
+        m = len(cleanup_types)
+        last = state.last[ids].astype(np.int64)
+        return (
+            state.base_rows(ids)[:, :m].astype(np.int64),
+            state.counts[ids, :m].astype(np.int64),
+            state.eligible_rows(ids)[:, :m],
+            np.where(last < m, last, -1),
+        )
+
+    col = {c: j for j, c in enumerate(cleanup_types)}
+    n, m = len(people), len(cleanup_types)
+
+    base = np.zeros((n, m), dtype=np.int64)
+    assigned = np.zeros((n, m), dtype=np.int64)
+    eligible = np.zeros((n, m), dtype=bool)
+    last = np.full(n, -1, dtype=np.int64)
+
+    for i, person in enumerate(people):
+        for c, b in base_by_person[person].items():
+            j = col.get(c)
+            if j is not None:
+                base[i, j] = b
+                eligible[i, j] = True
+        for c, k in assigned_so_far[person].items():
+            j = col.get(c)
+            if j is not None:
+                assigned[i, j] = k
+        last[i] = col.get(last_cleanup.get(person), -1)
+
+    return base, assigned, eligible, last
+
+
+def _assign_in_house_numpy(
+    in_house_people,
+    cleanup_types,
+    per_week_actual,
+    base_by_person,
+    assigned_so_far,
+    last_cleanup,
+    rng,
+    stats
+):
+    """
+    Vectorized in-house assignment.
+
+    Keeps deficits, caps and eligibility as person x cleanup integer arrays and
+    ranks every candidate of a cleanup with one lexsort. Applies the same rules
+    as the pure-Python loop: base +1 caps, back-to-back avoidance and
+    most-constrained cleanups first.
+
+    Returns a dict person -> cleanup for the selected in-house people.
+    """
+    people = list(in_house_people)
+    if not people:
+        return {}
+
+    n, m = len(people), len(cleanup_types)
+    base, assigned, eligible, last = _in_house_arrays(
+        people, cleanup_types, base_by_person, assigned_so_far, last_cleanup
+    )
+
+    deficit = np.where(eligible, base - assigned, 0)
+    under_cap = eligible & (assigned < base + 1)
+    total_deficit = deficit.sum(axis=1)
+    remaining = under_cap.sum(axis=1)
+    tie_breaker = np.random.default_rng(rng.getrandbits(64)).random((n, m))
+
+    # Most-constrained first (stable, like sorted() on eligible counts)
+    order = np.argsort(eligible.sum(axis=0), kind="stable")
+    stats.lap("in_house_setup")
+
+    available = np.ones(n, dtype=bool)
+    selected = {}
+
+    for j in order:
+        slots = per_week_actual[cleanup_types[j]]
+        cand = np.flatnonzero(available & under_cap[:, j])
+        if slots <= 0 or cand.size == 0:
+            continue
+
+        # np.lexsort sorts by the LAST key first; all keys ascending
+        ranking = np.lexsort((
+            -tie_breaker[cand, j],          # tie-breaker
+            remaining[cand],                # fewer types left to do
+            -total_deficit[cand],           # total remaining deficit
+            -deficit[cand, j],              # deficit for THIS cleanup
+            (last[cand] == j),              # strongly avoid back-to-back
+        ))
+        chosen = cand[ranking[:slots]]
+        available[chosen] = False
+
+        for i in chosen:
+            selected[people[i]] = cleanup_types[j]
+
+    stats.lap("in_house_scoring")
+    return selected
+
+
+def _assign_in_house_flow(
+    in_house_people,
+    cleanup_types,
+    per_week_actual,
+    base_by_person,
+    assigned_so_far,
+    last_cleanup,
+    rng,
+    stats
+):
+    """
+    Optimal in-house assignment as a min-cost flow.
+
+    source -> person (1 unit) -> cleanup (only if eligible and under the
+    base +1 cap) -> sink (per_week_actual slots). Cost of person -> cleanup
+    rewards the deficit for that cleanup (then the person's total deficit)
+    and adds a penalty larger than any deficit gain for back-to-backs.
+
+    Solved by _min_cost_assignment: successive shortest paths over the
+    handful of cleanup nodes, pushing whole groups of identical people per
+    path. Deterministic: no shuffling or random ties.
+
+    Returns a dict person -> cleanup for the selected in-house people.
+    """
+    people = sorted(in_house_people)
+    if not people:
+        return {}
+
+    m = len(cleanup_types)
+    base, assigned, eligible, last = _in_house_arrays(
+        people, cleanup_types, base_by_person, assigned_so_far, last_cleanup
+    )
+
+    deficit = np.where(eligible, base - assigned, 0)
+    allowed = eligible & (assigned < base + 1)
+    total_deficit = deficit.sum(axis=1)
+
+    # Lexicographic weights: cleanup deficit > total deficit, b2b > everything
+    gain = (2 * np.abs(total_deficit).max() + 1) * deficit + total_deficit[:, None]
+    b2b_penalty = 2 * np.abs(gain).max() + 1
+    is_b2b = last[:, None] == np.arange(m)
+    cost = np.where(is_b2b, b2b_penalty, 0) - gain
+    cost = np.where(allowed, cost, np.inf)
+
+    capacity = np.array([max(per_week_actual[c], 0) for c in cleanup_types])
+    stats.lap("in_house_setup")
+
+    slot_of = _min_cost_assignment(cost, capacity)
+
+    stats.lap("in_house_scoring")
+    return {people[i]: cleanup_types[j] for i, j in enumerate(slot_of) if j != -1}
+
+
+def _min_cost_assignment(cost, capacity):
+    """
+    Give each row (person) at most one column (cleanup), column k at most
+    capacity[k] rows, filling as many slots as possible at the least total
+    cost (np.inf = not allowed). Returns the column per row, -1 if none.
+
+    Successive shortest paths over the column nodes: moving a row already
+    placed in j to k is the j -> k edge. Rows with identical cost rows are
+    interchangeable, so they are grouped and each path carries as many rows
+    as its bottleneck allows (free rows of the class, rows of a class in j, free
+    slots at the end) instead of one. Ties go to the first row, so the result
+    is deterministic.
+    """
+    n, m = cost.shape
+    slot_of = np.full(n, -1, dtype=np.int64)
+    if n == 0 or m == 0:
+        return slot_of
+
+    classes, class_of = np.unique(cost, axis=0, return_inverse=True)
+    class_of = class_of.reshape(-1)
+    free = np.bincount(class_of, minlength=len(classes))
+    flow = np.zeros(classes.shape, dtype=np.int64)
+    load = np.zeros(m, dtype=np.int64)
+    cols = np.arange(m)
+    allowed = np.isfinite(classes)
+    safe = np.where(allowed, classes, 0)
+
+    while (load < capacity).any():
+        has_free = free > 0
+        if not has_free.any():
+            break
+
+        # source -> cleanup through the cheapest class with free rows
+        direct = np.where(has_free[:, None], classes, np.inf)
+        dist = direct.min(axis=0)
+        mover = direct.argmin(axis=0)
+        pred = np.full(m, -1, dtype=np.int64)
+
+        # j -> k by moving a row of the cheapest class currently placed in j
+        placed = flow > 0
+        delta = np.where(
+            placed[:, :, None] & allowed[:, None, :],
+            safe[:, None, :] - safe[:, :, None],
+            np.inf
+        )
+        delta[:, cols, cols] = np.inf
+        move_cost = delta.min(axis=0)
+        move_who = delta.argmin(axis=0)
+
+        # Bellman-Ford over the cleanup nodes (edges may be negative)
+        for _ in range(m):
+            through = dist[:, None] + move_cost
+            best_from = through.argmin(axis=0)
+            best = through[best_from, cols]
+            better = best < dist
+            if not better.any():
+                break
+            dist = np.where(better, best, dist)
+            pred = np.where(better, best_from, pred)
+            mover = np.where(better, move_who[best_from, cols], mover)
+
+        reachable = (load < capacity) & np.isfinite(dist)
+        if not reachable.any():
+            break
+
+        # Cheapest path to an open cleanup, pushed by its bottleneck
+        end = int(np.flatnonzero(reachable)[dist[reachable].argmin()])
+        path = []
+        node = end
+        for _ in range(m):
+            path.append((int(mover[node]), int(pred[node]), node))
+            if pred[node] == -1:
+                break
+            node = int(pred[node])
+        else:
+            raise RuntimeError("shortest path does not start at the source")
+
+        units = int(capacity[end] - load[end])
+        for c, j, k in path:
+            units = min(units, int(free[c]) if j == -1 else int(flow[c, j]))
+        for c, j, k in path:
+            if j == -1:
+                free[c] -= units
+            else:
+                flow[c, j] -= units
+            flow[c, k] += units
+        load[end] += units
+
+    # Hand each class's slots to its rows in order
+    for c in np.flatnonzero(flow.sum(axis=1)):
+        rows = np.flatnonzero(class_of == c)
+        slot_of[rows[:flow[c].sum()]] = np.repeat(cols, flow[c])
+    return slot_of
+
+
+def _under_cap(person, cleanup, base_by_person, assigned_so_far):
+    """In-house rule: eligible for `cleanup` and still below its base +1 cap."""
+    person_base = base_by_person.get(person, {})
+    return cleanup in person_base and assigned_so_far.get(person, {}).get(cleanup, 0) < person_base[cleanup] + 1
+
+
+def _repair_back_to_back(
+    week,
+    week_assignment,
+    cleanup_slots_assigned,
+    cleanup_types,
+    base_by_person,
+    assigned_so_far,
+    last_cleanup,
+    in_house_set
+):
+    """
+    Fix back-to-back assignments by swapping the conflicting people with
+    people in other slots of the same week. A swap is only made if both
+    people can take their new cleanup (eligibility and base +1 caps for
+    in-house, round-robin rules for out-of-house) and neither ends up
+    back-to-back. Slot counts per cleanup are unchanged.
+
+    Returns the number of swaps made.
+    """
+    def can_take(person, cleanup):
+        if last_cleanup.get(person) == cleanup:
+            return False
+        person_base = base_by_person.get(person, {})
+        if person in in_house_set:
+            return _under_cap(person, cleanup, base_by_person, assigned_so_far)
+        allowed = person_base if person_base else cleanup_types
+        return cleanup in allowed and cleanup != "deck_brush"
+
+    swaps = 0
+    conflicts = [p for p, c in week_assignment.items() if last_cleanup.get(p) == c]
+
+    for person in conflicts:
+        current = week_assignment[person]
+        if last_cleanup.get(person) != current:
+            continue  # already fixed by an earlier swap
+
+        partner = None
+        for other_cleanup in cleanup_types:
+            if other_cleanup == current or not can_take(person, other_cleanup):
+                continue
+            partner = next(
+                (q for q in cleanup_slots_assigned[other_cleanup] if can_take(q, current)),
+                None
+            )
+            if partner is not None:
+                break
+
+        if partner is None:
+            continue
+
+        cleanup_slots_assigned[current].remove(person)
+        cleanup_slots_assigned[other_cleanup].remove(partner)
+        cleanup_slots_assigned[other_cleanup].append(person)
+        cleanup_slots_assigned[current].append(partner)
+        week_assignment[person] = other_cleanup
+        week_assignment[partner] = current
+        swaps += 1
+        print(f"🔧 Week {week}: swapped {person} ({current} → {other_cleanup}) with {partner} to avoid back-to-back")
+
+    return swaps
+
+
+def _follow_plan(
+    plan,
+    assign_in_house,
+    in_house_people,
+    cleanup_types,
+    per_week_actual,
+    base_by_person,
+    assigned_so_far,
+    last_cleanup,
+    rng,
+    stats
+):
+    """
+    In-house assignment from a precomputed plan (planner.py). Planned pairs are
+    kept while the person is available, the cleanup has a free slot, it is not
+    a back-to-back and the person can still take it (eligibility and base +1
+    cap against the current counts, which a stale plan may not match after a
+    reassignment or rollback). Anyone left over is placed by the regular engine
+    on the remaining slots.
+    """
+    in_house_set = set(in_house_people)
+    free_slots = {c: max(per_week_actual.get(c, 0), 0) for c in cleanup_types}
+    selected = {}
+    for person, cleanup in plan.items():
+        if (
+            person in in_house_set
+            and free_slots.get(cleanup, 0) > 0
+            and last_cleanup.get(person) != cleanup
+            and _under_cap(person, cleanup, base_by_person, assigned_so_far)
+        ):
+            selected[person] = cleanup
+            free_slots[cleanup] -= 1
+    stats.count("planned_assignments", len(selected))
+    stats.count("rejected_planned_assignments", sum(1 for p in plan if p in in_house_set) - len(selected))
+
+    leftover = [p for p in in_house_people if p not in selected]
+    if leftover and any(free_slots.values()):
+        selected.update(assign_in_house(
+            leftover,
+            cleanup_types,
+            free_slots,
+            base_by_person,
+            assigned_so_far,
+            last_cleanup,
+            rng,
+            stats
+        ))
+    return selected
+
+
+ENGINES = {
+    "python": _assign_in_house_python,
+    "numpy": _assign_in_house_numpy,
+    "flow": _assign_in_house_flow,
+}
+
 
 def schedule_one_week_final(
     week,
@@ -12,30 +532,93 @@ def schedule_one_week_final(
     last_cleanup,
     num_weeks,
     out_house_people,
-    round_robin_index
+    round_robin_index,
+    engine="python",
+    rng=None,
+    stats=None,
+    plan=None,
+    lookahead=0,
+    away=None,
+    calendar=None
 ):
     """
     Assign one week's cleanups to all people.
 
     - In-house people (2 & 3) respect base +1 caps and coverage milestone.
     - Out-of-house people (0 & 1) are assigned using TRUE round-robin over their allowed cleanups.
+    - engine="numpy" scores and ranks in-house candidates with array operations
+      instead of the per-candidate Python loop (same rules, faster for big rosters).
+    - engine="flow" solves the in-house week as a min-cost flow: one
+      deterministic, optimal pass with no shuffling and no retries.
+    - rng: optional random.Random used for shuffling and tie-breaking
+      (defaults to the global random module; see week_rng for seeded runs).
+    - stats: optional ScheduleStats filled with per-phase wall time and counters.
+    - plan: optional planned in-house assignments for this week (planner.py);
+      the engine only places the people and slots the plan does not cover.
+    - lookahead: rolling horizon in weeks (config "lookahead_weeks"). Without a
+      plan, this week is chosen from a tentative plan of this week and the next
+      `lookahead` weeks (planner.lookahead_week), so it does not use up caps or
+      force back-to-backs later; only this week is committed.
+    - away: names unavailable this week on top of the roster's availability
+      column (the availability calendar, see availability.py).
+    - calendar: (per_week_actual, away) for each week after this one, used by
+      the lookahead (availability.lookahead_calendar); later weeks default to
+      this week's quotas with nobody away.
     - Returns (week_assignment, updated_round_robin_index)
     """
 
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Expected one of {list(ENGINES)}")
+    assign_in_house = ENGINES[engine]
+    rng = rng if rng is not None else random
+    stats = stats if stats is not None else ScheduleStats()
+    stats.week = week
+    stats.engine = engine
+    for counter in ("retries", "swaps", "last_resort_assignments", "forced_back_to_backs"):
+        stats.count(counter, 0)
+
     if "availability" not in df.columns:
         df["availability"] = 1
     names = df[df["availability"] == 1]["name"].tolist()
-    random.shuffle(names)
+    on_roster = names
+    if away:
+        names = [p for p in names if p not in away]
+    if engine != "flow":
+        rng.shuffle(names)
+
+    out_house_people = [p for p in out_house_people if not away or p not in away]
+    out_house_set = set(out_house_people)
+    in_house_set = {p for p in names if p not in out_house_set}
+
+    # Rolling horizon: a tentative plan for this week, followed like a semester plan
+    horizon = min(lookahead, num_weeks - week)
+    if not plan and horizon > 0:
+        from planner import lookahead_week  # planner.py imports this module
 
-    out_house_people = list(out_house_people)
-    in_house_people = set(names) - set(out_house_people)
+        # Members away only this week still count for the later weeks
+        later = list(calendar or [])[:horizon]
+        later += [(per_week_actual, ())] * (horizon - len(later))
+        stats.mark()
+        plan = lookahead_week(
+            [p for p in on_roster if p not in out_house_set],
+            cleanup_types,
+            [(per_week_actual, away or ())] + later,
+            base_by_person,
+            assigned_so_far,
+            last_cleanup,
+            horizon,
+            stats
+        )
+        stats.lap("lookahead")
 
-    MAX_RETRIES = 5
+    # The flow solver is already optimal, so retrying cannot improve it
+    MAX_RETRIES = 1 if engine == "flow" else 5
     for attempt in range(MAX_RETRIES):
+        # Ordered list (not a set) so a seeded rng gives reproducible results;
+        # rebuilt from the reshuffled names on every retry
+        in_house_people = [p for p in names if p in in_house_set]
         week_assignment = {}
         used_people = set()
-        person_deficit = {}
-        person_remaining = {}
         
         # We need a temporary round robin index in case we need to retry
         temp_round_robin_index = round_robin_index
@@ -43,64 +626,42 @@ def schedule_one_week_final(
         # -------------------------------------------------
         # Assign IN-HOUSE people first (2 & 3)
         # -------------------------------------------------
-        for person in in_house_people:
-            person_base = base_by_person.get(person, {})
-            person_deficit[person] = {}
-            remaining = 0
-    
-            for c in person_base:
-                max_allowed = person_base[c]
-                deficit = max_allowed - assigned_so_far[person].get(c, 0)
-                person_deficit[person][c] = deficit
-                if assigned_so_far[person].get(c, 0) < max_allowed + 1:
-                    remaining += 1
-    
-            person_remaining[person] = remaining
-    
-        eligible_counts = {c: sum(1 for p in in_house_people if c in base_by_person[p]) for c in cleanup_types}
-        sorted_cleanup_types = sorted(cleanup_types, key=lambda c: eligible_counts[c])
-    
         cleanup_slots_assigned = {c: [] for c in cleanup_types}
-    
-        for cleanup in sorted_cleanup_types:
-            slots = per_week_actual[cleanup]
-            candidates = []
-    
-            for person in in_house_people:
-                if person in used_people:
-                    continue
-                if cleanup not in base_by_person[person]:
-                    continue
-                if assigned_so_far[person].get(cleanup, 0) >= base_by_person[person][cleanup] + 1:
-                    continue
-    
-                total_person_deficit = sum(person_deficit[person].values())
-                
-                # Penalize back-to-back assignments heavily in the initial candidate sort
-                is_b2b = 1 if last_cleanup.get(person) == cleanup else 0
-    
-                candidates.append(
-                    (
-                        -is_b2b,                            # primary: strongly avoid back-to-back
-                        person_deficit[person][cleanup],    # secondary: deficit for THIS cleanup
-                        total_person_deficit,               # tertiary: total remaining deficit
-                        -person_remaining[person],          # quaternary: fewer types left to do
-                        random.random(),                    # tie-breaker
-                        person
-                    )
-                )
-    
-            candidates.sort(reverse=True)
-            selected = [p for *_, p in candidates[:slots]]
-    
-            for person in selected:
-                week_assignment[person] = cleanup
-                used_people.add(person)
-                cleanup_slots_assigned[cleanup].append(person)
+
+        stats.mark()
+        if plan and attempt == 0:
+            selected = _follow_plan(
+                plan,
+                assign_in_house,
+                in_house_people,
+                cleanup_types,
+                per_week_actual,
+                base_by_person,
+                assigned_so_far,
+                last_cleanup,
+                rng,
+                stats
+            )
+        else:
+            selected = assign_in_house(
+                in_house_people,
+                cleanup_types,
+                per_week_actual,
+                base_by_person,
+                assigned_so_far,
+                last_cleanup,
+                rng,
+                stats
+            )
+        for person, cleanup in selected.items():
+            week_assignment[person] = cleanup
+            used_people.add(person)
+            cleanup_slots_assigned[cleanup].append(person)
     
         # -------------------------------------------------
         # TRUE ROUND-ROBIN for OUT-OF-HOUSE (0 & 1)
         # -------------------------------------------------
+        stats.mark()
         for i, person in enumerate(out_house_people):
             if person in used_people:
                 continue
@@ -128,6 +689,7 @@ def schedule_one_week_final(
             cleanup_slots_assigned[cleanup].append(person)
     
         temp_round_robin_index += 1
+        stats.lap("out_of_house_round_robin")
     
         # -------------------------------------------------
         # LAST-RESORT (should rarely trigger)
@@ -136,7 +698,7 @@ def schedule_one_week_final(
         for person in remaining_people:
             allowed = base_by_person.get(person, {})
             candidate_cleanups = list(allowed.keys()) if allowed else cleanup_types.copy()
-            if person in out_house_people and "deck_brush" in candidate_cleanups:
+            if person in out_house_set and "deck_brush" in candidate_cleanups:
                 candidate_cleanups.remove("deck_brush")
                 
             # Avoid back to back if possible
@@ -146,8 +708,26 @@ def schedule_one_week_final(
             week_assignment[person] = best_cleanup
             used_people.add(person)
             cleanup_slots_assigned[best_cleanup].append(person)
+            stats.count("last_resort_assignments")
             print(f"⚠ Week {week}: last-resort assignment for {person} → {best_cleanup}")
+        stats.lap("last_resort")
             
+        # -------------------------------------------------
+        # Local swap repair (full retry only if no valid swap exists)
+        # -------------------------------------------------
+        swaps = _repair_back_to_back(
+            week,
+            week_assignment,
+            cleanup_slots_assigned,
+            cleanup_types,
+            base_by_person,
+            assigned_so_far,
+            last_cleanup,
+            in_house_set
+        )
+        stats.count("swaps", swaps)
+        stats.lap("swap_repair")
+
         # -------------------------------------------------
         # Validation for back-to-back
         # -------------------------------------------------
@@ -156,22 +736,29 @@ def schedule_one_week_final(
             if last_cleanup.get(person) == cleanup:
                 has_b2b = True
                 break
+        stats.lap("back_to_back_validation")
                 
         if not has_b2b:
             # Success!
             round_robin_index = temp_round_robin_index
             break
             
-        print(f"🔄 Retry {attempt + 1}/{MAX_RETRIES}: Generated schedule had back-to-back assignments (Week {week}). Retrying...")
+        if attempt + 1 == MAX_RETRIES:
+            continue  # no attempts left: reported below
+
+        stats.count("retries")
+        print(f"🔄 Retry {attempt + 1}/{MAX_RETRIES - 1}: Generated schedule had back-to-back assignments (Week {week}). Retrying...")
         # Shuffle names to potentially get a different result in the next attempt
-        random.shuffle(names)
+        rng.shuffle(names)
 
     else:
         # Find exactly who has the back-to-back assignment for reporting
         b2b_people = [p for p, c in week_assignment.items() if last_cleanup.get(p) == c]
         b2b_str = ", ".join(b2b_people) if b2b_people else "unknown"
+        stats.count("forced_back_to_backs", len(b2b_people))
         
-        print(f"❌ ERROR: Could not generate a schedule without back-to-back assignments after {MAX_RETRIES} retries for Week {week}.")
+        tried = "the flow engine does not retry" if engine == "flow" else f"after {MAX_RETRIES - 1} retries"
+        print(f"❌ ERROR: Could not generate a schedule without back-to-back assignments ({tried}) for Week {week}.")
         print(f"⚠ Forced back-to-back assignment for: {b2b_str}. Accepting schedule to prevent script failure.")
         
         # We must still update the round robin index even if it failed, so the math continues cleanly next week
@@ -180,10 +767,13 @@ def schedule_one_week_final(
     # -------------------------------------------------
     # Update global state
     # -------------------------------------------------
+    stats.mark()
+    # Everyone is counted (out-of-house too), like rebuild.py and the checkpoint journal
     for person, cleanup in week_assignment.items():
-        if person in in_house_people:
-            assigned_so_far[person][cleanup] += 1
+        assigned_so_far[person][cleanup] += 1
         last_cleanup[person] = cleanup
-        df.loc[df["name"] == person, cleanup] += 1
+
+    apply_count_deltas(df, [(person, cleanup, 1) for person, cleanup in week_assignment.items()])
+    stats.lap("state_update")
 
     return week_assignment, round_robin_index
@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import runpy
+import sys
+from collections import defaultdict
+
+CONFIG_FILE = "cleanup_config.json"
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ---------------------------
+# Subcommands that run an existing script (pandas is only imported by those)
+# ---------------------------
+SCRIPTS = {
+    "init": ("init.py", "start a fresh semester"),
+    "schedule": ("schedule.py", "schedule the next week"),
+    "semester": ("main.py", "simulate the whole semester"),
+    "summary": ("summary.py", "write summary.xlsx"),
+    "reassign": ("reassign.py", "change past assignments"),
+    "rollback": ("rollback.py", "undo the latest week(s)"),
+    "rebuild": ("rebuild.py", "rebuild checkpoint.json from the weekly record"),
+    "remove": ("remove_person.py", "remove members"),
+    "availability": ("set_availability.py", "toggle member availability"),
+    "calendar": ("availability.py", "import the availability calendar (calendar import FILE)"),
+    "export": ("weekly.py", "write weekly_assignments.xlsx"),
+    "db": ("database.py", "import/export the SQLite backend"),
+    "serve": ("service.py", "keep the workspace in memory and serve it over HTTP"),
+}
+
+
+def run_script(command, argv):
+    script, _ = SCRIPTS[command]
+    if command == "export":
+        argv = ["export"] + argv
+    sys.argv = [script] + argv
+    runpy.run_path(os.path.join(HERE, script), run_name="__main__")
+
+
+# ---------------------------
+# JSON-only queries
+# ---------------------------
+def load_config():
+    if not os.path.exists(CONFIG_FILE):
+        raise RuntimeError(f"❌ {CONFIG_FILE} not found. Run init first.")
+    with open(CONFIG_FILE, "r") as f:
+        return json.load(f)
+
+
+def load_week(config, wk=None):
+    """
+    (current_week, {person: cleanup} of week wk, default the latest) from
+    cleanup.db or the checkpoint journal.
+    """
+    import database
+
+    if database.uses_sqlite(config):
+        con = database.connect()
+        current_week = database.current_week(con)
+        assignments = database.week_assignments(con, current_week if wk is None else wk)
+        con.close()
+    else:
+        from journal import load_checkpoint
+        checkpoint = load_checkpoint()
+        current_week = checkpoint.get("current_week", 0)
+        assignments = checkpoint.get("weekly_history", {}).get(str(current_week if wk is None else wk), {})
+    return current_week, assignments
+
+
+def status(args):
+    config = load_config()
+    current_week, latest = load_week(config)
+
+    print(f"📅 Week {current_week} of {config.get('num_weeks', '?')} scheduled")
+    print(f"👥 {config.get('num_people', '?')} members, {len(latest)} assigned in week {current_week}")
+    print(f"⚙ engine: {config.get('engine', 'python')}, storage: {config.get('storage', 'files')}")
+
+
+def week(args):
+    config = load_config()
+    current_week, assignments = load_week(config, args.week)
+    wk = current_week if args.week is None else args.week
+
+    if not assignments:
+        raise RuntimeError(f"❌ Week {wk} has not been scheduled.")
+
+    by_cleanup = defaultdict(list)
+    for person, cleanup in assignments.items():
+        by_cleanup[cleanup].append(person)
+
+    print(f"📅 Week {wk}")
+    order = config.get("cleanup_types", [])
+    for cleanup in sorted(by_cleanup, key=lambda c: (order.index(c) if c in order else len(order), str(c))):
+        print(f"  {cleanup}: {', '.join(sorted(by_cleanup[cleanup]))}")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    if argv and argv[0] in SCRIPTS:
+        run_script(argv[0], argv[1:])
+        return
+
+    parser = argparse.ArgumentParser(
+        description="Cleanup scheduler. status/week answer from the checkpoint without loading pandas; "
+                    "the other commands run the matching script with the remaining arguments.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="current week and settings").set_defaults(func=status)
+    p = sub.add_parser("week", help="assignments of one week (default: the latest)")
+    p.add_argument("week", type=int, nargs="?", default=None)
+    p.set_defaults(func=week)
+    for command, (script, description) in SCRIPTS.items():
+        sub.add_parser(command, help=f"{description} ({script})", add_help=False)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
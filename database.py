@@ -0,0 +1,351 @@
+import argparse
+import os
+import sqlite3
+from journal import validate_reassignments
+
+DB_FILE = "cleanup.db"
+CONFIG_FILE = "cleanup_config.json"
+
+# ---------------------------
+# Optional SQLite storage backend
+# ---------------------------
+# Enabled with "storage": "sqlite" in cleanup_config.json. The roster, every
+# weekly assignment and the cumulative counts then live in cleanup.db and each
+# tool runs as one small transaction; actives.xlsx and weekly_assignments.xlsx
+# are only written by `python database.py export`.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS members (
+    name TEXT PRIMARY KEY,
+    inhouse INTEGER NOT NULL,
+    availability INTEGER NOT NULL DEFAULT 1,
+    last_cleanup TEXT,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS assignments (
+    week INTEGER NOT NULL,
+    person TEXT NOT NULL,
+    cleanup TEXT NOT NULL,
+    PRIMARY KEY (week, person)
+);
+CREATE INDEX IF NOT EXISTS assignments_by_person ON assignments (person, week);
+CREATE TABLE IF NOT EXISTS counts (
+    person TEXT NOT NULL,
+    cleanup TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (person, cleanup)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def uses_sqlite(config):
+    return config.get("storage", "files") == "sqlite"
+
+
+def connect(db_file=DB_FILE, create=False):
+    """
+    Open cleanup.db. Only the write paths that fill it (`database.py import`,
+    init.py, semester.py) pass create=True and set up the schema; everything
+    else needs the file to exist already.
+    """
+    if not create and not os.path.exists(db_file):
+        raise RuntimeError(f"❌ {db_file} not found. Run `python database.py import` first.")
+    con = sqlite3.connect(db_file)
+    if create:
+        con.executescript(SCHEMA)
+    return con
+
+
+def _get_meta(con, key, default=0):
+    row = con.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def _set_meta(con, key, value):
+    con.execute(
+        "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+        (key, int(value))
+    )
+
+
+def _add_counts(con, rows, delta):
+    """rows: list of (person, cleanup); counts that drop to 0 are deleted."""
+    con.executemany(
+        "INSERT INTO counts (person, cleanup, count) VALUES (?, ?, ?) "
+        "ON CONFLICT (person, cleanup) DO UPDATE SET count = count + excluded.count",
+        [(p, c, delta) for p, c in rows]
+    )
+    if delta < 0:
+        con.executemany(
+            "DELETE FROM counts WHERE person = ? AND cleanup = ? AND count <= 0", list(rows)
+        )
+
+
+def _latest_cleanup(con, person):
+    row = con.execute(
+        "SELECT cleanup FROM assignments WHERE person = ? ORDER BY week DESC LIMIT 1", (person,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+# ---------------------------
+# Reads
+# ---------------------------
+def load_members(con):
+    """
+    Roster as an actives.xlsx-shaped DataFrame (name, inhouse, availability).
+    """
+    # pandas is only imported on the paths that build DataFrames (keeps status queries fast)
+    import pandas as pd
+
+    return pd.read_sql_query(
+        "SELECT name, inhouse, availability FROM members ORDER BY position", con
+    )
+
+
+def load_checkpoint(con, with_history=False):
+    """
+    checkpoint.json-shaped dict. weekly_history is only read when asked for;
+    scheduling a week does not need it.
+    """
+    assigned_so_far = {name: {} for (name,) in con.execute("SELECT name FROM members ORDER BY position")}
+    for person, cleanup, count in con.execute("SELECT person, cleanup, count FROM counts"):
+        assigned_so_far.setdefault(person, {})[cleanup] = count
+
+    weekly_history = {}
+    if with_history:
+        for week, person, cleanup in con.execute("SELECT week, person, cleanup FROM assignments ORDER BY week"):
+            weekly_history.setdefault(str(week), {})[person] = cleanup
+
+    return {
+        "current_week": _get_meta(con, "current_week"),
+        "assigned_so_far": assigned_so_far,
+        "last_cleanup": dict(con.execute("SELECT name, last_cleanup FROM members")),
+        "weekly_history": weekly_history,
+        "round_robin_index": _get_meta(con, "round_robin_index"),
+    }
+
+
+# ---------------------------
+# Transactional updates
+# ---------------------------
+def record_week(con, week, assignments, round_robin_index):
+    with con:
+        con.executemany(
+            "INSERT INTO assignments (week, person, cleanup) VALUES (?, ?, ?)",
+            [(int(week), p, c) for p, c in assignments.items()]
+        )
+        _add_counts(con, list(assignments.items()), 1)
+        con.executemany(
+            "UPDATE members SET last_cleanup = ? WHERE name = ?",
+            [(c, p) for p, c in assignments.items()]
+        )
+        _set_meta(con, "current_week", week)
+        _set_meta(con, "round_robin_index", round_robin_index)
+
+
+def reassign(con, week, person, new_cleanup):
+    """
+    Move one assignment to another cleanup. Returns the old cleanup.
+    """
+    return reassign_many(con, [(person, week, new_cleanup)])[0]
+
+
+def reassign_many(con, changes, cleanup_types=None):
+    """
+    Apply a list of (person, week, new_cleanup) in one transaction. Every change
+    is validated first; if any is invalid nothing is written. Returns the old
+    cleanups in the same order.
+    """
+    known = set(name for (name,) in con.execute("SELECT name FROM members"))
+
+    def old_cleanup(person, week):
+        row = con.execute(
+            "SELECT cleanup FROM assignments WHERE week = ? AND person = ?", (int(week), person)
+        ).fetchone()
+        return row[0] if row else None
+
+    olds = [c["old"] for c in validate_reassignments(changes, old_cleanup, cleanup_types, known)]
+
+    with con:
+        con.executemany(
+            "UPDATE assignments SET cleanup = ? WHERE week = ? AND person = ?",
+            [(new_cleanup, int(week), person) for person, week, new_cleanup in changes]
+        )
+        _add_counts(con, [(person, old) for (person, _, _), old in zip(changes, olds)], -1)
+        _add_counts(con, [(person, new_cleanup) for person, _, new_cleanup in changes], 1)
+        con.executemany(
+            "UPDATE members SET last_cleanup = ? WHERE name = ?",
+            [(_latest_cleanup(con, person), person) for person in {p for p, _, _ in changes}]
+        )
+    return olds
+
+
+def week_assignments(con, week):
+    """{person: cleanup} for one week (uses the primary key, not the whole history)."""
+    return dict(con.execute("SELECT person, cleanup FROM assignments WHERE week = ?", (int(week),)))
+
+
+def current_week(con):
+    return _get_meta(con, "current_week")
+
+
+def rollback_to(con, to_week):
+    """
+    Undo every week after `to_week` in one transaction. Returns the rolled back
+    week numbers, latest first.
+    """
+    with con:
+        week = _get_meta(con, "current_week")
+        weeks = [w for (w,) in con.execute(
+            "SELECT DISTINCT week FROM assignments WHERE week > ? ORDER BY week DESC", (int(to_week),)
+        )]
+        if week == 0 or not weeks:
+            raise RuntimeError("❌ No scheduled weeks found to rollback.")
+
+        rows = con.execute(
+            "SELECT person, cleanup, COUNT(*) FROM assignments WHERE week > ? GROUP BY person, cleanup",
+            (int(to_week),)
+        ).fetchall()
+        con.execute("DELETE FROM assignments WHERE week > ?", (int(to_week),))
+        con.executemany(
+            "UPDATE counts SET count = count - ? WHERE person = ? AND cleanup = ?",
+            [(k, p, c) for p, c, k in rows]
+        )
+        con.executemany(
+            "DELETE FROM counts WHERE person = ? AND cleanup = ? AND count <= 0",
+            [(p, c) for p, c, _ in rows]
+        )
+        people = {p for p, _, _ in rows}
+        con.executemany(
+            "UPDATE members SET last_cleanup = ? WHERE name = ?",
+            [(_latest_cleanup(con, p), p) for p in people]
+        )
+        _set_meta(con, "current_week", week - len(weeks))
+        _set_meta(con, "round_robin_index", max(_get_meta(con, "round_robin_index") - len(weeks), 0))
+    return weeks
+
+
+def remove_members(con, names):
+    with con:
+        for table, column in (("members", "name"), ("assignments", "person"), ("counts", "person")):
+            con.executemany(f"DELETE FROM {table} WHERE {column} = ?", [(n,) for n in names])
+
+
+def set_availability(con, availability):
+    """availability: dict name -> 0/1"""
+    with con:
+        con.executemany(
+            "UPDATE members SET availability = ? WHERE name = ?",
+            [(int(a), n) for n, a in availability.items()]
+        )
+
+
+# ---------------------------
+# Import / export
+# ---------------------------
+def import_workspace(con, df, checkpoint):
+    """
+    Replace the database contents with a roster DataFrame and a checkpoint dict.
+    """
+    with con:
+        for table in ("members", "assignments", "counts", "meta"):
+            con.execute(f"DELETE FROM {table}")
+
+        last_cleanup = checkpoint.get("last_cleanup", {})
+        availability = df["availability"] if "availability" in df.columns else [1] * len(df)
+        con.executemany(
+            "INSERT INTO members (name, inhouse, availability, last_cleanup, position) VALUES (?, ?, ?, ?, ?)",
+            [
+                (name, int(float(str(inhouse))), int(avail), last_cleanup.get(name), i)
+                for i, (name, inhouse, avail) in enumerate(zip(df["name"], df["inhouse"], availability))
+            ]
+        )
+        con.executemany(
+            "INSERT INTO assignments (week, person, cleanup) VALUES (?, ?, ?)",
+            [
+                (int(wk), p, c)
+                for wk, assignments in checkpoint.get("weekly_history", {}).items()
+                for p, c in assignments.items() if c is not None
+            ]
+        )
+        con.executemany(
+            "INSERT INTO counts (person, cleanup, count) VALUES (?, ?, ?)",
+            [
+                (p, c, int(k))
+                for p, counts in checkpoint.get("assigned_so_far", {}).items()
+                for c, k in counts.items() if k
+            ]
+        )
+        _set_meta(con, "current_week", checkpoint.get("current_week", 0))
+        _set_meta(con, "round_robin_index", checkpoint.get("round_robin_index", 0))
+
+
+def export_excel(con, cleanup_types, actives_file, weekly_file):
+    """
+    Write actives.xlsx (roster + cumulative counts) and the pivoted
+    weekly_assignments.xlsx from the database. Columns cleanup.db does not
+    store (anything else kept in an existing actives.xlsx) are carried over
+    by name, in the workbook's column order.
+    """
+    import pandas as pd
+    from roster import read_roster, write_roster
+
+    members = load_members(con)
+    counts = pd.read_sql_query("SELECT person, cleanup, count FROM counts", con)
+    table = counts.pivot(index="person", columns="cleanup", values="count")
+    table = table.reindex(index=members["name"], columns=cleanup_types).fillna(0).astype(int)
+
+    actives = members[["name", "inhouse"]].copy()
+    for c in cleanup_types:
+        actives[c] = table[c].to_numpy()
+    actives["availability"] = members["availability"]
+
+    if os.path.exists(actives_file):
+        existing = read_roster(actives_file)
+        extra = [c for c in existing.columns if c not in actives.columns]
+        if extra:
+            actives = actives.merge(existing[["name"] + extra].drop_duplicates("name"), on="name", how="left")
+        order = [c for c in existing.columns if c in actives.columns]
+        actives = actives[order + [c for c in actives.columns if c not in order]]
+    write_roster(actives, actives_file)
+
+    assignments = pd.read_sql_query("SELECT week, person, cleanup FROM assignments", con)
+    weekly_df = assignments.pivot(index="week", columns="person", values="cleanup")
+    weekly_df = weekly_df.reindex(columns=[p for p in members["name"] if p in weekly_df.columns])
+    weekly_df.reset_index().to_excel(weekly_file, index=False)
+
+
+def main():
+    # schedule.py imports this module, so its helpers are imported here
+    from journal import CHECKPOINT_FILE, load_checkpoint as load_file_checkpoint
+    from schedule import EXCEL_FILE, WEEKLY_EXCEL_FILE, load_actives, load_config
+
+    parser = argparse.ArgumentParser(description="Move workspace state in and out of the SQLite backend.")
+    parser.add_argument("command", choices=["import", "export"],
+                        help="import: load actives.xlsx + checkpoint into cleanup.db; export: write the Excel files")
+    parser.add_argument("--db", default=DB_FILE)
+    args = parser.parse_args()
+
+    config = load_config(CONFIG_FILE)
+    con = connect(args.db, create=args.command == "import")
+
+    if args.command == "import":
+        df = load_actives(EXCEL_FILE)
+        checkpoint = load_file_checkpoint(CHECKPOINT_FILE)
+        import_workspace(con, df, checkpoint)
+        print(f"✅ Imported {len(df)} members and {len(checkpoint['weekly_history'])} weeks into {args.db}")
+        if not uses_sqlite(config):
+            print(f'ℹ Set "storage": "sqlite" in {CONFIG_FILE} to run the tools on {args.db}')
+    else:
+        export_excel(con, config["cleanup_types"], EXCEL_FILE, WEEKLY_EXCEL_FILE)
+        print(f"✅ Exported {args.db} to {EXCEL_FILE} and {WEEKLY_EXCEL_FILE}")
+
+    con.close()
+
+
+if __name__ == "__main__":
+    main()
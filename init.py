@@ -1,8 +1,20 @@
-import pandas as pd
 import json
-import math
-from datetime import datetime
 import os
+import database
+from journal import CHECKPOINT_FILE, clear_checkpoint, empty_checkpoint
+from weekly import WEEKLY_CSV_FILE, WEEKLY_EXCEL_FILE
+from roster import read_roster, write_roster
+from availability import CALENDAR_FILE, calendar_config
+from planner import PLAN_FILE
+from schedule import STATS_FILE
+from quotas import (
+    CLEANUP_TYPES,
+    MIN_PER_WEEK,
+    compute_num_weeks,
+    compute_per_week_actual,
+    compute_global_base,
+    compute_base_by_inhouse,
+)
 
 # ---------------------------
 # 1️⃣ Print credits
@@ -14,35 +26,33 @@ print("Their work ensures that weekly cleanups are distributed fairly and effici
 # ---------------------------
 # 2️⃣ Clear old checkpoint
 # ---------------------------
-CHECKPOINT_FILE = "checkpoint.json"
-if os.path.exists(CHECKPOINT_FILE):
-    os.remove(CHECKPOINT_FILE)
+if clear_checkpoint(CHECKPOINT_FILE):
     print("✅ checkpoint.json cleared (fresh semester start)")
 
-WEEKLY_EXCEL_FILE = "weekly_assignments.xlsx"
-if os.path.exists(WEEKLY_EXCEL_FILE):
-    os.remove(WEEKLY_EXCEL_FILE)
-    print(f"✅ {WEEKLY_EXCEL_FILE} cleared (fresh semester start)")
+for weekly_file in (WEEKLY_CSV_FILE, WEEKLY_EXCEL_FILE):
+    if os.path.exists(weekly_file):
+        os.remove(weekly_file)
+        print(f"✅ {weekly_file} cleared (fresh semester start)")
+
+# Settings chosen by the user rather than computed here, carried over by every init
+OPTIONAL_CONFIG_KEYS = ("engine", "seed", "instrumentation", "lookahead_weeks", "storage")
+
+for stale_file in (STATS_FILE, PLAN_FILE):
+    if os.path.exists(stale_file):
+        os.remove(stale_file)
+        print(f"✅ {stale_file} cleared (fresh semester start)")
 
 # ---------------------------
 # 3️⃣ Load Excel & initialize cleanup counts
 # ---------------------------
-df = pd.read_excel("actives.xlsx")
+df = read_roster("actives.xlsx")
 
-cleanup_types = [
-    'kitchen',
-    'deck_0',
-    'stairs',
-    'deck_brush',
-    'deck_1',
-    'bathroom_2',
-    'bathroom_3',
-]
+cleanup_types = CLEANUP_TYPES.copy()
 
 for c in cleanup_types:
     df[c] = 0
 
-df.to_excel("actives.xlsx", index=False)
+write_roster(df, "actives.xlsx")
 print("✅ Cleanup count columns initialized in actives.xlsx")
 
 # ---------------------------
@@ -52,56 +62,17 @@ num_people = len(df[df["inhouse"].isin([2,3])])  # only count in-house for per-w
 start_date_str = "2026-01-15"
 end_date_str = "2026-05-07"
 
-start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
-
-total_days = (end_date - start_date).days + 1
-num_weeks = math.ceil(total_days / 7)
+num_weeks = compute_num_weeks(start_date_str, end_date_str)
 print(f"Total weeks: {num_weeks}")
 
 # ---------------------------
 # 5️⃣ Minimum & actual per-week requirements
 # ---------------------------
-min_per_week = {
-    "deck_0": 3,
-    "kitchen": 5,
-    "stairs": 2,
-    "deck_brush": 2,
-    "deck_1": 2,
-    "bathroom_2": 2,
-    "bathroom_3": 2,
-}
+min_per_week = MIN_PER_WEEK.copy()
 
 # Only in-house (2 & 3) count for extra distribution
 inhouse_count = num_people
-extra_per_week = inhouse_count - sum(min_per_week.values())
-cleanup_order = list(min_per_week.keys())
-
-per_week_actual = min_per_week.copy()
-i = 0
-while extra_per_week > 0:
-    cleanup = cleanup_order[i % len(cleanup_order)]
-
-    # Special case: bathroom pair must be incremented together
-    if cleanup == "bathroom_2":
-        if extra_per_week >= 2:
-            per_week_actual["bathroom_2"] += 1
-            per_week_actual["bathroom_3"] += 1
-            extra_per_week -= 2
-        else:
-            # Not enough people to increment both bathrooms; skip bathroom_2 for now
-            i += 1
-            continue
-    elif cleanup == "deck_brush":
-        # Increment by 2 unless only 1 person left
-        inc = 2 if extra_per_week >= 2 else 1
-        per_week_actual["deck_brush"] += inc
-        extra_per_week -= inc
-    else:
-        per_week_actual[cleanup] += 1
-        extra_per_week -= 1
-
-    i += 1
+per_week_actual = compute_per_week_actual(min_per_week, inhouse_count)
 
 print(f"Per-week actual cleanup distribution (in-house only):")
 for k, v in per_week_actual.items():
@@ -110,13 +81,7 @@ for k, v in per_week_actual.items():
 # ---------------------------
 # 6️⃣ Compute global theoretical base
 # ---------------------------
-exact = {k: (v * num_weeks) / inhouse_count for k, v in per_week_actual.items()}
-global_base = {k: int(exact[k]) for k in exact}
-
-missing = num_weeks - sum(global_base.values())
-fractions = sorted(exact.keys(), key=lambda k: exact[k] - global_base[k], reverse=True)
-for k in fractions[:missing]:
-    global_base[k] += 1
+global_base = compute_global_base(per_week_actual, num_weeks, inhouse_count)
 
 print(f"Theoretical per-person cleanup target for {num_weeks} weeks (global base):")
 for k, v in global_base.items():
@@ -125,19 +90,7 @@ for k, v in global_base.items():
 # ---------------------------
 # 7️⃣ Compute base by inhouse group (only 2 & 3)
 # ---------------------------
-base_by_inhouse = {}
-
-# deck 2: cannot do bathroom_3
-b2 = global_base.copy()
-b2["bathroom_2"] += b2.get("bathroom_3",0)
-b2.pop("bathroom_3", None)
-base_by_inhouse[2] = b2
-
-# deck 3: cannot do bathroom_2
-b3 = global_base.copy()
-b3["bathroom_3"] += b3.get("bathroom_2",0)
-b3.pop("bathroom_2", None)
-base_by_inhouse[3] = b3
+base_by_inhouse = compute_base_by_inhouse(global_base)
 
 print("Base targets by in-house group (2 & 3 only):")
 print(json.dumps(base_by_inhouse, indent=2))
@@ -148,6 +101,7 @@ print(json.dumps(base_by_inhouse, indent=2))
 output = {
     "num_people": len(df),
     "num_weeks": num_weeks,
+    "start_date": start_date_str,
     "cleanup_types": cleanup_types,
     "min_per_week": min_per_week,
     "per_week_actual": per_week_actual,
@@ -155,7 +109,26 @@ output = {
     "base_by_inhouse": base_by_inhouse
 }
 
+# Keep the optional settings of an existing config (engine, seed, storage, ...)
+if os.path.exists("cleanup_config.json"):
+    with open("cleanup_config.json", "r") as f:
+        previous = json.load(f)
+    output.update({k: previous[k] for k in OPTIONAL_CONFIG_KEYS if k in previous})
+
+# Per-week quotas from the availability calendar (schedule.py looks up its week)
+output.update(calendar_config(df, output))
+if "per_week_table" in output:
+    print(f"📅 {CALENDAR_FILE}: absences in {len(output['away_by_week'])} of {num_weeks} weeks, "
+          "per-week quota table precomputed")
+
 with open("cleanup_config.json", "w") as f:
     json.dump(output, f, indent=4)
 
 print("✅ cleanup_config.json saved with per-inhouse theoretical bases")
+
+# A kept "storage": "sqlite" setting starts the semester in cleanup.db too
+if database.uses_sqlite(output):
+    con = database.connect(create=True)
+    database.import_workspace(con, df, empty_checkpoint())
+    con.close()
+    print(f"✅ {database.DB_FILE} reset (fresh semester start)")
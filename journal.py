@@ -0,0 +1,289 @@
+import json
+import os
+from quotas import advance_quota_state
+
+CHECKPOINT_FILE = "checkpoint.json"   # compacted snapshot
+JOURNAL_FILE = "checkpoint.jsonl"     # append-only events since the snapshot
+SNAPSHOT_EVERY = 8                    # events kept in the journal before compacting
+
+
+# ---------------------------
+# Checkpoint snapshot + event journal
+# ---------------------------
+# checkpoint.json is a snapshot in the usual format plus "journal_seq", the
+# sequence number of the last event folded into it. Every week scheduled,
+# reassignment, rollback or availability change appends one JSON line to
+# checkpoint.jsonl:
+#
+#   {"seq": 12, "event": "week", "week": 5, "assignments": {...}, "round_robin_index": 5}
+#   {"seq": 13, "event": "reassign", "changes": [{"week": 3, "person": "...", "old": "...", "new": "..."}, ...]}
+#   {"seq": 14, "event": "rollback", "weeks": [5, 4]}
+#   {"seq": 15, "event": "availability", "week": 6, "changes": {...}, "quotas": {...}}
+#
+# Availability events record roster changes (see availability.py) and the
+# QuotaTracker state after them, kept as checkpoint["quotas"]; week and
+# rollback events move its remaining-week targets. The schedule state is
+# left as it is.
+#
+# Loading reads the snapshot and replays only the events after journal_seq, so
+# an interrupted compaction never applies an event twice.
+
+def journal_path(checkpoint_file=CHECKPOINT_FILE):
+    return os.path.join(os.path.dirname(checkpoint_file), JOURNAL_FILE)
+
+
+def empty_checkpoint():
+    return {
+        "current_week": 0,
+        "assigned_so_far": {},
+        "last_cleanup": {},
+        "weekly_history": {},
+        "round_robin_index": 0  # track out-of-house rotation
+    }
+
+
+def read_events(checkpoint_file=CHECKPOINT_FILE, after_seq=0):
+    path = journal_path(checkpoint_file)
+    if not os.path.exists(path):
+        return []
+
+    events = []
+    with open(path, "r") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                # Left behind by an append that was cut short (never acknowledged)
+                print(f"⚠ Warning: ignoring incomplete journal line {line_no} in {path}")
+                continue
+            if event["seq"] > after_seq:
+                events.append(event)
+    return events
+
+
+def load_checkpoint(checkpoint_file=CHECKPOINT_FILE):
+    """
+    Latest checkpoint: the snapshot with all later journal events replayed.
+    """
+    if os.path.exists(checkpoint_file):
+        with open(checkpoint_file, "r") as f:
+            checkpoint = json.load(f)
+    else:
+        checkpoint = empty_checkpoint()
+
+    checkpoint.setdefault("journal_seq", 0)
+    for event in read_events(checkpoint_file, checkpoint["journal_seq"]):
+        apply_event(checkpoint, event)
+    return checkpoint
+
+
+def save_checkpoint(checkpoint, checkpoint_file=CHECKPOINT_FILE):
+    """
+    Compact: write the full snapshot, then drop the journal it now contains.
+    """
+    if "journal_seq" not in checkpoint:
+        # A checkpoint rebuilt from scratch supersedes every journaled event
+        events = read_events(checkpoint_file)
+        checkpoint["journal_seq"] = events[-1]["seq"] if events else 0
+    checkpoint["snapshot_seq"] = checkpoint["journal_seq"]
+
+    tmp_file = checkpoint_file + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(checkpoint, f, indent=4)
+    os.replace(tmp_file, checkpoint_file)
+
+    path = journal_path(checkpoint_file)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def clear_checkpoint(checkpoint_file=CHECKPOINT_FILE):
+    """Remove the snapshot and its journal. Returns True if anything was removed."""
+    removed = False
+    for path in (checkpoint_file, journal_path(checkpoint_file)):
+        if os.path.exists(path):
+            os.remove(path)
+            removed = True
+    return removed
+
+
+def append_event(checkpoint, event, checkpoint_file=CHECKPOINT_FILE, snapshot_every=SNAPSHOT_EVERY):
+    """
+    Apply `event` to the loaded checkpoint and persist it as one journal line.
+    Compacts into checkpoint.json once the journal holds snapshot_every events.
+    """
+    seq = checkpoint.get("journal_seq", 0) + 1
+    event = {"seq": seq, **event}
+    apply_event(checkpoint, event)
+
+    path = journal_path(checkpoint_file)
+    with open(path, "a+b") as f:
+        # Start on a fresh line if a previous append was cut short
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        f.write((json.dumps(event) + "\n").encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+
+    if seq - checkpoint.get("snapshot_seq", 0) >= snapshot_every:
+        save_checkpoint(checkpoint, checkpoint_file)
+    return event
+
+
+def reassign_changes(weekly_history, requests, cleanup_types, roster_names):
+    """
+    Validate (person, week, new_cleanup) requests against the history and return
+    the "changes" of a reassign event. Raises RuntimeError listing every invalid
+    request, so a batch is applied completely or not at all.
+    """
+    return validate_reassignments(
+        requests,
+        lambda person, week: weekly_history.get(str(week), {}).get(person),
+        cleanup_types,
+        roster_names,
+        weekly_history
+    )
+
+
+def validate_reassignments(requests, old_cleanup, cleanup_types, roster_names, weeks=None):
+    """
+    The checks behind reassign_changes, shared with database.reassign_many:
+    old_cleanup(person, week) is the current assignment (None if there is
+    none) and `weeks`, when given, the scheduled weeks as strings.
+    cleanup_types=None accepts any cleanup.
+    """
+    changes = []
+    errors = []
+    seen = set()
+    for person, week, new in requests:
+        old = old_cleanup(person, week)
+        if weeks is not None and str(week) not in weeks:
+            errors.append(f"week {week} not found")
+        elif old is None:
+            errors.append(f"{person} had no assignment in week {week}")
+        elif old == new:
+            errors.append(f"{person} week {week}: old and new cleanup are the same ({new})")
+        elif cleanup_types is not None and new not in cleanup_types:
+            errors.append(f"{person} week {week}: unknown cleanup '{new}'")
+        elif person not in roster_names:
+            errors.append(f"{person} not found in the roster")
+        elif (person, int(week)) in seen:
+            errors.append(f"{person} week {week} is reassigned more than once")
+        else:
+            changes.append({"week": int(week), "person": person, "old": old, "new": new})
+        seen.add((person, int(week)))
+
+    if errors:
+        raise RuntimeError("❌ Reassignment rejected, nothing was changed:\n  " + "\n  ".join(errors))
+    return changes
+
+
+# ---------------------------
+# Event replay
+# ---------------------------
+def apply_event(checkpoint, event):
+    kind = event["event"]
+    if kind == "week":
+        _apply_week(checkpoint, event)
+    elif kind == "reassign":
+        _apply_reassign(checkpoint, event)
+    elif kind == "rollback":
+        _apply_rollback(checkpoint, event)
+    elif kind == "availability":
+        if "quotas" in event:  # availability itself lives in the roster
+            checkpoint["quotas"] = json.loads(json.dumps(event["quotas"]))
+    else:
+        raise ValueError(f"Unknown journal event '{kind}' (seq {event.get('seq')})")
+    checkpoint["journal_seq"] = event["seq"]
+
+
+def _apply_week(checkpoint, event):
+    week = int(event["week"])
+    assigned_so_far = checkpoint["assigned_so_far"]
+    last_cleanup = checkpoint["last_cleanup"]
+
+    for person, cleanup in event["assignments"].items():
+        counts = assigned_so_far.setdefault(person, {})
+        counts[cleanup] = counts.get(cleanup, 0) + 1
+        last_cleanup[person] = cleanup
+
+    checkpoint["weekly_history"][str(week)] = dict(event["assignments"])
+    checkpoint["current_week"] = max(checkpoint.get("current_week", 0), week)
+    checkpoint["round_robin_index"] = event["round_robin_index"]
+    if "quotas" in checkpoint:
+        advance_quota_state(checkpoint["quotas"], 1)
+
+
+def _apply_reassign(checkpoint, event):
+    # Batch events carry a "changes" list; older single events carry the fields directly
+    changes = event.get("changes") or [event]
+    weekly_history = checkpoint["weekly_history"]
+    assigned_so_far = checkpoint["assigned_so_far"]
+
+    for change in changes:
+        week, person, old, new = str(change["week"]), change["person"], change["old"], change["new"]
+        counts = assigned_so_far.setdefault(person, {})
+
+        weekly_history[week][person] = new
+        if old is not None:
+            counts[old] = counts.get(old, 0) - 1
+            if counts[old] <= 0:
+                del counts[old]
+        counts[new] = counts.get(new, 0) + 1
+
+    # Only each person's latest assignment decides last_cleanup
+    people = {change["person"] for change in changes}
+    latest = {}
+    for wk, assignments in weekly_history.items():
+        for person in people.intersection(assignments):
+            if int(wk) > latest.get(person, -1):
+                latest[person] = int(wk)
+    for person, wk in latest.items():
+        checkpoint["last_cleanup"][person] = weekly_history[str(wk)][person]
+
+
+def _apply_rollback(checkpoint, event):
+    # "weeks" lists every removed week (older journals have a single "week")
+    weeks = [str(w) for w in event.get("weeks", [event.get("week")])]
+    weekly_history = checkpoint["weekly_history"]
+    if "quotas" in checkpoint:
+        advance_quota_state(checkpoint["quotas"], -len(weeks))
+    assigned_so_far = checkpoint["assigned_so_far"]
+
+    # Apply the removed weeks as reverse count deltas
+    affected = set()
+    for wk in weeks:
+        for person, cleanup in weekly_history.pop(wk).items():
+            affected.add(person)
+            if cleanup is None:
+                continue
+            counts = assigned_so_far.get(person, {})
+            counts[cleanup] = counts.get(cleanup, 0) - 1
+            if counts[cleanup] <= 0:
+                del counts[cleanup]
+
+    # Only people assigned in the removed weeks can have a different last cleanup;
+    # walk back from the new current week until each of them is found. Nearly
+    # everyone is assigned every week, so this stops after a week or two; a
+    # per-person week index would have to be stored in the checkpoint and kept
+    # up to date by every writer to beat it
+    current_week = checkpoint.get("current_week", 0) - len(weeks)
+    last_cleanup = checkpoint["last_cleanup"]
+    for person in affected:
+        last_cleanup[person] = None
+    remaining = set(affected)
+    for wk in range(current_week, 0, -1):
+        if not remaining:
+            break
+        assignments = weekly_history.get(str(wk), {})
+        for person in remaining.intersection(assignments):
+            last_cleanup[person] = assignments[person]
+            remaining.discard(person)
+
+    checkpoint["current_week"] = current_week
+    checkpoint["round_robin_index"] = max(checkpoint.get("round_robin_index", 0) - len(weeks), 0)
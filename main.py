@@ -1,6 +1,9 @@
+import argparse
 import subprocess
 import json
 import sys
+from planner import make_plan
+from semester import run_semester, search_semesters
 
 CONFIG_FILE = "cleanup_config.json"
 
@@ -25,31 +28,53 @@ def run_script(script_name):
 
     print(result.stdout)
 
-# ---------------------------
-# 1️⃣ Run init.py (fresh semester setup)
-# ---------------------------
-run_script("init.py")
 
-# ---------------------------
-# 2️⃣ Load number of weeks
-# ---------------------------
-with open(CONFIG_FILE, "r") as f:
-    config = json.load(f)
+def main():
+    parser = argparse.ArgumentParser(description="Run a full cleanup semester.")
+    parser.add_argument("--checkpoint-every-week", action="store_true", help="save checkpoint.json after each week")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible semester")
+    # A plan decides the in-house assignments, so seeds would barely change a planned semester
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--search", type=int, default=0, metavar="N",
+                      help="simulate N seeded semesters in parallel and keep the fairest")
+    mode.add_argument("--plan", action="store_true",
+                      help="plan the whole semester at once (planner.py) and follow the plan")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size for --search")
+    args = parser.parse_args()
 
-num_weeks = config["num_weeks"]
-print(f"\n📅 Total weeks to schedule: {num_weeks}")
+    # ---------------------------
+    # 1️⃣ Run init.py (fresh semester setup)
+    # ---------------------------
+    run_script("init.py")
 
-# ---------------------------
-# 3️⃣ Run schedule.py for all weeks
-# ---------------------------
-for week in range(1, num_weeks + 1):
-    print(f"\n📆 Scheduling week {week}/{num_weeks}")
-    run_script("schedule.py")
+    # ---------------------------
+    # 2️⃣ Load number of weeks
+    # ---------------------------
+    with open(CONFIG_FILE, "r") as f:
+        config = json.load(f)
+
+    num_weeks = config["num_weeks"]
+    print(f"\n📅 Total weeks to schedule: {num_weeks}")
+
+    # ---------------------------
+    # 3️⃣ Schedule all weeks in-process (inputs loaded once, outputs written once)
+    # ---------------------------
+    if args.plan:
+        plan = make_plan()
+        run_semester(checkpoint_every_week=args.checkpoint_every_week, seed=args.seed, plan=plan)
+    elif args.search:
+        search_semesters(runs=args.search, base_seed=args.seed or 0, workers=args.workers)
+    else:
+        run_semester(checkpoint_every_week=args.checkpoint_every_week, seed=args.seed)
+
+    # ---------------------------
+    # 4️⃣ Run summary.py
+    # ---------------------------
+    print("\n📊 Final summary:")
+    run_script("summary.py")
+
+    print("\n✅ Automated semester run completed successfully.")
 
-# ---------------------------
-# 4️⃣ Run summary.py
-# ---------------------------
-print("\n📊 Final summary:")
-run_script("summary.py")
 
-print("\n✅ Automated semester run completed successfully.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import pandas as pd
+
+IN_HOUSE_GROUPS = {"2", "3"}
+
+
+# ---------------------------
+# Fairness metrics (summary.py sheets and semester scores)
+# ---------------------------
+def normalize_inhouse(val):
+    try:
+        return str(int(val))
+    except (ValueError, TypeError):
+        return "1"  # default: out-of-house
+
+
+def assignment_tables(df, config, assigned_so_far):
+    """
+    People × cleanups tables for everyone in assigned_so_far:
+    (groups, counts, base, applies) where groups is each person's inhouse
+    group, base the group's base row (missing groups fall back to the global
+    base, NaN where a cleanup does not apply) and applies its mask.
+
+    Columns are every cleanup in the config, the bases or the history (so
+    mistyped reassignments show up).
+    """
+    cleanup_types = config["cleanup_types"]
+    base_by_inhouse = config["base_by_inhouse"]
+    names = list(assigned_so_far.keys())
+
+    inhouse_map = dict(zip(df["name"], df["inhouse"].map(normalize_inhouse)))
+    groups = pd.Series([inhouse_map.get(n, "1") for n in names], index=names, dtype=object)
+
+    counts = pd.DataFrame.from_dict(assigned_so_far, orient="index")
+    base_rows = {"global": config["global_base"], **base_by_inhouse}
+    all_cleanups = list(dict.fromkeys(
+        [*cleanup_types, *(c for b in base_rows.values() for c in b), *counts.columns]
+    ))
+    counts = counts.reindex(index=names, columns=all_cleanups).fillna(0).astype(int)
+
+    base_table = pd.DataFrame.from_dict(base_rows, orient="index").reindex(columns=all_cleanups)
+    row_keys = groups.where(groups.isin(base_by_inhouse.keys()), "global")
+    base = base_table.loc[row_keys.to_numpy()].set_axis(names, axis=0)
+    return groups, counts, base, base.notna()
+
+
+def deviation_scores(df, config, assigned_so_far):
+    """
+    (illegal assignments, deviation warnings, total |deviation|) exactly as
+    summary.py reports them: illegal and warnings (|assigned - base| > 1) over
+    everyone, the total over the in-house "Deviation From Base" sheet.
+    """
+    groups, counts, base, applies = assignment_tables(df, config, assigned_so_far)
+    diff = counts - base.fillna(0).astype(int)
+
+    illegal = int((~applies & (counts > 0)).to_numpy().sum())
+    warnings = int((applies & (diff.abs() > 1)).to_numpy().sum())
+
+    in_house = groups.isin(IN_HOUSE_GROUPS).to_numpy()
+    cleanup_types = config["cleanup_types"]
+    in_house_diff = diff.loc[in_house, cleanup_types].where(applies.loc[in_house, cleanup_types], 0)
+    return illegal, warnings, int(in_house_diff.abs().to_numpy().sum())
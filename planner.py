@@ -0,0 +1,367 @@
+import argparse
+import json
+import os
+import time
+import numpy as np
+from availability import week_availability
+from cleanup import ENGINES, ScheduleStats, _in_house_arrays
+from journal import CHECKPOINT_FILE, load_checkpoint
+
+PLAN_FILE = "semester_plan.json"  # read by schedule.py / semester.py when present
+
+
+# ---------------------------
+# Stage 1: semester totals as one convex transportation problem
+# ---------------------------
+def plan_counts(eligible, assigned, base, weeks, slots, limit=None):
+    """
+    Integer people × cleanups counts for the remaining weeks.
+
+    - each person gets at most `weeks` units (one cleanup per week; an int or one per person)
+    - cleanup j gets at most slots[j] units (per-week slots × remaining weeks)
+    - only eligible cleanups; going over base +1 costs more than any other choice
+    - limit: optional people × cleanups maximum units (see back_to_back_limit)
+    - minimizes the sum of squared deviations of (assigned + counts) from base
+
+    Solved as a min-cost flow with convex (marginal) unit costs by successive
+    shortest paths over the cleanup nodes, like the "flow" engine in cleanup.py:
+    moving one unit of a person from cleanup j to k is the cheapest j -> k edge.
+
+    People with the same eligibility, base, counts, limits and weeks have the
+    same marginal costs, so they are kept as classes with a member count. A
+    shortest path then carries as many units as its classes have people (and
+    the last cleanup has free slots), each unit moving different people of
+    the same class at the same cost. The number of augmentations depends on
+    the number of distinct classes, not on the number of slots.
+    """
+    n, m = eligible.shape
+    weeks = np.broadcast_to(np.asarray(weeks, dtype=np.int64), (n,))
+    slots = np.asarray(slots, dtype=np.int64)
+    if n == 0 or m == 0:
+        return np.zeros((n, m), dtype=np.int64)
+
+    if limit is None:
+        limit = np.full((n, m), int(weeks.max()), dtype=np.int64)
+    eligible = eligible & (limit > 0)
+
+    # Larger than any sum of quadratic marginals along a path of m edges
+    over = 4 * m * (int(weeks.max()) + int(np.abs(base).max()) + int(assigned.max()) + 2) + 1
+    cols = np.arange(m)
+
+    # Static part of each person (never changes) and their classes (static part + counts)
+    static_rows = np.hstack([eligible, base, assigned, limit, weeks[:, None]]).astype(np.int64)
+    statics, static_of = np.unique(static_rows, axis=0, return_inverse=True)
+    static_of = static_of.reshape(-1)
+    s_eligible = statics[:, :m].astype(bool)
+    s_base = statics[:, m:2 * m]
+    s_assigned = statics[:, 2 * m:3 * m]
+    s_limit = statics[:, 3 * m:4 * m]
+    s_weeks = statics[:, 4 * m]
+
+    class_static = []          # static id per class
+    class_x = []               # counts row per class
+    members = []               # person indices per class
+    class_id = {}              # (static id, counts bytes) -> class
+
+    def class_for(static, x_row):
+        key = (static, x_row.tobytes())
+        c = class_id.get(key)
+        if c is None:
+            c = class_id[key] = len(members)
+            class_static.append(static)
+            class_x.append(x_row)
+            members.append([])
+        return c
+
+    zero = np.zeros(m, dtype=np.int64)
+    for s in range(len(statics)):
+        members[class_for(s, zero)].extend(np.flatnonzero(static_of == s).tolist())
+
+    load = np.zeros(m, dtype=np.int64)
+
+    while (load < slots).any():
+        st = np.array(class_static)
+        x = np.array(class_x)
+        count = np.array([len(p) for p in members])
+        alive = count > 0
+
+        d = s_assigned[st] + x - s_base[st]
+        can_add = alive[:, None] & s_eligible[st] & (x < s_limit[st])
+        add = np.where(can_add, 2 * d + 1 + np.where(d >= 1, over, 0), np.inf)
+        remove = np.where(alive[:, None] & (x > 0), 2 * d - 1 + np.where(d >= 2, over, 0), np.inf)
+
+        # source -> cleanup through the cheapest class with weeks left
+        free = np.flatnonzero(alive & (x.sum(axis=1) < s_weeks[st]))
+        if free.size == 0:
+            break
+        dist = add[free].min(axis=0)
+        mover = free[add[free].argmin(axis=0)]
+        pred = np.full(m, -1, dtype=np.int64)
+
+        # j -> k by moving one member of the cheapest class from j to k
+        has_j = np.isfinite(remove)
+        delta = np.where(has_j[:, :, None], add[:, None, :] - np.where(has_j, remove, 0)[:, :, None], np.inf)
+        delta[:, cols, cols] = np.inf
+        move_cost = delta.min(axis=0)
+        move_who = delta.argmin(axis=0)
+
+        # Bellman-Ford over the cleanup nodes (edges may be negative, no negative cycles)
+        for _ in range(m):
+            through = dist[:, None] + move_cost
+            best_from = through.argmin(axis=0)
+            best = through[best_from, cols]
+            better = best < dist
+            if not better.any():
+                break
+            dist = np.where(better, best, dist)
+            pred = np.where(better, best_from, pred)
+            mover = np.where(better, move_who[best_from, cols], mover)
+
+        reachable = (load < slots) & np.isfinite(dist)
+        if not reachable.any():
+            break
+
+        # The cheapest path to an open cleanup, as (class, from cleanup or -1, to cleanup) moves
+        end = int(np.flatnonzero(reachable)[dist[reachable].argmin()])
+        moves = {}
+        node = end
+        for _ in range(m):
+            moves.setdefault(int(mover[node]), []).append((int(pred[node]), node))
+            if pred[node] == -1:
+                break
+            node = int(pred[node])
+        else:
+            raise RuntimeError("plan_counts: shortest path does not start at the source")
+
+        # Units this path can carry: distinct members per move, free slots at the end.
+        # A class with fewer members than moves has one member make all of them
+        # (the moves touch different cleanups, so their costs still add up).
+        units = int(slots[end] - load[end])
+        for c, path_moves in moves.items():
+            units = min(units, max(count[c] // len(path_moves), 1))
+        for c, path_moves in moves.items():
+            if count[c] < len(path_moves) * units:
+                chunks = [(path_moves, 1)]
+            else:
+                chunks = [([move], units) for move in path_moves]
+            for chunk_moves, size in chunks:
+                x_row = x[c].copy()
+                for j, k in chunk_moves:
+                    if j >= 0:
+                        x_row[j] -= 1
+                    x_row[k] += 1
+                moved = members[c][-size:]
+                del members[c][-size:]
+                members[class_for(class_static[c], x_row)].extend(moved)
+        load[end] += units
+
+    result = np.zeros((n, m), dtype=np.int64)
+    for c, people in enumerate(members):
+        if people:
+            result[people] = class_x[c]
+    return result
+
+
+# ---------------------------
+# Stage 2: split the totals into weeks
+# ---------------------------
+def back_to_back_limit(last, weeks, m):
+    """
+    Most units of each cleanup a person can do in `weeks` weeks (an int or one
+    per person) without a back-to-back: every other week, one less if it was
+    their last cleanup.
+    """
+    weeks = np.broadcast_to(np.asarray(weeks, dtype=np.int64), last.shape)
+    limit = np.repeat(((weeks + 1) // 2)[:, None], m, axis=1)
+    rows = np.flatnonzero(last >= 0)
+    limit[rows, last[rows]] = weeks[rows] // 2
+    return limit
+
+
+def plan_weeks(people, cleanup_types, per_week_actual, base_by_person, assigned_so_far, last_cleanup, weeks,
+               calendar=None):
+    """
+    Plan `weeks` consecutive weeks of in-house assignments for `people`.
+
+    Stage 1 fixes how often each person does each cleanup in those weeks
+    (plan_counts, at most every other week per cleanup so the totals never
+    force a back-to-back). Stage 2 places those counts week by week with the
+    "flow" engine, using the planned totals as the base, so each week the
+    slots go to the people with the most planned units left and back-to-backs
+    cost more than any deficit.
+
+    calendar: optional (per_week_actual, away names) for each of the weeks
+    (availability calendar); by default every week uses per_week_actual and
+    nobody is away.
+
+    Works on copies; the inputs are not changed. Returns
+    (targets, selections, forced) where targets is the people × cleanups
+    count array, selections one {person: cleanup} dict per week and forced the
+    number of back-to-backs the placement could not avoid.
+    """
+    assigned_so_far = {p: dict(assigned_so_far.get(p, {})) for p in people}
+    last_cleanup = {p: last_cleanup.get(p) for p in people}
+    base, assigned, eligible, last = _in_house_arrays(
+        people, cleanup_types, base_by_person, assigned_so_far, last_cleanup
+    )
+
+    calendar = calendar or [(per_week_actual, ())] * weeks
+    slots = [sum(max(quotas.get(c, 0), 0) for quotas, _ in calendar) for c in cleanup_types]
+    person_weeks = np.array([sum(p not in away for _, away in calendar) for p in people], dtype=np.int64)
+    limit = back_to_back_limit(last, person_weeks, len(cleanup_types))
+    x = plan_counts(eligible, assigned, base, person_weeks, slots, limit)
+
+    # Planned totals as the base: the flow engine's deficit is then "planned units left"
+    plan_base = {
+        p: {c: int(assigned[i, j] + x[i, j]) for j, c in enumerate(cleanup_types) if eligible[i, j]}
+        for i, p in enumerate(people)
+    }
+    assign = ENGINES["flow"]
+    selections = []
+    forced = 0
+    for quotas, away in calendar:
+        present = [p for p in people if p not in away]
+        selected = assign(
+            present, cleanup_types, quotas, plan_base, assigned_so_far, last_cleanup, None, ScheduleStats()
+        )
+        for person, cleanup in selected.items():
+            forced += last_cleanup[person] == cleanup
+            assigned_so_far[person][cleanup] = assigned_so_far[person].get(cleanup, 0) + 1
+            last_cleanup[person] = cleanup
+        selections.append(selected)
+
+    return x, selections, forced
+
+
+def plan_semester(df, config, checkpoint):
+    """
+    Plan every remaining week's in-house assignments at once (plan_weeks over
+    the rest of the semester). Out-of-house people stay on the round robin.
+
+    Returns {"from_week", "num_weeks", "targets": {person: {cleanup: n}},
+    "weeks": {"<week>": {person: cleanup}}}.
+    """
+    # schedule.py imports this module, so its helpers are imported here
+    from schedule import build_people
+
+    cleanup_types = config["cleanup_types"]
+    num_weeks = config["num_weeks"]
+    base_by_person, out_house_people, per_week_actual = build_people(df, config, checkpoint.get("quotas"))
+
+    from_week = checkpoint["current_week"] + 1
+    weeks = num_weeks - from_week + 1
+    if weeks <= 0:
+        raise RuntimeError("All weeks have already been scheduled.")
+
+    available = set(df.loc[df["availability"].astype(int) == 1, "name"])
+    out_house_set = set(out_house_people)
+    people = [p for p in df["name"] if p in available and p not in out_house_set and base_by_person.get(p)]
+
+    # Availability calendar: each week's quotas and absences from init.py's table
+    calendar = []
+    for week in range(from_week, num_weeks + 1):
+        away, week_quotas = week_availability(df, config, week)
+        calendar.append((per_week_actual if week_quotas is None else week_quotas, away))
+
+    x, selections, _ = plan_weeks(
+        people, cleanup_types, per_week_actual, base_by_person,
+        checkpoint["assigned_so_far"], checkpoint["last_cleanup"], weeks, calendar
+    )
+
+    targets = {
+        p: {c: int(x[i, j]) for j, c in enumerate(cleanup_types) if x[i, j] > 0}
+        for i, p in enumerate(people)
+    }
+    planned = {str(from_week + k): selected for k, selected in enumerate(selections)}
+    return {"from_week": from_week, "num_weeks": num_weeks, "targets": targets, "weeks": planned}
+
+
+# ---------------------------
+# Rolling horizon (config "lookahead_weeks")
+# ---------------------------
+MAX_LOOKAHEAD_WEEKS = 8  # keeps a weekly run interactive (cost grows linearly with the window)
+
+
+def lookahead_week(people, cleanup_types, calendar, base_by_person, assigned_so_far, last_cleanup,
+                   horizon, stats):
+    """
+    This week's in-house assignments chosen with the next `horizon` weeks in
+    mind: plan_weeks over this week plus the horizon, keeping only the first
+    week. The tentative later weeks are thrown away and re-planned next week.
+
+    calendar: (per_week_actual, away names) for this week and each horizon
+    week, so every week is planned with its own quotas and absences.
+    """
+    horizon = min(horizon, MAX_LOOKAHEAD_WEEKS)
+    calendar = calendar[:horizon + 1]
+    people = [p for p in people if base_by_person.get(p)]
+    _, selections, forced = plan_weeks(
+        people, cleanup_types, calendar[0][0], base_by_person, assigned_so_far, last_cleanup, len(calendar),
+        calendar
+    )
+    stats.count("lookahead_weeks", horizon)
+    stats.count("lookahead_back_to_backs", forced)
+    return selections[0]
+
+
+# ---------------------------
+# Plan file
+# ---------------------------
+def save_plan(plan, plan_file=PLAN_FILE):
+    tmp_file = plan_file + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(plan, f, indent=4)
+    os.replace(tmp_file, plan_file)
+
+
+def load_plan(plan_file=PLAN_FILE):
+    """The saved plan, or None when there is none."""
+    if not os.path.exists(plan_file):
+        return None
+    with open(plan_file, "r") as f:
+        return json.load(f)
+
+
+def planned_week(plan, week):
+    """Planned in-house assignments for `week` ({} when the plan does not cover it)."""
+    if not plan:
+        return {}
+    return plan.get("weeks", {}).get(str(week), {})
+
+
+def make_plan(workdir="."):
+    """
+    Load a workspace, plan its remaining weeks and save semester_plan.json.
+    """
+    from schedule import EXCEL_FILE, CONFIG_FILE, load_actives, load_config
+
+    df = load_actives(os.path.join(workdir, EXCEL_FILE))
+    config = load_config(os.path.join(workdir, CONFIG_FILE))
+    checkpoint = load_checkpoint(os.path.join(workdir, CHECKPOINT_FILE))
+
+    start = time.perf_counter()
+    plan = plan_semester(df, config, checkpoint)
+    seconds = time.perf_counter() - start
+
+    save_plan(plan, os.path.join(workdir, PLAN_FILE))
+    print(f"🗺 Planned weeks {plan['from_week']}-{plan['num_weeks']} for {len(plan['targets'])} in-house people "
+          f"in {seconds:.2f}s ({PLAN_FILE})")
+    return plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Plan the rest of the semester at once ({PLAN_FILE}).")
+    parser.add_argument("--clear", action="store_true", help=f"remove {PLAN_FILE} (back to week-by-week scheduling)")
+    args = parser.parse_args()
+
+    if args.clear:
+        if os.path.exists(PLAN_FILE):
+            os.remove(PLAN_FILE)
+        print(f"✅ {PLAN_FILE} removed")
+        return
+
+    make_plan()
+
+
+if __name__ == "__main__":
+    main()
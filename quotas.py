@@ -0,0 +1,196 @@
+import math
+from datetime import datetime
+
+CLEANUP_TYPES = [
+    'kitchen',
+    'deck_0',
+    'stairs',
+    'deck_brush',
+    'deck_1',
+    'bathroom_2',
+    'bathroom_3',
+]
+
+MIN_PER_WEEK = {
+    "deck_0": 3,
+    "kitchen": 5,
+    "stairs": 2,
+    "deck_brush": 2,
+    "deck_1": 2,
+    "bathroom_2": 2,
+    "bathroom_3": 2,
+}
+
+
+def compute_num_weeks(start_date_str, end_date_str):
+    start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
+    end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
+
+    total_days = (end_date - start_date).days + 1
+    return math.ceil(total_days / 7)
+
+
+def compute_per_week_actual(min_per_week, inhouse_count):
+    """
+    Distribute in-house people beyond the minimums over the cleanups, round-robin
+    in min_per_week order (bathrooms grow as a pair, deck_brush by 2 when possible).
+    """
+    extra_per_week = inhouse_count - sum(min_per_week.values())
+    cleanup_order = list(min_per_week.keys())
+
+    per_week_actual = min_per_week.copy()
+    i = 0
+    while extra_per_week > 0:
+        cleanup = cleanup_order[i % len(cleanup_order)]
+
+        # Special case: bathroom pair must be incremented together
+        if cleanup == "bathroom_2":
+            if extra_per_week >= 2:
+                per_week_actual["bathroom_2"] += 1
+                per_week_actual["bathroom_3"] += 1
+                extra_per_week -= 2
+            else:
+                # Not enough people to increment both bathrooms; skip bathroom_2 for now
+                i += 1
+                continue
+        elif cleanup == "deck_brush":
+            # Increment by 2 unless only 1 person left
+            inc = 2 if extra_per_week >= 2 else 1
+            per_week_actual["deck_brush"] += inc
+            extra_per_week -= inc
+        else:
+            per_week_actual[cleanup] += 1
+            extra_per_week -= 1
+
+        i += 1
+
+    return per_week_actual
+
+
+def compute_global_base(per_week_actual, num_weeks, inhouse_count):
+    """
+    Theoretical per-person cleanup target over the semester (largest remainder rounding).
+    """
+    exact = {k: (v * num_weeks) / inhouse_count for k, v in per_week_actual.items()}
+    global_base = {k: int(exact[k]) for k in exact}
+
+    missing = num_weeks - sum(global_base.values())
+    fractions = sorted(exact.keys(), key=lambda k: exact[k] - global_base[k], reverse=True)
+    for k in fractions[:missing]:
+        global_base[k] += 1
+
+    return global_base
+
+
+def compute_base_by_inhouse(global_base):
+    """
+    Base targets for in-house groups 2 & 3 (each group only uses its own bathroom).
+    """
+    base_by_inhouse = {}
+
+    # deck 2: cannot do bathroom_3
+    b2 = global_base.copy()
+    b2["bathroom_2"] += b2.get("bathroom_3",0)
+    b2.pop("bathroom_3", None)
+    base_by_inhouse[2] = b2
+
+    # deck 3: cannot do bathroom_2
+    b3 = global_base.copy()
+    b3["bathroom_3"] += b3.get("bathroom_2",0)
+    b3.pop("bathroom_2", None)
+    base_by_inhouse[3] = b3
+
+    return base_by_inhouse
+
+
+class QuotaTracker:
+    """
+    per_week_actual with unavailable in-house members taken out, updated one
+    availability change at a time instead of from the whole roster.
+
+    Each unavailable in-house member removes one slot from the cleanup with the
+    most room above its minimum (the first in cleanup_types on ties). Removed
+    slots are kept as a stack, so a member coming back restores the slot the
+    last removal took, and any sequence of changes gives the same quotas as
+    removing every unavailable member from the config's per_week_actual.
+
+    It also tracks the remaining-week targets: `remaining` is the slots left
+    per cleanup over the `weeks_left` unscheduled weeks, moved by each step
+    and by weeks being scheduled or rolled back (advance_quota_state).
+    state() is the JSON form kept in checkpoint["quotas"] by the journal, so
+    scheduling reads the quotas instead of recounting the roster.
+    """
+
+    def __init__(self, cleanup_types, per_week_actual, min_per_week, weeks_left=0):
+        self.cleanup_types = list(cleanup_types)
+        self.per_week_actual = dict(per_week_actual)
+        self.min_per_week = dict(min_per_week)
+        self.removed = []     # cleanups a slot was taken from, in order
+        self.unavailable = 0  # unavailable in-house members (can exceed len(removed) at the minimums)
+        self.weeks_left = weeks_left
+        self.remaining = {c: self.per_week_actual.get(c, 0) * weeks_left for c in self.cleanup_types}
+
+    @classmethod
+    def from_config(cls, config, unavailable=0, weeks_left=0):
+        tracker = cls(config["cleanup_types"], config["per_week_actual"], config.get("min_per_week", {}), weeks_left)
+        tracker.set_unavailable(unavailable)
+        return tracker
+
+    @classmethod
+    def from_state(cls, config, state):
+        tracker = cls(config["cleanup_types"], state["per_week_actual"], config.get("min_per_week", {}))
+        tracker.removed = list(state["removed"])
+        tracker.unavailable = state["unavailable"]
+        tracker.weeks_left = state["weeks_left"]
+        tracker.remaining = dict(state["remaining"])
+        return tracker
+
+    def state(self):
+        return {
+            "per_week_actual": dict(self.per_week_actual),
+            "removed": list(self.removed),
+            "unavailable": self.unavailable,
+            "weeks_left": self.weeks_left,
+            "remaining": dict(self.remaining),
+        }
+
+    @property
+    def short(self):
+        """Unavailable members whose slot could not be removed (every cleanup at its minimum)."""
+        return self.unavailable - len(self.removed)
+
+    def change(self, delta):
+        """Apply `delta` in-house members becoming unavailable (negative: available again)."""
+        for _ in range(abs(delta)):
+            if delta > 0:
+                self.unavailable += 1
+                candidates = [
+                    c for c in self.cleanup_types
+                    if self.per_week_actual.get(c, 0) > self.min_per_week.get(c, 0)
+                ]
+                if candidates:
+                    # Pick the one with the maximum difference between actual and min
+                    c = max(candidates, key=lambda c: self.per_week_actual[c] - self.min_per_week.get(c, 0))
+                    self.per_week_actual[c] -= 1
+                    self.remaining[c] -= self.weeks_left
+                    self.removed.append(c)
+            elif self.unavailable > 0:
+                self.unavailable -= 1
+                if len(self.removed) > self.unavailable:
+                    c = self.removed.pop()
+                    self.per_week_actual[c] += 1
+                    self.remaining[c] += self.weeks_left
+        return self.per_week_actual
+
+    def set_unavailable(self, count):
+        return self.change(count - self.unavailable)
+
+
+def advance_quota_state(state, weeks):
+    """
+    Move a stored QuotaTracker state `weeks` weeks on (negative after a
+    rollback): each scheduled week uses up one week of the current quotas.
+    """
+    for c, quota in state["per_week_actual"].items():
+        state["remaining"][c] = state["remaining"].get(c, 0) - weeks * quota
+    state["weeks_left"] -= weeks
@@ -1,104 +1,105 @@
+import argparse
+import csv
 import json
-import pandas as pd
-from collections import defaultdict
 import os
-
-# ---------------------------
-# Inputs
-# ---------------------------
-PERSON = input("Person name: ").strip()
-WEEK = int(input("Week number: ").strip())
-NEW_CLEANUP = input("New cleanup: ").strip()
+import sys
+import database
+from journal import append_event, load_checkpoint, reassign_changes
+from roster import apply_count_deltas, read_roster, write_roster
+from weekly import WEEKLY_CSV_FILE, write_weeks
 
 ACTIVES_FILE = "actives.xlsx"
-WEEKLY_FILE = "weekly_assignments.xlsx"
 CHECKPOINT_FILE = "checkpoint.json"
+CONFIG_FILE = "cleanup_config.json"
+
 
 # ---------------------------
-# Load weekly_assignments.xlsx
+# Inputs
 # ---------------------------
-weekly_df = pd.read_excel(WEEKLY_FILE)
-
-if "week" not in weekly_df.columns:
-    raise RuntimeError("❌ weekly_assignments.xlsx missing 'week' column")
-
-if PERSON not in weekly_df.columns:
-    raise RuntimeError(f"❌ {PERSON} not found in weekly_assignments.xlsx")
-
-row_idx = weekly_df.index[weekly_df["week"] == WEEK]
-if len(row_idx) == 0:
-    raise RuntimeError(f"❌ Week {WEEK} not found")
-
-row_idx = row_idx[0]
-OLD_CLEANUP = weekly_df.at[row_idx, PERSON]
-
-if pd.isna(OLD_CLEANUP):
-    raise RuntimeError(f"❌ {PERSON} had no assignment in week {WEEK}")
-
-if OLD_CLEANUP == NEW_CLEANUP:
-    raise RuntimeError("❌ Old and new cleanup are the same")
-
-# Apply change
-weekly_df.at[row_idx, PERSON] = NEW_CLEANUP
-weekly_df.to_excel(WEEKLY_FILE, index=False)
-
-print(f"📘 weekly_assignments.xlsx updated: {PERSON} {OLD_CLEANUP} → {NEW_CLEANUP}")
+def read_batch(path):
+    """
+    Reassignments from a CSV (columns name, week, cleanup) or a JSON list of
+    {"name": ..., "week": ..., "cleanup": ...} objects.
+    Returns a list of (person, week, new_cleanup).
+    """
+    if path.lower().endswith(".json"):
+        with open(path, "r") as f:
+            rows = json.load(f)
+    else:
+        with open(path, "r", newline="") as f:
+            rows = list(csv.DictReader(f))
+
+    changes = []
+    for i, row in enumerate(rows, 1):
+        try:
+            changes.append((str(row["name"]).strip(), int(row["week"]), str(row["cleanup"]).strip()))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"❌ {path} entry {i} needs name, week and cleanup: {row}")
+    return changes
+
+
+parser = argparse.ArgumentParser(description="Change cleanup assignments after the fact.")
+parser.add_argument("--batch", default=None, metavar="FILE",
+                    help="CSV or JSON file of reassignments (name, week, cleanup); prompts for one if omitted")
+args = parser.parse_args()
+
+if args.batch:
+    if not os.path.exists(args.batch):
+        raise RuntimeError(f"❌ {args.batch} not found")
+    CHANGES = read_batch(args.batch)
+    if not CHANGES:
+        raise RuntimeError(f"❌ {args.batch} has no reassignments")
+else:
+    PERSON = input("Person name: ").strip()
+    WEEK = int(input("Week number: ").strip())
+    NEW_CLEANUP = input("New cleanup: ").strip()
+    CHANGES = [(PERSON, WEEK, NEW_CLEANUP)]
+
+with open(CONFIG_FILE, "r") as f:
+    config = json.load(f)
 
 # ---------------------------
-# Load checkpoint.json
+# SQLite backend: one transaction, no Excel rewrites
 # ---------------------------
-with open(CHECKPOINT_FILE, "r") as f:
-    checkpoint = json.load(f)
+if database.uses_sqlite(config):
+    con = database.connect()
+    olds = database.reassign_many(con, CHANGES, config["cleanup_types"])
+    con.close()
+    for (person, week, new), old in zip(CHANGES, olds):
+        print(f"🧠 {database.DB_FILE} updated: {person} week {week}: {old} → {new}")
+    print(f"\n✅ {len(CHANGES)} reassignment(s) complete")
+    sys.exit(0)
 
+# ---------------------------
+# Load checkpoint & roster, validate every change before writing anything
+# ---------------------------
+checkpoint = load_checkpoint(CHECKPOINT_FILE)
 weekly_history = checkpoint["weekly_history"]
+df = read_roster(ACTIVES_FILE)
 
-if str(WEEK) not in weekly_history:
-    raise RuntimeError(f"❌ Week {WEEK} missing in checkpoint")
-
-weekly_history[str(WEEK)][PERSON] = NEW_CLEANUP
+changes = reassign_changes(weekly_history, CHANGES, config["cleanup_types"], set(df["name"]))
 
 # ---------------------------
-# Recompute assigned_so_far from history
+# Journal all reassignments as one event (counts and last_cleanup are updated by journal.py)
 # ---------------------------
-assigned_so_far = defaultdict(lambda: defaultdict(int))
-last_cleanup = defaultdict(lambda: None)
+append_event(checkpoint, {"event": "reassign", "changes": changes}, CHECKPOINT_FILE)
 
-weeks_sorted = sorted(weekly_history.keys(), key=int)
+for c in changes:
+    print(f"🧠 checkpoint.json updated: {c['person']} week {c['week']}: {c['old']} → {c['new']}")
 
-for wk in weeks_sorted:
-    for person, cleanup in weekly_history[wk].items():
-        assigned_so_far[person][cleanup] += 1
-        last_cleanup[person] = cleanup
-
-checkpoint["assigned_so_far"] = {
-    p: dict(c) for p, c in assigned_so_far.items()
-}
-checkpoint["last_cleanup"] = dict(last_cleanup)
-
-with open(CHECKPOINT_FILE, "w") as f:
-    json.dump(checkpoint, f, indent=4)
-
-print("🧠 checkpoint.json updated")
+write_weeks(weekly_history, WEEKLY_CSV_FILE)
+print(f"📘 {WEEKLY_CSV_FILE} updated")
 
 # ---------------------------
-# Update actives.xlsx
+# Update actives.xlsx with the combined count deltas
 # ---------------------------
-df = pd.read_excel(ACTIVES_FILE)
-
-if PERSON not in df["name"].values:
-    raise RuntimeError(f"❌ {PERSON} not found in actives.xlsx")
-
-# Ensure columns exist
-for c in [OLD_CLEANUP, NEW_CLEANUP]:
-    if c not in df.columns:
-        df[c] = 0
+deltas = [(c["person"], c["old"], -1) for c in changes] + [(c["person"], c["new"], 1) for c in changes]
 
-idx = df.index[df["name"] == PERSON][0]
-df.at[idx, OLD_CLEANUP] -= 1
-df.at[idx, NEW_CLEANUP] += 1
+# Missing columns are created by apply_count_deltas
+apply_count_deltas(df, deltas)
 
-df.to_excel(ACTIVES_FILE, index=False)
+write_roster(df, ACTIVES_FILE)
 
 print("📊 actives.xlsx updated")
 
-print(f"\n✅ Reassignment complete: {PERSON}, week {WEEK}")
+print(f"\n✅ {len(changes)} reassignment(s) complete (run weekly.py export to refresh weekly_assignments.xlsx)")
@@ -1,21 +1,36 @@
+import argparse
 import json
 import os
-import pandas as pd
-from collections import defaultdict
+import csv
+import numpy as np
+from openpyxl import load_workbook
+from journal import save_checkpoint
+from roster import read_roster, write_roster
+from weekly import WEEKLY_CSV_FILE, WEEKLY_EXCEL_FILE, write_weeks
 
 # ---------------------------
 # File paths
 # ---------------------------
-WEEKLY_EXCEL_FILE = "weekly_assignments.xlsx"  # source of truth
 CHECKPOINT_FILE = "checkpoint.json"
 ACTIVES_FILE = "actives.xlsx"
 CONFIG_FILE = "cleanup_config.json"
 
+# ---------------------------
+# Source of truth: weekly_assignments.csv, or the Excel pivot with --from-excel
+# (e.g. after editing weekly_assignments.xlsx by hand)
+# ---------------------------
+parser = argparse.ArgumentParser(description="Rebuild checkpoint.json and actives.xlsx counts from the weekly record.")
+parser.add_argument("--from-excel", action="store_true", help=f"rebuild from {WEEKLY_EXCEL_FILE} instead of {WEEKLY_CSV_FILE}")
+args = parser.parse_args()
+
+from_excel = args.from_excel or not os.path.exists(WEEKLY_CSV_FILE)
+source_file = WEEKLY_EXCEL_FILE if from_excel else WEEKLY_CSV_FILE
+
 # ---------------------------
 # Sanity check
 # ---------------------------
-if not os.path.exists(WEEKLY_EXCEL_FILE):
-    raise RuntimeError(f"❌ {WEEKLY_EXCEL_FILE} not found. Cannot rebuild.")
+if not os.path.exists(source_file):
+    raise RuntimeError(f"❌ {source_file} not found. Cannot rebuild.")
 
 # ---------------------------
 # Load config
@@ -26,76 +41,116 @@ with open(CONFIG_FILE, "r") as f:
 cleanup_types = config["cleanup_types"]
 
 # ---------------------------
-# Load weekly assignments
+# Read the weekly record one (week, person, cleanup) at a time
 # ---------------------------
-weekly_df = pd.read_excel(WEEKLY_EXCEL_FILE)
+def iter_excel_rows(path):
+    """
+    Rows of the weekly pivot from a read-only workbook (never loads the sheet).
+    """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        if "week" not in header:
+            raise RuntimeError(f"❌ {path} must have a 'week' column")
+        week_col = header.index("week")
+        person_cols = [(j, str(h)) for j, h in enumerate(header) if j != week_col and h is not None]
+
+        for row in rows:
+            if week_col >= len(row) or row[week_col] is None:
+                continue
+            week = int(row[week_col])
+            for j, person in person_cols:
+                if j < len(row) and row[j] is not None:
+                    yield week, person, str(row[j])
+    finally:
+        wb.close()
+
 
-# Validate columns
-if "week" not in weekly_df.columns:
-    raise RuntimeError("❌ weekly_assignments.xlsx must have a 'week' column")
+def iter_csv_rows(path):
+    with open(path, "r", newline="") as f:
+        for row in csv.DictReader(f):
+            yield int(row["week"]), row["name"], row["cleanup"]
 
-person_columns = [c for c in weekly_df.columns if c != "week"]
 
 # ---------------------------
 # Load actives.xlsx to preserve all original columns
 # ---------------------------
-df = pd.read_excel(ACTIVES_FILE)
-names_in_df = df["name"].tolist()
+df = read_roster(ACTIVES_FILE)
 
-# ---------------------------
-# Initialize assigned_so_far and last_cleanup
-# ---------------------------
-assigned_so_far = {name: defaultdict(int) for name in names_in_df}
-last_cleanup = {name: None for name in names_in_df}
-weekly_history = {}
+# Integer ids: roster people first (row order), then anyone only in the record
+names = df["name"].tolist()
+person_id = {name: i for i, name in enumerate(names)}
+cleanups = list(cleanup_types)
+cleanup_id = {c: j for j, c in enumerate(cleanups)}
 
 # ---------------------------
-# Process each week in order
+# Accumulate counts and last cleanups in compact arrays
 # ---------------------------
-for _, row in weekly_df.sort_values("week").iterrows():
-    week = int(row["week"])
-    weekly_assignments = {}
-    for person in person_columns:
-        cleanup = row[person]
-        if pd.notna(cleanup):
-            cleanup = str(cleanup)
-            assigned_so_far[person][cleanup] += 1
-            last_cleanup[person] = cleanup
-            weekly_assignments[person] = cleanup
-    weekly_history[str(week)] = weekly_assignments
+# weekly_history is kept too: checkpoint.json embeds it, so memory grows with
+# the record (the sheet is never loaded as a DataFrame, though)
+counts = np.zeros((max(len(names), 1), len(cleanups)), dtype=np.int32)
+last_week = np.full(counts.shape[0], -1, dtype=np.int32)
+last_id = np.full(counts.shape[0], -1, dtype=np.int32)
+weekly_history = {}
 
-current_week = weekly_df["week"].max()
+rows = iter_excel_rows(WEEKLY_EXCEL_FILE) if from_excel else iter_csv_rows(WEEKLY_CSV_FILE)
+for week, person, cleanup in rows:
+    i = person_id.get(person)
+    if i is None:
+        i = person_id[person] = len(names)
+        names.append(person)
+        if i >= counts.shape[0]:
+            grow = counts.shape[0]
+            counts = np.vstack([counts, np.zeros((grow, counts.shape[1]), dtype=np.int32)])
+            last_week = np.concatenate([last_week, np.full(grow, -1, dtype=np.int32)])
+            last_id = np.concatenate([last_id, np.full(grow, -1, dtype=np.int32)])
+    j = cleanup_id.get(cleanup)
+    if j is None:
+        j = cleanup_id[cleanup] = len(cleanups)
+        cleanups.append(cleanup)
+        counts = np.hstack([counts, np.zeros((counts.shape[0], 1), dtype=np.int32)])
+
+    counts[i, j] += 1
+    if week >= last_week[i]:
+        last_week[i], last_id[i] = week, j
+    weekly_history.setdefault(str(week), {})[person] = cleanup
+
+if not weekly_history:
+    raise RuntimeError(f"❌ {source_file} has no weeks. Cannot rebuild.")
+
+counts = counts[:len(names)]
+last_id = last_id[:len(names)]
+current_week = max(int(wk) for wk in weekly_history)
 
 # ---------------------------
 # Save checkpoint.json
 # ---------------------------
 checkpoint = {
     "current_week": int(current_week),
-    "assigned_so_far": {p: dict(assigned_so_far[p]) for p in assigned_so_far},
-    "last_cleanup": last_cleanup,
-    "weekly_history": weekly_history,
+    "assigned_so_far": {
+        p: {cleanups[j]: int(counts[i, j]) for j in np.flatnonzero(counts[i])} for i, p in enumerate(names)
+    },
+    "last_cleanup": {p: (cleanups[last_id[i]] if last_id[i] >= 0 else None) for i, p in enumerate(names)},
+    "weekly_history": {wk: weekly_history[wk] for wk in sorted(weekly_history, key=int)},
     "round_robin_index": int(current_week)
 }
 
-with open(CHECKPOINT_FILE, "w") as f:
-    json.dump(checkpoint, f, indent=4)
+# Supersedes any journaled events
+save_checkpoint(checkpoint, CHECKPOINT_FILE)
+
+print(f"✅ checkpoint.json rebuilt from {source_file} with round-robin info")
 
-print(f"✅ checkpoint.json rebuilt from {WEEKLY_EXCEL_FILE} with round-robin info")
+if from_excel:
+    write_weeks(weekly_history, WEEKLY_CSV_FILE)
+    print(f"✅ {WEEKLY_CSV_FILE} rebuilt from {WEEKLY_EXCEL_FILE}")
 
 # ---------------------------
 # Rebuild actives.xlsx WITHOUT dropping existing columns
 # ---------------------------
-# Ensure all cleanup columns exist
-for c in cleanup_types:
-    if c not in df.columns:
-        df[c] = 0
-
-# Fill counts from assigned_so_far
-for idx, row in df.iterrows():
-    name = row["name"]
-    if name in assigned_so_far:
-        for c in cleanup_types:
-            df.at[idx, c] = assigned_so_far[name].get(c, 0)
+# Every cleanup column (including any outside the config) filled in one assignment;
+# the roster's rows are the first len(df) ids
+df[cleanups] = counts[:len(df)]
 
-df.to_excel(ACTIVES_FILE, index=False)
+write_roster(df, ACTIVES_FILE)
 print(f"✅ {ACTIVES_FILE} rebuilt with cumulative counts (all original columns preserved)")
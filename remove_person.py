@@ -1,19 +1,36 @@
-import sys
+import argparse
 import json
 import os
 import shutil
-import math
 from datetime import datetime
 import pandas as pd
 from collections import defaultdict
+import database
+from journal import JOURNAL_FILE, load_checkpoint, save_checkpoint
+from availability import calendar_config
+from quotas import compute_base_by_inhouse, compute_global_base, compute_per_week_actual
+from roster import read_roster, set_counts, write_roster
+from weekly import WEEKLY_CSV_FILE, read_weeks, write_weeks
 
 # ---------------------------
 # Arguments
 # ---------------------------
-if len(sys.argv) != 2:
-    raise RuntimeError("Usage: python remove_person.py 'Person Name'")
+parser = argparse.ArgumentParser(description="Remove members from the roster, history and quotas in one pass.")
+parser.add_argument("names", nargs="*", help="names of the people to remove")
+parser.add_argument("--file", default=None, metavar="FILE", help="text file with one name per line to remove as well")
+args = parser.parse_args()
 
-PERSON = sys.argv[1]
+PEOPLE = [n.strip() for n in args.names]
+if args.file:
+    with open(args.file, "r") as f:
+        PEOPLE += [line.strip() for line in f]
+PEOPLE = list(dict.fromkeys(n for n in PEOPLE if n))
+
+if not PEOPLE:
+    raise RuntimeError("Usage: python remove_person.py 'Person Name' ['Other Name' ...] [--file names.txt]")
+
+REMOVE = set(PEOPLE)
+LABEL = PEOPLE[0] if len(PEOPLE) == 1 else f"{len(PEOPLE)} people"
 
 # ---------------------------
 # Files
@@ -23,149 +40,135 @@ ACTIVES_FILE = "actives.xlsx"
 CHECKPOINT_FILE = "checkpoint.json"
 CONFIG_FILE = "cleanup_config.json"
 
+with open(CONFIG_FILE, "r") as f:
+    USE_SQLITE = database.uses_sqlite(json.load(f))
+
 # ---------------------------
 # Backup
 # ---------------------------
 ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-backup_dir = f"backup_remove_{PERSON}_{ts}"
+backup_dir = f"backup_remove_{PEOPLE[0] if len(PEOPLE) == 1 else f'{len(PEOPLE)}_people'}_{ts}"
 os.makedirs(backup_dir, exist_ok=True)
 
-for f in [WEEKLY_FILE, ACTIVES_FILE, CHECKPOINT_FILE, CONFIG_FILE]:
+for f in [WEEKLY_CSV_FILE, WEEKLY_FILE, ACTIVES_FILE, CHECKPOINT_FILE, JOURNAL_FILE, database.DB_FILE, CONFIG_FILE]:
     if os.path.exists(f):
         shutil.copy(f, os.path.join(backup_dir, f))
 
 print(f"✅ Backup created: {backup_dir}")
 
-# ---------------------------
-# 1️⃣ Update weekly_assignments.xlsx
-# ---------------------------
-weekly_df = pd.read_excel(WEEKLY_FILE)
-
-if PERSON not in weekly_df.columns:
-    raise RuntimeError(f"❌ {PERSON} not found in weekly_assignments.xlsx")
+if USE_SQLITE:
+    # ---------------------------
+    # 1️⃣-3️⃣ Remove from cleanup.db (one transaction)
+    # ---------------------------
+    con = database.connect()
+    df = database.load_members(con)
+    missing = [n for n in PEOPLE if n not in set(df["name"])]
+    if missing:
+        raise RuntimeError(f"❌ Not found in {database.DB_FILE}: {', '.join(missing)}")
+
+    database.remove_members(con, PEOPLE)
+    df = database.load_members(con)
+    con.close()
+    print(f"✅ Removed {LABEL} from {database.DB_FILE}")
+else:
+    # ---------------------------
+    # 1️⃣ Update the weekly record
+    # ---------------------------
+    # checkpoint.json holds the full history; the record files are only a
+    # fallback for a checkpoint without one
+    previous = load_checkpoint(CHECKPOINT_FILE)
+    if previous.get("weekly_history"):
+        weekly_history = {wk: dict(assignments) for wk, assignments in previous["weekly_history"].items()}
+    elif os.path.exists(WEEKLY_CSV_FILE):
+        weekly_history = read_weeks(WEEKLY_CSV_FILE)
+    elif os.path.exists(WEEKLY_FILE):
+        weekly_df = pd.read_excel(WEEKLY_FILE)
+        weekly_history = {
+            str(int(row["week"])): {p: str(row[p]) for p in weekly_df.columns if p != "week" and pd.notna(row[p])}
+            for _, row in weekly_df.iterrows()
+        }
+    else:
+        weekly_history = {}
+
+    df = read_roster(ACTIVES_FILE)
+    known = set(df["name"]).union(*weekly_history.values())
+    missing = [n for n in PEOPLE if n not in known]
+    if missing:
+        raise RuntimeError(f"❌ Not found in {ACTIVES_FILE} or the weekly assignments: {', '.join(missing)}")
+
+    # One pass: drop the removed people and recount everyone else
+    assigned_so_far = defaultdict(lambda: defaultdict(int))
+    last_cleanup = {}
+    for wk in sorted(weekly_history, key=int):
+        assignments = weekly_history[wk] = {p: c for p, c in weekly_history[wk].items() if p not in REMOVE}
+        for p, c in assignments.items():
+            assigned_so_far[p][c] += 1
+            last_cleanup[p] = c
 
-weekly_df = weekly_df.drop(columns=[PERSON])
-weekly_df.to_excel(WEEKLY_FILE, index=False)
+    write_weeks(weekly_history, WEEKLY_CSV_FILE)
 
-print(f"✅ Removed {PERSON} from weekly_assignments.xlsx")
+    if os.path.exists(WEEKLY_FILE):
+        weekly_df = pd.read_excel(WEEKLY_FILE)
+        weekly_df.drop(columns=PEOPLE, errors="ignore").to_excel(WEEKLY_FILE, index=False)
 
-# ---------------------------
-# 2️⃣ Rebuild checkpoint.json
-# ---------------------------
-person_columns = [c for c in weekly_df.columns if c != "week"]
-
-assigned_so_far = {p: defaultdict(int) for p in person_columns}
-last_cleanup = {p: None for p in person_columns}
-weekly_history = {}
-
-for _, row in weekly_df.sort_values("week").iterrows():
-    week = int(row["week"])
-    w_assign = {}
-    for p in person_columns:
-        if pd.notna(row[p]):
-            c = str(row[p])
-            assigned_so_far[p][c] += 1
-            last_cleanup[p] = c
-            w_assign[p] = c
-    weekly_history[str(week)] = w_assign
+    print(f"✅ Removed {LABEL} from the weekly assignments")
 
-checkpoint = {
-    "current_week": int(weekly_df["week"].max()),
-    "assigned_so_far": {p: dict(assigned_so_far[p]) for p in assigned_so_far},
-    "last_cleanup": last_cleanup,
-    "weekly_history": weekly_history
-}
+    # ---------------------------
+    # 2️⃣ Rebuild checkpoint.json
+    # ---------------------------
+    current_week = max((int(wk) for wk in weekly_history), default=0)
 
-with open(CHECKPOINT_FILE, "w") as f:
-    json.dump(checkpoint, f, indent=4)
+    checkpoint = {
+        "current_week": current_week,
+        "assigned_so_far": {p: dict(assigned_so_far[p]) for p in assigned_so_far},
+        "last_cleanup": last_cleanup,
+        "weekly_history": weekly_history,
+        "round_robin_index": previous.get("round_robin_index", current_week)
+    }
 
-print("✅ checkpoint.json rebuilt")
+    # Supersedes any journaled events
+    save_checkpoint(checkpoint, CHECKPOINT_FILE)
 
-# ---------------------------
-# 3️⃣ Update actives.xlsx
-# ---------------------------
-df = pd.read_excel(ACTIVES_FILE)
+    print("✅ checkpoint.json rebuilt")
 
-df = df[df["name"] != PERSON].reset_index(drop=True)
+    # ---------------------------
+    # 3️⃣ Update actives.xlsx (one vectorized write of every count column)
+    # ---------------------------
+    df = df[~df["name"].isin(REMOVE)].reset_index(drop=True)
 
-cleanup_cols = [c for c in df.columns if c not in ["name", "inhouse"]]
+    with open(CONFIG_FILE, "r") as f:
+        cleanup_columns = list(json.load(f)["cleanup_types"])
+    cleanup_columns += sorted({c for counts in assigned_so_far.values() for c in counts} - set(cleanup_columns))
 
-for idx, row in df.iterrows():
-    name = row["name"]
-    for c in cleanup_cols:
-        df.at[idx, c] = assigned_so_far.get(name, {}).get(c, 0)
+    set_counts(df, {name: assigned_so_far.get(name, {}) for name in df["name"]}, cleanup_columns)
 
-df.to_excel(ACTIVES_FILE, index=False)
-print("✅ actives.xlsx updated")
+    write_roster(df, ACTIVES_FILE)
+    print("✅ actives.xlsx updated")
 
 # ---------------------------
-# 4️⃣ Recompute cleanup_config.json
+# 4️⃣ Recompute cleanup_config.json (once, for the remaining roster)
 # ---------------------------
 with open(CONFIG_FILE, "r") as f:
     config = json.load(f)
 
-cleanup_types = config["cleanup_types"]
-min_per_week = config["min_per_week"]
-
 # only inhouse 2 & 3 count
-inhouse_df = df[df["inhouse"].isin([2, 3])]
-inhouse_count = len(inhouse_df)
-
-extra = inhouse_count - sum(min_per_week.values())
-per_week_actual = min_per_week.copy()
-
-order = list(min_per_week.keys())
-i = 0
-while extra > 0:
-    c = order[i % len(order)]
-
-    if c == "bathroom_2":
-        if extra >= 2:
-            per_week_actual["bathroom_2"] += 1
-            per_week_actual["bathroom_3"] += 1
-            extra -= 2
-    elif c == "deck_brush":
-        if extra >= 2:
-            per_week_actual["deck_brush"] += 2
-            extra -= 2
-    else:
-        per_week_actual[c] += 1
-        extra -= 1
-
-    i += 1
-
-# global base
-num_weeks = config["num_weeks"]
-exact = {k: (v * num_weeks) / inhouse_count for k, v in per_week_actual.items()}
-global_base = {k: int(exact[k]) for k in exact}
+inhouse_count = int(df["inhouse"].isin([2, 3]).sum())
 
-missing = inhouse_count - sum(global_base.values())
-fractions = sorted(exact, key=lambda k: exact[k] - global_base[k], reverse=True)
-for k in fractions[:missing]:
-    global_base[k] += 1
-
-# base by inhouse
-b2 = global_base.copy()
-b2["bathroom_2"] += b2.get("bathroom_3", 0)
-b2.pop("bathroom_3", None)
-
-b3 = global_base.copy()
-b3["bathroom_3"] += b3.get("bathroom_2", 0)
-b3.pop("bathroom_2", None)
+per_week_actual = compute_per_week_actual(config["min_per_week"], inhouse_count)
+global_base = compute_global_base(per_week_actual, config["num_weeks"], inhouse_count)
 
 config.update({
     "num_people": len(df),
     "per_week_actual": per_week_actual,
     "global_base": global_base,
-    "base_by_inhouse": {
-        "2": b2,
-        "3": b3
-    }
+    "base_by_inhouse": {str(k): v for k, v in compute_base_by_inhouse(global_base).items()}
 })
+if "start_date" in config:
+    config.update(calendar_config(df, config))  # per-week quota table for the remaining roster
 
 with open(CONFIG_FILE, "w") as f:
     json.dump(config, f, indent=4)
 
 print("✅ cleanup_config.json recalculated")
 
-print(f"\n🎯 {PERSON} fully removed from system safely.")
+print(f"\n🎯 {LABEL} fully removed from system safely.")
@@ -1,116 +1,115 @@
+import argparse
 import json
 import os
-import pandas as pd
-from collections import defaultdict
+import sys
+import database
+from journal import CHECKPOINT_FILE, append_event, journal_path, load_checkpoint
+from weekly import WEEKLY_CSV_FILE, write_weeks
 
-CHECKPOINT_FILE = "checkpoint.json"
 EXCEL_FILE = "actives.xlsx"
-WEEKLY_EXCEL_FILE = "weekly_assignments.xlsx"
+CONFIG_FILE = "cleanup_config.json"
 
 # ---------------------------
-# Sanity checks
+# Arguments
 # ---------------------------
-if not os.path.exists(CHECKPOINT_FILE):
-    raise RuntimeError("❌ checkpoint.json not found. No weeks to rollback.")
+parser = argparse.ArgumentParser(description="Undo the most recently scheduled week(s).")
+group = parser.add_mutually_exclusive_group()
+group.add_argument("--weeks", type=int, default=None, metavar="K", help="roll back the last K weeks (default: 1)")
+group.add_argument("--to-week", type=int, default=None, metavar="N", help="roll back every week after week N")
+args = parser.parse_args()
 
-with open(CHECKPOINT_FILE, "r") as f:
-    checkpoint = json.load(f)
+if args.weeks is not None and args.weeks < 1:
+    raise RuntimeError("❌ --weeks must be at least 1")
+if args.to_week is not None and args.to_week < 0:
+    raise RuntimeError("❌ --to-week must be 0 or more")
 
-current_week = checkpoint.get("current_week", 0)
-weekly_history = checkpoint.get("weekly_history", {})
 
-if current_week == 0 or not weekly_history:
-    raise RuntimeError("❌ No scheduled weeks found to rollback.")
+def target_week(current_week):
+    """Week the schedule is rolled back to (weeks after it are removed)."""
+    if args.to_week is not None:
+        target = args.to_week
+    else:
+        target = current_week - (args.weeks or 1)
 
-# ---------------------------
-# Identify week to rollback
-# ---------------------------
-week_to_delete = str(current_week)
-if week_to_delete not in weekly_history:
-    raise RuntimeError(f"❌ Inconsistent checkpoint: week {week_to_delete} not found.")
+    if target < 0:
+        raise RuntimeError(f"❌ Only {current_week} weeks are scheduled.")
+    if target >= current_week:
+        raise RuntimeError(f"❌ Nothing to roll back: week {current_week} is the latest scheduled week.")
+    return target
 
-week_assignments = weekly_history[week_to_delete]
 
-# ---------------------------
-# Roll back assigned_so_far
-# ---------------------------
-assigned_so_far = {
-    name: defaultdict(int, data)
-    for name, data in checkpoint["assigned_so_far"].items()
-}
+def describe(weeks):
+    return f"week {weeks[0]}" if len(weeks) == 1 else f"weeks {weeks[-1]}-{weeks[0]}"
 
-for person, cleanup in week_assignments.items():
-    if cleanup is not None:
-        assigned_so_far[person][cleanup] -= 1
-        if assigned_so_far[person][cleanup] <= 0:
-            del assigned_so_far[person][cleanup]
 
 # ---------------------------
-# Delete the week from history
+# SQLite backend: one transaction, no Excel rewrites
 # ---------------------------
-del checkpoint["weekly_history"][week_to_delete]
-checkpoint["current_week"] -= 1
+with open(CONFIG_FILE, "r") as f:
+    config = json.load(f)
 
-# Roll back round-robin index
-if "round_robin_index" in checkpoint and checkpoint["round_robin_index"] > 0:
-    checkpoint["round_robin_index"] -= 1
+if database.uses_sqlite(config):
+    con = database.connect()
+    weeks = database.rollback_to(con, target_week(database.current_week(con)))
+    con.close()
+    print(f"🧹 Rolled back {describe(weeks)} successfully.")
+    sys.exit(0)
 
 # ---------------------------
-# Recompute last_cleanup from remaining weeks
+# Sanity checks
 # ---------------------------
-last_cleanup = {name: None for name in assigned_so_far}
-if checkpoint["weekly_history"]:
-    sorted_weeks = sorted(int(w) for w in checkpoint["weekly_history"].keys())
-    for person in last_cleanup:
-        # iterate backwards to find the last cleanup this person did
-        for wk in reversed(sorted_weeks):
-            wk_assignments = checkpoint["weekly_history"][str(wk)]
-            if person in wk_assignments:
-                last_cleanup[person] = wk_assignments[person]
-                break
+if not os.path.exists(CHECKPOINT_FILE) and not os.path.exists(journal_path(CHECKPOINT_FILE)):
+    raise RuntimeError("❌ checkpoint.json not found. No weeks to rollback.")
+
+checkpoint = load_checkpoint(CHECKPOINT_FILE)
+
+current_week = checkpoint.get("current_week", 0)
+weekly_history = checkpoint.get("weekly_history", {})
+
+if current_week == 0 or not weekly_history:
+    raise RuntimeError("❌ No scheduled weeks found to rollback.")
 
 # ---------------------------
-# Update checkpoint
+# Identify weeks to rollback (latest first)
 # ---------------------------
-checkpoint["assigned_so_far"] = {
-    name: dict(assigned_so_far[name]) for name in assigned_so_far
+weeks_to_delete = list(range(current_week, target_week(current_week), -1))
+missing = [w for w in weeks_to_delete if str(w) not in weekly_history]
+if missing:
+    raise RuntimeError(f"❌ Inconsistent checkpoint: week(s) {missing} not found.")
+
+# Cleanup columns touched by the removed weeks (their counts may drop to 0)
+cleanup_columns = {
+    c for w in weeks_to_delete for c in weekly_history[str(w)].values() if c is not None
 }
-checkpoint["last_cleanup"] = last_cleanup
 
-with open(CHECKPOINT_FILE, "w") as f:
-    json.dump(checkpoint, f, indent=4)
+# ---------------------------
+# Journal the rollback as one event: counts, last_cleanup, current_week and
+# round_robin_index are rolled back by journal.py in a single pass
+# ---------------------------
+append_event(checkpoint, {"event": "rollback", "weeks": weeks_to_delete}, CHECKPOINT_FILE)
+assigned_so_far = checkpoint["assigned_so_far"]
 
-print(f"🧹 Rolled back week {week_to_delete} successfully.")
+print(f"🧹 Rolled back {describe(weeks_to_delete)} successfully.")
 
 # ---------------------------
-# Update weekly_assignments.xlsx
+# Update the weekly record (weekly.py export refreshes the Excel pivot)
 # ---------------------------
-if os.path.exists(WEEKLY_EXCEL_FILE):
-    weekly_df = pd.read_excel(WEEKLY_EXCEL_FILE)
-    weekly_df = weekly_df[weekly_df["week"] != int(week_to_delete)]
-    weekly_df.to_excel(WEEKLY_EXCEL_FILE, index=False)
-    print(f"📘 Removed week {week_to_delete} from {WEEKLY_EXCEL_FILE}")
+write_weeks(checkpoint["weekly_history"], WEEKLY_CSV_FILE)
+print(f"📘 Removed {describe(weeks_to_delete)} from {WEEKLY_CSV_FILE}")
 
 # ---------------------------
-# Update actives.xlsx properly
+# Update actives.xlsx properly (the only step that needs pandas)
 # ---------------------------
-df = pd.read_excel(EXCEL_FILE)
+from roster import read_roster, set_counts, write_roster
+
+df = read_roster(EXCEL_FILE)
 
-# Ensure all cleanup columns exist in the Excel
-cleanup_columns = set()
+# Ensure all cleanup columns exist in the Excel (including ones that dropped to 0)
 for counts in assigned_so_far.values():
     cleanup_columns.update(counts.keys())
 
-for col in cleanup_columns:
-    if col not in df.columns:
-        df[col] = 0
-
-# Update counts in place
-for idx, row in df.iterrows():
-    name = row["name"]
-    if name in assigned_so_far:
-        for c in cleanup_columns:
-            df.at[idx, c] = assigned_so_far[name].get(c, 0)
+# Update counts in place (missing columns are created)
+set_counts(df, assigned_so_far, sorted(cleanup_columns))
 
-df.to_excel(EXCEL_FILE, index=False)
+write_roster(df, EXCEL_FILE)
 print(f"📘 Updated {EXCEL_FILE} with rolled-back counts")
@@ -0,0 +1,187 @@
+import hashlib
+import io
+import json
+import os
+import numpy as np
+import pandas as pd
+
+EXCEL_FILE = "actives.xlsx"
+CACHE_VERSION = 2
+
+
+# ---------------------------
+# Parsed-roster cache
+# ---------------------------
+# Parsing actives.xlsx with openpyxl is the slowest step of most commands, so
+# the normalized roster is cached next to it (.actives.xlsx.cache). The cache
+# is used while the workbook's mtime and size are unchanged; if they changed
+# (e.g. copied or touched) it is still used when the content hash matches.
+# Any real edit to the workbook invalidates it.
+#
+# The cache is plain JSON (a header line with the key and column dtypes, then
+# the frame in pandas' "split" layout), never pickle: whoever can write to the
+# workspace could otherwise run code in every tool and the service. A cache
+# that does not parse is treated as missing.
+
+def cache_path(excel_file=EXCEL_FILE):
+    folder, name = os.path.split(excel_file)
+    return os.path.join(folder, f".{name}.cache")
+
+
+def _file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def normalize_roster(df):
+    """
+    Stripped names, an availability column (default 1) and integer inhouse
+    when every value is numeric (anything else is left for build_people to report).
+    """
+    if "name" in df.columns:
+        df["name"] = df["name"].astype(str).str.strip()
+    if "availability" not in df.columns:
+        df["availability"] = 1
+    if "inhouse" in df.columns:
+        inhouse = pd.to_numeric(df["inhouse"], errors="coerce")
+        if inhouse.notna().all() and (inhouse == inhouse.round()).all():
+            df["inhouse"] = inhouse.astype(np.int64)
+    return df
+
+
+def _write_cache(df, excel_file, digest=None):
+    stat = os.stat(excel_file)
+    header = {
+        "version": CACHE_VERSION,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": digest or _file_hash(excel_file),
+        "dtypes": [str(dtype) for dtype in df.dtypes],
+    }
+    tmp_file = cache_path(excel_file) + ".tmp"
+    try:
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header) + "\n")
+            f.write(df.to_json(orient="split", date_format="iso", date_unit="ns") + "\n")
+        os.replace(tmp_file, cache_path(excel_file))
+    except (OSError, ValueError):
+        pass  # the cache is only an optimization (e.g. read-only directory)
+
+
+def _read_cache_frame(f, header):
+    """The cached DataFrame after its header line, with the recorded dtypes."""
+    df = pd.read_json(io.StringIO(f.readline()), orient="split", dtype=False, convert_dates=False)
+    if len(header["dtypes"]) != len(df.columns):
+        raise ValueError("cache columns do not match its header")
+    for column, dtype in zip(df.columns, header["dtypes"]):
+        if str(df[column].dtype) != dtype:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def read_roster(excel_file=EXCEL_FILE):
+    """
+    Normalized actives.xlsx as a DataFrame, served from the cache when the
+    workbook is unchanged. Returns a fresh copy the caller may modify.
+    """
+    stat = os.stat(excel_file)
+    try:
+        with open(cache_path(excel_file), "r", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("version") == CACHE_VERSION:
+                if (header["mtime_ns"], header["size"]) == (stat.st_mtime_ns, stat.st_size):
+                    return _read_cache_frame(f, header)
+                digest = _file_hash(excel_file)
+                if digest == header["sha256"]:
+                    df = _read_cache_frame(f, header)
+                    _write_cache(df, excel_file, digest)
+                    return df
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass  # missing, stale format or damaged: parse the workbook
+
+    df = normalize_roster(pd.read_excel(excel_file))
+    _write_cache(df, excel_file)
+    return df.copy()
+
+
+def write_roster(df, excel_file=EXCEL_FILE):
+    """
+    Save actives.xlsx and refresh the cache with the same data, so the next
+    command does not parse the workbook it just wrote.
+    """
+    df.to_excel(excel_file, index=False)
+    _write_cache(normalize_roster(df.copy()), excel_file)
+
+
+def build_name_index(df):
+    """
+    Map each name in actives.xlsx to its row position (built once per write-back).
+    """
+    return {name: pos for pos, name in enumerate(df["name"].tolist())}
+
+
+def apply_count_deltas(df, deltas, name_index=None):
+    """
+    Add count deltas to the cleanup columns of the roster in one vectorized step.
+
+    - deltas: iterable of (name, cleanup, delta) tuples
+    - Missing cleanup columns are created with 0
+    - Names not present in the roster are ignored
+    """
+    if name_index is None:
+        name_index = build_name_index(df)
+
+    deltas = [(name_index[p], c, d) for p, c, d in deltas if p in name_index]
+    if not deltas:
+        return df
+
+    columns = list(dict.fromkeys(c for _, c, _ in deltas))
+    for c in columns:
+        if c not in df.columns:
+            df[c] = 0
+
+    col_pos = {c: j for j, c in enumerate(columns)}
+    rows = np.array([r for r, _, _ in deltas], dtype=np.int64)
+    cols = np.array([col_pos[c] for _, c, _ in deltas], dtype=np.int64)
+    values = np.array([d for _, _, d in deltas])
+
+    block = df[columns].to_numpy(copy=True)
+    np.add.at(block, (rows, cols), values)
+    df[columns] = block
+    return df
+
+
+def set_counts(df, counts, columns, name_index=None):
+    """
+    Overwrite cleanup columns from cumulative counts in one vectorized step.
+
+    - counts: dict name -> {cleanup: count}
+    - Rows whose name is not in counts keep their current values
+    """
+    if name_index is None:
+        name_index = build_name_index(df)
+
+    columns = list(columns)
+    for c in columns:
+        if c not in df.columns:
+            df[c] = 0
+
+    names = [p for p in counts if p in name_index]
+    if not names or not columns:
+        return df
+
+    table = (
+        pd.DataFrame.from_dict({p: counts[p] for p in names}, orient="index")
+        .reindex(index=names, columns=columns)
+        .fillna(0)
+        .to_numpy()
+    )
+    rows = np.array([name_index[p] for p in names], dtype=np.int64)
+
+    block = df[columns].to_numpy(copy=True)
+    block[rows] = table
+    df[columns] = block
+    return df
@@ -1,184 +1,230 @@
 import json
 import os
+import numpy as np
 import pandas as pd
-from collections import defaultdict
-from cleanup import schedule_one_week_final
+from cleanup import ScheduleStats, schedule_one_week_final, week_rng
+import database
+from availability import CALENDAR_FILE, lookahead_calendar, week_availability
+from journal import CHECKPOINT_FILE, append_event, load_checkpoint
+from planner import PLAN_FILE, load_plan, planned_week
+from quotas import QuotaTracker
+from roster import read_roster, write_roster
+from state import SchedulerState
+from weekly import WEEKLY_CSV_FILE, WEEKLY_EXCEL_FILE, append_week
 
 EXCEL_FILE = "actives.xlsx"
 CONFIG_FILE = "cleanup_config.json"
-CHECKPOINT_FILE = "checkpoint.json"
-WEEKLY_EXCEL_FILE = "weekly_assignments.xlsx"  # pivoted output
+STATS_FILE = "schedule_stats.jsonl"  # per-week timings/counters when config "instrumentation" is true
 
-# ---------------------------
-# Load static inputs
-# ---------------------------
-try:
-    df = pd.read_excel(EXCEL_FILE)
-except Exception as e:
-    raise RuntimeError(f"Could not read {EXCEL_FILE}. Ensure it exists and is valid. Error: {e}")
-
-required_cols = {"name", "inhouse"}
-missing_cols = required_cols - set(df.columns)
-if missing_cols:
-    raise ValueError(f"Missing required columns in {EXCEL_FILE}: {missing_cols}")
-
-if "availability" not in df.columns:
-    df["availability"] = 1
-
-# Strip spaces from names to prevent duplicates/errors
-df["name"] = df["name"].astype(str).str.strip()
-names = df["name"].tolist()
-
-try:
-    with open(CONFIG_FILE, "r") as f:
-        config = json.load(f)
-except json.JSONDecodeError as e:
-    raise RuntimeError(f"Invalid JSON in {CONFIG_FILE}: {e}")
-except FileNotFoundError:
-    raise RuntimeError(f"Config file {CONFIG_FILE} not found.")
-
-required_config_keys = {"cleanup_types", "num_weeks", "per_week_actual", "base_by_inhouse"}
-missing_keys = required_config_keys - set(config.keys())
-if missing_keys:
-    raise ValueError(f"Missing required keys in {CONFIG_FILE}: {missing_keys}")
-
-cleanup_types = config["cleanup_types"]
-num_weeks = config["num_weeks"]
-per_week_actual = config["per_week_actual"].copy()
-min_per_week = config.get("min_per_week", {})
-base_by_inhouse = config["base_by_inhouse"]
-
-# Validate that config elements match cleanup_types
-for c in per_week_actual:
-    if c not in cleanup_types:
-        raise ValueError(f"Cleanup '{c}' in per_week_actual is not present in cleanup_types")
-for inhouse_level, bases in base_by_inhouse.items():
-    for c in bases:
-        if c not in cleanup_types:
-            raise ValueError(f"Cleanup '{c}' in base_by_inhouse[{inhouse_level}] is not in cleanup_types")
 
 # ---------------------------
-# Build per-person base (ONE-TIME mapping)
+# Load static inputs
 # ---------------------------
-base_by_person = {}
-out_house_people = []
-unavailable_inhouse = 0
-
-for _, row in df.iterrows():
-    name = row["name"]
-    is_available = int(row.get("availability", 1))
-
-    # Read inhouse strictly and normalize
+def load_actives(excel_file=EXCEL_FILE):
     try:
-        inhouse_int = int(float(str(row["inhouse"])))
-    except ValueError:
-        raise ValueError(f"Invalid inhouse value for {name}: {row['inhouse']} (must be a number)")
-
-    inhouse = str(inhouse_int).strip()
-    if inhouse not in {"0", "1", "2", "3"}:
-        raise ValueError(f"Invalid inhouse value for {name}: {row['inhouse']}")
-
-    if inhouse in {"2", "3"}:
-        base_by_person[name] = base_by_inhouse[inhouse]
-        if not is_available:
-            unavailable_inhouse += 1
-    else:
-        base_by_person[name] = {}  # out-of-house follow round-robin
-        if is_available:
-            out_house_people.append(name)
-
-# Adjust per_week_actual based on unavailable in-house people
-if unavailable_inhouse > 0:
-    for _ in range(unavailable_inhouse):
-        candidates = [c for c in cleanup_types if per_week_actual.get(c, 0) > min_per_week.get(c, 0)]
-        if candidates:
-            # Pick the one with the maximum difference between actual and min
-            c_to_reduce = max(candidates, key=lambda c: per_week_actual[c] - min_per_week.get(c, 0))
-            per_week_actual[c_to_reduce] -= 1
-        else:
-            print("⚠ Warning: Cannot reduce per_week_actual further, below minimums!")
-            break
+        df = read_roster(excel_file)  # cached parse, see roster.py
+    except Exception as e:
+        raise RuntimeError(f"Could not read {excel_file}. Ensure it exists and is valid. Error: {e}")
 
-# ---------------------------
-# Load or initialize checkpoint
-# ---------------------------
-if os.path.exists(CHECKPOINT_FILE):
-    with open(CHECKPOINT_FILE, "r") as f:
-        checkpoint = json.load(f)
-else:
-    checkpoint = {
-        "current_week": 0,
-        "assigned_so_far": {},
-        "last_cleanup": {},
-        "weekly_history": {},
-        "round_robin_index": 0  # track out-of-house rotation
-    }
+    required_cols = {"name", "inhouse"}
+    missing_cols = required_cols - set(df.columns)
+    if missing_cols:
+        raise ValueError(f"Missing required columns in {excel_file}: {missing_cols}")
 
-current_week = checkpoint["current_week"] + 1
+    # Names are stripped and availability defaults to 1 (normalize_roster)
+    return df
 
-if current_week > num_weeks:
-    raise RuntimeError("All weeks have already been scheduled.")
 
-assigned_so_far = {
-    name: defaultdict(int, checkpoint["assigned_so_far"].get(name, {}))
-    for name in names
-}
+def load_config(config_file=CONFIG_FILE):
+    try:
+        with open(config_file, "r") as f:
+            config = json.load(f)
+    except json.JSONDecodeError as e:
+        raise RuntimeError(f"Invalid JSON in {config_file}: {e}")
+    except FileNotFoundError:
+        raise RuntimeError(f"Config file {config_file} not found.")
+
+    required_config_keys = {"cleanup_types", "num_weeks", "per_week_actual", "base_by_inhouse"}
+    missing_keys = required_config_keys - set(config.keys())
+    if missing_keys:
+        raise ValueError(f"Missing required keys in {config_file}: {missing_keys}")
+
+    cleanup_types = config["cleanup_types"]
+
+    # Validate that config elements match cleanup_types
+    for c in config["per_week_actual"]:
+        if c not in cleanup_types:
+            raise ValueError(f"Cleanup '{c}' in per_week_actual is not present in cleanup_types")
+    for inhouse_level, bases in config["base_by_inhouse"].items():
+        for c in bases:
+            if c not in cleanup_types:
+                raise ValueError(f"Cleanup '{c}' in base_by_inhouse[{inhouse_level}] is not in cleanup_types")
 
-last_cleanup = {
-    name: checkpoint["last_cleanup"].get(name)
-    for name in names
-}
+    return config
 
-# Ensure all allowed cleanup keys exist per person
-for name in names:
-    for c in base_by_person[name]:
-        assigned_so_far[name][c] += 0
 
 # ---------------------------
-# Run ONE week (ALL logic inside cleanup.py)
+# Build per-person base (ONE-TIME mapping)
 # ---------------------------
-weekly_assignments, round_robin_index = schedule_one_week_final(
-    current_week,
-    df,
-    cleanup_types,
-    per_week_actual,
-    base_by_person,
-    assigned_so_far,
-    last_cleanup,
-    num_weeks,
-    out_house_people,
-    checkpoint.get("round_robin_index", 0)
-)
+def build_people(df, config, quotas=None):
+    """
+    Returns (base_by_person, out_house_people, per_week_actual) where
+    per_week_actual is already reduced for unavailable in-house people.
 
-# ---------------------------
-# Update checkpoint
-# ---------------------------
-checkpoint["round_robin_index"] = round_robin_index
-checkpoint["current_week"] = current_week
-checkpoint["assigned_so_far"] = {name: dict(assigned_so_far[name]) for name in names}
-checkpoint["last_cleanup"] = last_cleanup
-checkpoint["weekly_history"][str(current_week)] = weekly_assignments
+    quotas: the journaled QuotaTracker state (checkpoint["quotas"]); its
+    per_week_actual is used as is instead of recounting the roster.
+    """
+    base_by_inhouse = config["base_by_inhouse"]
+    names = df["name"].tolist()
 
-with open(CHECKPOINT_FILE, "w") as f:
-    json.dump(checkpoint, f, indent=4)
+    # Read inhouse strictly and normalize
+    raw = df["inhouse"]
+    levels = pd.to_numeric(raw.astype(str), errors="coerce")
+    if levels.isna().any():
+        i = int(np.flatnonzero(levels.isna().to_numpy())[0])
+        raise ValueError(f"Invalid inhouse value for {names[i]}: {raw.iloc[i]} (must be a number)")
+    levels = np.trunc(levels.to_numpy())
+    invalid = ~np.isin(levels, (0, 1, 2, 3))
+    if invalid.any():
+        i = int(np.flatnonzero(invalid)[0])
+        raise ValueError(f"Invalid inhouse value for {names[i]}: {raw.iloc[i]}")
+
+    available = df["availability"].astype(int).to_numpy() == 1 if "availability" in df.columns else np.ones(len(df), bool)
+    in_house = levels >= 2
+
+    # out-of-house people follow round-robin (empty base)
+    base_by_person = {
+        name: base_by_inhouse[str(int(level))] if level >= 2 else {} for name, level in zip(names, levels)
+    }
+    out_house_people = [name for name, inside, free in zip(names, in_house, available) if not inside and free]
+
+    if quotas is not None:
+        return base_by_person, out_house_people, dict(quotas["per_week_actual"])
+
+    # Adjust per_week_actual based on unavailable in-house people
+    tracker = QuotaTracker.from_config(config, int((in_house & ~available).sum()))
+    if tracker.short:
+        print("⚠ Warning: Cannot reduce per_week_actual further, below minimums!")
+    per_week_actual = tracker.per_week_actual
+
+    return base_by_person, out_house_people, per_week_actual
 
-# ---------------------------
-# Update actives.xlsx
-# ---------------------------
-df.to_excel(EXCEL_FILE, index=False)
-print(f"✅ Week {current_week} scheduled and saved.")
-print("📘 actives.xlsx updated with latest counts")
 
 # ---------------------------
-# Save pivoted weekly assignments Excel
+# Save outputs
 # ---------------------------
-all_weeks = []
-for wk, assignments in checkpoint["weekly_history"].items():
-    row = {"week": int(wk)}
-    row.update(assignments)
-    all_weeks.append(row)
-
-weekly_df = pd.DataFrame(all_weeks)
-weekly_df = weekly_df.sort_values("week").reset_index(drop=True)
-weekly_df.to_excel(WEEKLY_EXCEL_FILE, index=False)
-print(f"✅ Weekly assignments saved to {WEEKLY_EXCEL_FILE}")
+# checkpoint.json is loaded and saved through journal.py (snapshot + event log)
+def save_weekly_excel(checkpoint, weekly_excel_file=WEEKLY_EXCEL_FILE):
+    all_weeks = []
+    for wk, assignments in checkpoint["weekly_history"].items():
+        row = {"week": int(wk)}
+        row.update(assignments)
+        all_weeks.append(row)
+
+    weekly_df = pd.DataFrame(all_weeks)
+    weekly_df = weekly_df.sort_values("week").reset_index(drop=True)
+    weekly_df.to_excel(weekly_excel_file, index=False)
+
+
+def run_week(workdir="."):
+    """
+    Schedule the next week of the workspace in `workdir` and save all outputs
+    (one transaction on cleanup.db when the config sets "storage": "sqlite").
+
+    Returns (week, weekly_assignments, stats) where stats is a ScheduleStats
+    when the config enables instrumentation, else None.
+    """
+    excel_file = os.path.join(workdir, EXCEL_FILE)
+    checkpoint_file = os.path.join(workdir, CHECKPOINT_FILE)
+
+    config = load_config(os.path.join(workdir, CONFIG_FILE))
+    con = database.connect(os.path.join(workdir, database.DB_FILE)) if database.uses_sqlite(config) else None
+
+    if con is not None:
+        df = database.load_members(con)
+        checkpoint = database.load_checkpoint(con)
+    else:
+        df = load_actives(excel_file)
+        checkpoint = load_checkpoint(checkpoint_file)
+
+    _, out_house_people, per_week_actual = build_people(df, config, checkpoint.get("quotas"))
+    current_week = checkpoint["current_week"] + 1
+
+    if current_week > config["num_weeks"]:
+        raise RuntimeError("All weeks have already been scheduled.")
+
+    # Availability calendar: this week's absences and quotas come from init.py's table
+    away, week_quotas = week_availability(df, config, current_week)
+    if week_quotas is not None:
+        per_week_actual = week_quotas
+        if away:
+            print(f"📅 Week {current_week}: {len(away)} away per {CALENDAR_FILE}")
+
+    state = SchedulerState.from_checkpoint(checkpoint, df, config)
+    seed = config.get("seed")  # optional: reproducible shuffles and tie-breaks
+    stats = ScheduleStats() if config.get("instrumentation") else None
+
+    # ---------------------------
+    # Run ONE week (ALL logic inside cleanup.py)
+    # ---------------------------
+    weekly_assignments, round_robin_index = schedule_one_week_final(
+        current_week,
+        df,
+        config["cleanup_types"],
+        per_week_actual,
+        state.base_by_person,
+        state.assigned_so_far,
+        state.last_cleanup,
+        config["num_weeks"],
+        out_house_people,
+        state.round_robin_index,
+        engine=config.get("engine", "python"),  # "python", "numpy" or "flow"
+        rng=week_rng(seed, current_week) if seed is not None else None,
+        stats=stats,
+        plan=planned_week(load_plan(os.path.join(workdir, PLAN_FILE)), current_week),  # planner.py, if used
+        lookahead=config.get("lookahead_weeks", 0),  # rolling horizon, 0 = off
+        away=away,
+        calendar=lookahead_calendar(df, config, current_week, per_week_actual)
+    )
+
+    if stats is not None:
+        stats.append_jsonl(os.path.join(workdir, STATS_FILE))
+
+    if con is not None:
+        database.record_week(con, current_week, weekly_assignments, round_robin_index)
+        con.close()
+        print(f"✅ Week {current_week} scheduled and saved to {database.DB_FILE}.")
+        return current_week, weekly_assignments, stats
+
+    # ---------------------------
+    # Update checkpoint (one journal line instead of rewriting the history)
+    # ---------------------------
+    append_event(checkpoint, {
+        "event": "week",
+        "week": current_week,
+        "assignments": weekly_assignments,
+        "round_robin_index": round_robin_index,
+    }, checkpoint_file)
+
+    # ---------------------------
+    # Update actives.xlsx
+    # ---------------------------
+    write_roster(df, excel_file)
+    print(f"✅ Week {current_week} scheduled and saved.")
+    print("📘 actives.xlsx updated with latest counts")
+
+    # ---------------------------
+    # Append to the weekly record (the pivoted Excel is exported on demand)
+    # ---------------------------
+    append_week(current_week, weekly_assignments, os.path.join(workdir, WEEKLY_CSV_FILE), checkpoint["weekly_history"])
+    print(f"✅ Week {current_week} appended to {WEEKLY_CSV_FILE} (run weekly.py export for {WEEKLY_EXCEL_FILE})")
+
+    return current_week, weekly_assignments, stats
+
+
+def main():
+    run_week()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+import database
+from availability import lookahead_calendar, week_availability
+from cleanup import ScheduleStats, schedule_one_week_final, week_rng
+from journal import append_event, save_checkpoint
+from metrics import deviation_scores
+from planner import PLAN_FILE, load_plan, planned_week
+from quotas import advance_quota_state
+from roster import write_roster
+from weekly import write_weeks
+from state import SchedulerState
+from schedule import (
+    EXCEL_FILE,
+    CONFIG_FILE,
+    CHECKPOINT_FILE,
+    WEEKLY_CSV_FILE,
+    WEEKLY_EXCEL_FILE,
+    STATS_FILE,
+    load_actives,
+    load_config,
+    build_people,
+    load_checkpoint,
+    save_weekly_excel,
+)
+
+
+def load_inputs(workdir="."):
+    """
+    Returns (df, config, checkpoint) loaded from a workspace directory
+    (from cleanup.db when the config sets "storage": "sqlite").
+    """
+    config = load_config(os.path.join(workdir, CONFIG_FILE))
+    if database.uses_sqlite(config):
+        con = database.connect(os.path.join(workdir, database.DB_FILE))
+        df = database.load_members(con)
+        checkpoint = database.load_checkpoint(con, with_history=True)
+        con.close()
+        return df, config, checkpoint
+
+    df = load_actives(os.path.join(workdir, EXCEL_FILE))
+    checkpoint = load_checkpoint(os.path.join(workdir, CHECKPOINT_FILE))
+    return df, config, checkpoint
+
+
+def simulate_semester(df, config, checkpoint, engine=None, seed=None, on_week=None, stats_file=None, plan=None):
+    """
+    Schedule every remaining week in memory on a compact SchedulerState,
+    updating df and checkpoint in place.
+
+    - seed: makes the run reproducible (one week_rng per week); defaults to the
+      config's "seed", and None uses the global random module
+    - on_week: optional callback(week, state) after each scheduled week
+    - stats_file: optional JSON lines file receiving one ScheduleStats record per week
+    - plan: optional semester plan (planner.py) whose weeks are followed
+    - Returns the list of scheduled week numbers
+    """
+    _, out_house_people, per_week_actual = build_people(df, config, checkpoint.get("quotas"))
+    engine = engine or config.get("engine", "python")
+    seed = seed if seed is not None else config.get("seed")
+
+    first_week = checkpoint["current_week"] + 1
+    num_weeks = config["num_weeks"]
+
+    if first_week > num_weeks:
+        raise RuntimeError("All weeks have already been scheduled.")
+
+    state = SchedulerState.from_checkpoint(checkpoint, df, config)
+
+    for week in range(first_week, num_weeks + 1):
+        stats = ScheduleStats() if stats_file else None
+        away, week_quotas = week_availability(df, config, week)  # availability calendar, if any
+        weekly_assignments, round_robin_index = schedule_one_week_final(
+            week,
+            df,
+            config["cleanup_types"],
+            per_week_actual if week_quotas is None else week_quotas,
+            state.base_by_person,
+            state.assigned_so_far,
+            state.last_cleanup,
+            num_weeks,
+            out_house_people,
+            state.round_robin_index,
+            engine=engine,
+            rng=week_rng(seed, week) if seed is not None else None,
+            stats=stats,
+            plan=planned_week(plan, week),
+            lookahead=config.get("lookahead_weeks", 0),
+            away=away,
+            calendar=lookahead_calendar(df, config, week, per_week_actual)
+        )
+        state.round_robin_index = round_robin_index
+        state.record_week(week, weekly_assignments)
+
+        if stats is not None:
+            stats.append_jsonl(stats_file)
+
+        if on_week is not None:
+            on_week(week, state)
+
+    state.to_checkpoint(checkpoint)
+    if "quotas" in checkpoint:
+        # Weeks scheduled in memory use up remaining-week targets like week events
+        quotas = checkpoint["quotas"]
+        advance_quota_state(quotas, quotas["weeks_left"] - max(num_weeks - checkpoint["current_week"], 0))
+    return list(range(first_week, num_weeks + 1))
+
+
+def run_semester(workdir=".", checkpoint_every_week=False, engine=None, seed=None, plan=None):
+    """
+    Schedule every remaining week of the semester in one process.
+
+    - Loads actives.xlsx, cleanup_config.json and checkpoint.json once
+    - Runs schedule_one_week_final for each remaining week in memory
+    - Writes checkpoint.json, actives.xlsx and the weekly record (CSV + Excel) once at the end
+      (only cleanup.db when the config sets "storage": "sqlite")
+      (checkpoint_every_week=True also journals each week as it is scheduled)
+    - plan: semester plan (planner.py) to follow; defaults to the workspace's
+      semester_plan.json when there is one, like schedule.py
+    - Returns the updated checkpoint dict
+    """
+    excel_file = os.path.join(workdir, EXCEL_FILE)
+    checkpoint_file = os.path.join(workdir, CHECKPOINT_FILE)
+    df, config, checkpoint = load_inputs(workdir)
+    num_weeks = config["num_weeks"]
+    if plan is None:
+        plan = load_plan(os.path.join(workdir, PLAN_FILE))  # planner.py, if used
+
+    def on_week(week, state):
+        print(f"📆 Week {week}/{num_weeks} scheduled")
+        if checkpoint_every_week:
+            append_event(checkpoint, {
+                "event": "week",
+                "week": week,
+                "assignments": state.week_assignments(week),
+                "round_robin_index": state.round_robin_index,
+            }, checkpoint_file)
+
+    stats_file = os.path.join(workdir, STATS_FILE) if config.get("instrumentation") else None
+    weeks = simulate_semester(
+        df, config, checkpoint, engine=engine, seed=seed, on_week=on_week, stats_file=stats_file, plan=plan
+    )
+
+    # ---------------------------
+    # Write outputs once
+    # ---------------------------
+    # cleanup.db holds only name/inhouse/availability, so actives.xlsx is left
+    # to `database.py export` (which keeps the workbook's other columns)
+    if database.uses_sqlite(config):
+        con = database.connect(os.path.join(workdir, database.DB_FILE), create=True)
+        database.import_workspace(con, df, checkpoint)
+        con.close()
+        print(f"\n✅ Weeks {weeks[0]}-{weeks[-1]} scheduled and saved to {database.DB_FILE}.")
+        print(f"ℹ Run database.py export to write {EXCEL_FILE} and {WEEKLY_EXCEL_FILE}")
+        return checkpoint
+
+    save_checkpoint(checkpoint, checkpoint_file)
+
+    write_roster(df, excel_file)
+    print(f"\n✅ Weeks {weeks[0]}-{weeks[-1]} scheduled and saved.")
+    print("📘 actives.xlsx updated with latest counts")
+
+    write_weeks(checkpoint["weekly_history"], os.path.join(workdir, WEEKLY_CSV_FILE))
+    save_weekly_excel(checkpoint, os.path.join(workdir, WEEKLY_EXCEL_FILE))
+    print(f"✅ Weekly assignments saved to {WEEKLY_CSV_FILE} and {WEEKLY_EXCEL_FILE}")
+
+    return checkpoint
+
+
+# ---------------------------
+# Scoring (summary.py's metrics plus back-to-backs)
+# ---------------------------
+def count_back_to_back(weekly_history):
+    """
+    Number of times a person got the same cleanup as in their previous assignment.
+    """
+    last = {}
+    count = 0
+    for wk in sorted(weekly_history, key=int):
+        for person, cleanup in weekly_history[wk].items():
+            if last.get(person) == cleanup:
+                count += 1
+            last[person] = cleanup
+    return count
+
+
+def score_semester(df, config, checkpoint):
+    """
+    Lower is better. Returns a tuple
+    (illegal assignments, back-to-backs, deviation warnings, total |deviation|)
+    with the deviation metrics of summary.py (metrics.deviation_scores).
+    """
+    illegal, warnings, total_deviation = deviation_scores(df, config, checkpoint["assigned_so_far"])
+    return (illegal, count_back_to_back(checkpoint["weekly_history"]), warnings, total_deviation)
+
+
+# ---------------------------
+# Parallel multi-seed search
+# ---------------------------
+_worker_inputs = None
+
+
+def _init_search_worker(workdir, engine):
+    global _worker_inputs
+    plan = load_plan(os.path.join(workdir, PLAN_FILE))  # scored like run_semester will commit
+    _worker_inputs = load_inputs(workdir) + (engine, plan)
+
+
+def _score_seed(seed):
+    df, config, checkpoint, engine, plan = _worker_inputs
+    df = df.copy()
+    checkpoint = copy.deepcopy(checkpoint)
+    simulate_semester(df, config, checkpoint, engine=engine, seed=seed, plan=plan)
+    return seed, score_semester(df, config, checkpoint)
+
+
+def search_semesters(runs=8, workdir=".", base_seed=0, workers=None, engine=None):
+    """
+    Run `runs` seeded full-semester simulations across a process pool, score each
+    with score_semester and commit the fairest one (re-run with its seed and saved).
+    Every run follows the workspace's semester_plan.json when there is one.
+
+    Returns (best_seed, best_score).
+    """
+    seeds = [base_seed + i for i in range(runs)]
+    plan = load_plan(os.path.join(workdir, PLAN_FILE))
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_search_worker,
+        initargs=(workdir, engine)
+    ) as pool:
+        results = list(pool.map(_score_seed, seeds))
+
+    print("\n🎲 Seed search results (illegal, back-to-back, deviation warnings, total deviation):")
+    for seed, score in results:
+        print(f"  seed {seed}: {score}")
+
+    best_seed, best_score = min(results, key=lambda r: r[1])
+    print(f"🏆 Best seed: {best_seed} {best_score}")
+
+    run_semester(workdir, engine=engine, seed=best_seed, plan=plan)
+    return best_seed, best_score
@@ -0,0 +1,460 @@
+import argparse
+import json
+import os
+import queue
+import signal
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import unquote
+from cleanup import ScheduleStats, schedule_one_week_final, week_rng
+import database
+from availability import (
+    apply_availability,
+    availability_event,
+    available_out_of_house,
+    lookahead_calendar,
+    quota_preview,
+    quota_tracker,
+    week_availability,
+    week_quotas,
+)
+from journal import CHECKPOINT_FILE, append_event, apply_event, load_checkpoint, reassign_changes
+from planner import PLAN_FILE, load_plan, planned_week
+from roster import apply_count_deltas, set_counts, write_roster
+from semester import score_semester
+from state import SchedulerState
+from schedule import EXCEL_FILE, CONFIG_FILE, STATS_FILE, build_people, load_actives, load_config
+from weekly import WEEKLY_CSV_FILE, append_week, write_weeks
+
+DEFAULT_PORT = 8765
+
+
+# ---------------------------
+# Background write-through
+# ---------------------------
+class WriteBehind:
+    """
+    One writer thread that persists changes in the order they were made, so
+    requests return as soon as the in-memory state is updated.
+
+    - submit(fn, *args): run fn(*args) on the writer thread
+    - set_roster(df): save this roster snapshot; consecutive snapshots are
+      coalesced into one actives.xlsx write
+    - flush(): block until everything submitted so far is on disk
+    """
+
+    def __init__(self):
+        self.tasks = queue.Queue()
+        self.roster = None
+        self.roster_lock = threading.Lock()
+        self.last_error = None
+        self.thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self.thread.start()
+
+    def submit(self, fn, *args):
+        self.tasks.put((fn, args))
+
+    def set_roster(self, df, excel_file):
+        with self.roster_lock:
+            pending = self.roster is not None
+            self.roster = (df, excel_file)
+        if not pending:
+            self.submit(self._write_roster)
+
+    def _write_roster(self):
+        with self.roster_lock:
+            snapshot, self.roster = self.roster, None
+        if snapshot is not None:
+            write_roster(*snapshot)
+
+    def flush(self):
+        done = threading.Event()
+        self.submit(done.set)
+        done.wait()
+
+    def close(self):
+        self.flush()
+        self.tasks.put(None)
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                return
+            fn, args = task
+            try:
+                fn(*args)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"❌ Background write failed: {self.last_error}", file=sys.stderr)
+
+
+# ---------------------------
+# Resident workspace
+# ---------------------------
+class Workspace:
+    """
+    The parsed roster, config and checkpoint of one workspace, kept in memory.
+    Every mutation updates memory first and hands the persistence to WriteBehind:
+    journal events + actives.xlsx + weekly_assignments.csv, or one transaction on
+    cleanup.db when the config sets "storage": "sqlite".
+    """
+
+    def __init__(self, workdir="."):
+        self.workdir = workdir
+        self.excel_file = os.path.join(workdir, EXCEL_FILE)
+        self.checkpoint_file = os.path.join(workdir, CHECKPOINT_FILE)
+        self.csv_file = os.path.join(workdir, WEEKLY_CSV_FILE)
+        self.config = load_config(os.path.join(workdir, CONFIG_FILE))
+        self.db_file = os.path.join(workdir, database.DB_FILE)
+        self.use_sqlite = database.uses_sqlite(self.config)
+
+        if self.use_sqlite:
+            con = database.connect(self.db_file)
+            self.df = database.load_members(con)
+            self.checkpoint = database.load_checkpoint(con, with_history=True)
+            con.close()
+        else:
+            self.df = load_actives(self.excel_file)
+            self.checkpoint = load_checkpoint(self.checkpoint_file)
+            # The writer journals into its own copy, so memory never waits on disk
+            self.disk_checkpoint = json.loads(json.dumps(self.checkpoint))
+
+        self.checkpoint.setdefault("journal_seq", 0)
+        self.writer = WriteBehind()
+        self._state = None
+        self._people = None
+        self._quotas = None
+
+    # ---------------------------
+    # Derived state (rebuilt only after a change invalidates it)
+    # ---------------------------
+    @property
+    def state(self):
+        if self._state is None:
+            self._state = SchedulerState.from_checkpoint(self.checkpoint, self.df, self.config)
+        return self._state
+
+    @property
+    def people(self):
+        if self._people is None:
+            self._people = build_people(self.df, self.config, self.checkpoint.get("quotas"))
+        return self._people
+
+    @property
+    def quotas(self):
+        if self._quotas is None:
+            self._quotas = quota_tracker(self.df, self.config, self.checkpoint)
+        return self._quotas
+
+    def _apply(self, event):
+        """Apply an event in memory (same replay code as journal.py) and queue its write."""
+        apply_event(self.checkpoint, {"seq": self.checkpoint["journal_seq"] + 1, **event})
+        if event["event"] in ("week", "rollback"):
+            self._quotas = None  # remaining-week targets moved; rebuilt from checkpoint["quotas"]
+        if not self.use_sqlite:
+            self.writer.submit(append_event, self.disk_checkpoint, event, self.checkpoint_file)
+
+    def _append_csv(self, week, assignments):
+        # Writer thread: the history is the writer's own journaled copy (never
+        # changed by later requests) and append_week decides there whether a
+        # workspace without the record yet gets its earlier weeks first
+        append_week(week, assignments, self.csv_file, self.disk_checkpoint["weekly_history"])
+
+    def _write_csv(self):
+        self.writer.submit(write_weeks, self.disk_checkpoint["weekly_history"], self.csv_file)
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    def status(self):
+        return {
+            "current_week": self.checkpoint.get("current_week", 0),
+            "num_weeks": self.config["num_weeks"],
+            "members": len(self.df),
+            "available": int((self.df["availability"].astype(int) == 1).sum()),
+            "storage": "sqlite" if self.use_sqlite else "files",
+            "pending_writes": self.writer.tasks.qsize(),
+            "write_error": self.writer.last_error,
+        }
+
+    def week(self, wk=None):
+        wk = self.checkpoint.get("current_week", 0) if wk is None else int(wk)
+        assignments = self.checkpoint["weekly_history"].get(str(wk))
+        if assignments is None:
+            raise LookupError(f"Week {wk} has not been scheduled.")
+        return {"week": wk, "assignments": assignments}
+
+    def person(self, name):
+        if name not in self.checkpoint["assigned_so_far"] and name not in set(self.df["name"]):
+            raise LookupError(f"{name} not found")
+        return {
+            "name": name,
+            "counts": self.checkpoint["assigned_so_far"].get(name, {}),
+            "base": self.people[0].get(name, {}),
+            "last_cleanup": self.checkpoint["last_cleanup"].get(name),
+        }
+
+    def summary(self):
+        illegal, back_to_back, warnings, total_deviation = score_semester(self.df, self.config, self.checkpoint)
+        return {
+            "illegal": illegal,
+            "back_to_back": back_to_back,
+            "deviation_warnings": warnings,
+            "total_deviation": total_deviation,
+        }
+
+    # ---------------------------
+    # Mutations
+    # ---------------------------
+    def schedule(self):
+        config = self.config
+        _, out_house_people, per_week_actual = self.people
+        week = self.checkpoint["current_week"] + 1
+        if week > config["num_weeks"]:
+            raise ValueError("All weeks have already been scheduled.")
+        away, week_quotas = week_availability(self.df, config, week)
+
+        state = self.state
+        seed = config.get("seed")
+        stats = ScheduleStats() if config.get("instrumentation") else None
+
+        weekly_assignments, round_robin_index = schedule_one_week_final(
+            week,
+            self.df,
+            config["cleanup_types"],
+            per_week_actual if week_quotas is None else week_quotas,
+            state.base_by_person,
+            state.assigned_so_far,
+            state.last_cleanup,
+            config["num_weeks"],
+            out_house_people,
+            state.round_robin_index,
+            engine=config.get("engine", "python"),
+            rng=week_rng(seed, week) if seed is not None else None,
+            stats=stats,
+            plan=planned_week(load_plan(os.path.join(self.workdir, PLAN_FILE)), week),
+            lookahead=config.get("lookahead_weeks", 0),
+            away=away,
+            calendar=lookahead_calendar(self.df, config, week, per_week_actual)
+        )
+        state.round_robin_index = round_robin_index
+        state.record_week(week, weekly_assignments)
+
+        self._apply({
+            "event": "week",
+            "week": week,
+            "assignments": weekly_assignments,
+            "round_robin_index": round_robin_index,
+        })
+
+        if stats is not None:
+            self.writer.submit(stats.append_jsonl, os.path.join(self.workdir, STATS_FILE))
+        if self.use_sqlite:
+            self.writer.submit(self._sqlite, database.record_week, week, weekly_assignments, round_robin_index)
+        else:
+            self.writer.set_roster(self.df.copy(), self.excel_file)
+            self.writer.submit(self._append_csv, week, weekly_assignments)
+        return {"week": week, "assignments": weekly_assignments}
+
+    def reassign(self, requests):
+        changes = reassign_changes(
+            self.checkpoint["weekly_history"], requests, self.config["cleanup_types"], set(self.df["name"])
+        )
+        self._apply({"event": "reassign", "changes": changes})
+        self._state = None
+
+        deltas = [(c["person"], c["old"], -1) for c in changes] + [(c["person"], c["new"], 1) for c in changes]
+        apply_count_deltas(self.df, deltas)
+
+        if self.use_sqlite:
+            self.writer.submit(self._sqlite, database.reassign_many, requests)
+        else:
+            self._write_csv()
+            self.writer.set_roster(self.df.copy(), self.excel_file)
+        return {"changes": changes}
+
+    def rollback(self, weeks=None, to_week=None):
+        current_week = self.checkpoint.get("current_week", 0)
+        target = to_week if to_week is not None else current_week - (weeks or 1)
+        if target < 0 or target >= current_week:
+            raise ValueError(f"Cannot roll back to week {target} (week {current_week} is the latest).")
+
+        removed = list(range(current_week, target, -1))
+        weekly_history = self.checkpoint["weekly_history"]
+        columns = {c for w in removed for c in weekly_history.get(str(w), {}).values() if c is not None}
+
+        self._apply({"event": "rollback", "weeks": removed})
+        self._state = None
+
+        assigned_so_far = self.checkpoint["assigned_so_far"]
+        for counts in assigned_so_far.values():
+            columns.update(counts.keys())
+        set_counts(self.df, assigned_so_far, sorted(columns))
+
+        if self.use_sqlite:
+            self.writer.submit(self._sqlite, database.rollback_to, target)
+        else:
+            self._write_csv()
+            self.writer.set_roster(self.df.copy(), self.excel_file)
+        return {"rolled_back": removed, "current_week": self.checkpoint["current_week"]}
+
+    def set_availability(self, availability):
+        """
+        Apply availability changes as one event: only the changed members and
+        their quota steps are updated. Returns the new values and the per-week
+        quota preview for the next week.
+        """
+        quotas = self.quotas
+        week = self.checkpoint["current_week"] + 1
+        before = week_quotas(self.df, self.config, quotas, week)
+        left_before = dict(quotas.remaining)
+        changed = apply_availability(self.df, availability, quotas)
+        after = week_quotas(self.df, self.config, quotas, week)
+
+        if changed and self._people is not None:
+            base_by_person, _, _ = self._people
+            self._people = (base_by_person, available_out_of_house(self.df), dict(quotas.per_week_actual))
+
+        if changed:
+            if self.use_sqlite:
+                self.writer.submit(self._sqlite, database.set_availability, changed)
+            else:
+                self.writer.set_roster(self.df.copy(), self.excel_file)
+            self._apply(availability_event(week, changed, quotas))
+
+        remaining = None if self.config.get("per_week_table") else (left_before, quotas.remaining)
+        index = {name: i for i, name in enumerate(self.df["name"])}
+        return {
+            "availability": {name: int(self.df.at[index[name], "availability"]) for name in availability},
+            "changed": changed,
+            "week": week,
+            "per_week_actual": after,
+            "remaining": None if remaining is None else dict(quotas.remaining),
+            "preview": quota_preview(before, after, self.config["cleanup_types"], remaining),
+        }
+
+    def _sqlite(self, fn, *args):
+        con = database.connect(self.db_file)
+        try:
+            fn(con, *args)
+        finally:
+            con.close()
+
+
+# ---------------------------
+# HTTP front end (localhost TCP or a Unix socket)
+# ---------------------------
+def make_handler(workspace):
+    # HTTPServer handles one request at a time, so the workspace needs no locking
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self):
+            """The request's JSON object ({} without a body); ValueError for anything else."""
+            length = int(self.headers.get("Content-Length") or 0)
+            if not length:
+                return {}
+            try:
+                body = json.loads(self.rfile.read(length))
+            except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                raise ValueError(f"request body is not valid JSON: {e}")
+            if not isinstance(body, dict):
+                raise ValueError("request body must be a JSON object")
+            return body
+
+        def _dispatch(self, routes):
+            parts = [unquote(p) for p in self.path.split("?")[0].strip("/").split("/") if p]
+            route = routes.get(parts[0] if parts else "")
+            if route is None:
+                return self._send(404, {"error": f"unknown path {self.path}"})
+
+            start = time.perf_counter()
+            try:
+                result = route(parts[1:], self._body() if self.command == "POST" else {})
+            except KeyError as e:
+                return self._send(400, {"error": f"missing {e}"})
+            except LookupError as e:
+                return self._send(404, {"error": str(e).strip("'")})
+            except (ValueError, RuntimeError, TypeError) as e:
+                return self._send(400, {"error": str(e)})
+            result["ms"] = round((time.perf_counter() - start) * 1000, 3)
+            self._send(200, result)
+
+        def do_GET(self):
+            self._dispatch({
+                "status": lambda args, body: workspace.status(),
+                "week": lambda args, body: workspace.week(args[0] if args else None),
+                "person": lambda args, body: workspace.person(args[0]),
+                "summary": lambda args, body: workspace.summary(),
+            })
+
+        def do_POST(self):
+            self._dispatch({
+                "schedule": lambda args, body: workspace.schedule(),
+                "reassign": lambda args, body: workspace.reassign(
+                    [(str(c["name"]).strip(), int(c["week"]), str(c["cleanup"]).strip()) for c in body["changes"]]
+                ),
+                "rollback": lambda args, body: workspace.rollback(body.get("weeks"), body.get("to_week")),
+                "availability": lambda args, body: workspace.set_availability(body),
+                "flush": lambda args, body: (workspace.writer.flush(), workspace.status())[1],
+            })
+
+        def log_message(self, format, *args):
+            pass  # one line per request would dominate the latency
+
+    return Handler
+
+
+class UnixHTTPServer(socketserver.UnixStreamServer):
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the workspace from memory over HTTP (localhost or a Unix socket).")
+    parser.add_argument("--workdir", default=".")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"localhost TCP port (default: {DEFAULT_PORT})")
+    parser.add_argument("--socket", default=None, metavar="PATH", help="listen on a Unix socket instead of TCP")
+    args = parser.parse_args()
+
+    workspace = Workspace(args.workdir)
+    handler = make_handler(workspace)
+
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        server = UnixHTTPServer(args.socket, handler)
+        where = args.socket
+    else:
+        server = HTTPServer(("127.0.0.1", args.port), handler)
+        where = f"http://127.0.0.1:{args.port}"
+
+    # SIGTERM stops like Ctrl+C, so pending writes are flushed
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"🟢 Serving {os.path.abspath(args.workdir)} on {where} (week {workspace.checkpoint['current_week']})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        workspace.writer.close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+        print("🔴 Stopped; all changes written.")
+
+
+if __name__ == "__main__":
+    main()
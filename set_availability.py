@@ -1,53 +1,107 @@
-import pandas as pd
+import json
 import os
 import sys
+import database
+from availability import apply_availability, availability_event, quota_preview, quota_tracker, week_quotas
+from journal import CHECKPOINT_FILE, append_event, load_checkpoint
+from planner import PLAN_FILE
+from roster import read_roster, write_roster
 
 EXCEL_FILE = "actives.xlsx"
+CONFIG_FILE = "cleanup_config.json"
 
 def main():
-    if not os.path.exists(EXCEL_FILE):
+    config = None
+    use_sqlite = False
+    if os.path.exists(CONFIG_FILE):
+        with open(CONFIG_FILE, "r") as f:
+            config = json.load(f)
+        use_sqlite = database.uses_sqlite(config)
+
+    if use_sqlite:
+        con = database.connect()
+        df = database.load_members(con)
+    elif not os.path.exists(EXCEL_FILE):
         print(f"Error: {EXCEL_FILE} not found.")
         sys.exit(1)
+    else:
+        df = read_roster(EXCEL_FILE)
 
-    df = pd.read_excel(EXCEL_FILE)
     if "availability" not in df.columns:
         df["availability"] = 1
         print("Added new 'availability' column with default value 1 (available).")
 
+    # Quotas follow each toggle (needs init.py's config)
+    quotas = None
+    if config:
+        checkpoint = {"current_week": database.current_week(con)} if use_sqlite else load_checkpoint(CHECKPOINT_FILE)
+        quotas = quota_tracker(df, config, checkpoint)
+        next_week = checkpoint.get("current_week", 0) + 1
+
+    original = dict(zip(df["name"], df["availability"].astype(int)))
+    index = {name: i for i, name in enumerate(df["name"])}
+
     while True:
         print("\n--- Current Availability Options ---")
         for i, row in df.iterrows():
             status = "Available " if int(row["availability"]) == 1 else "Unavailable"
             print(f"[{i}] {row['name']:<20} - {status}")
-            
+
         quit_idx = len(df)
         print(f"[{quit_idx}] Quit")
-        
+
         try:
             choice = input("\nEnter the number of the person to toggle their availability (or Quit to exit): ").strip()
-            
+
             if choice == str(quit_idx) or choice.lower() in ('q', 'quit'):
                 print("Saving changes and exiting...")
                 break
-                
+
             idx = int(choice)
             if 0 <= idx < len(df):
                 current_status = int(df.at[idx, "availability"])
                 new_status = 0 if current_status == 1 else 1
-                df.at[idx, "availability"] = new_status
-                
                 name = df.at[idx, 'name']
+
+                if quotas is None:
+                    df.at[idx, "availability"] = new_status
+                else:
+                    before = week_quotas(df, config, quotas, next_week)
+                    left_before = dict(quotas.remaining)
+                    apply_availability(df, {name: new_status}, quotas, index)
+
                 new_status_str = "Available" if new_status == 1 else "Unavailable"
                 print(f"✅ Toggled '{name}' to {new_status_str}.")
+                if quotas is not None:
+                    after = week_quotas(df, config, quotas, next_week)
+                    # With a calendar table each week has its own quotas, so no slot totals
+                    remaining = None if config.get("per_week_table") else (left_before, quotas.remaining)
+                    for line in quota_preview(before, after, config["cleanup_types"], remaining):
+                        print(f"📊 Week {next_week}+: {line}")
+                    if quotas.short:
+                        print("⚠ Warning: Cannot reduce per_week_actual further, below minimums!")
             else:
                 print("Invalid number. Please try again.")
-                
+
         except ValueError:
             print("Invalid input. Please enter a valid number.")
 
-    # Save to Excel before quitting
-    df.to_excel(EXCEL_FILE, index=False)
-    print(f"Saved changes to {EXCEL_FILE}.")
+    changed = {name: int(a) for name, a in zip(df["name"], df["availability"]) if int(a) != original[name]}
+
+    # Save before quitting
+    if use_sqlite:
+        database.set_availability(con, changed)
+        con.close()
+        print(f"Saved changes to {database.DB_FILE}.")
+    else:
+        write_roster(df, EXCEL_FILE)
+        if changed and quotas is not None:
+            append_event(checkpoint, availability_event(next_week, changed, quotas), CHECKPOINT_FILE)
+        print(f"Saved changes to {EXCEL_FILE}.")
+
+    if changed and quotas is not None and os.path.exists(PLAN_FILE):
+        print(f"ℹ {PLAN_FILE} was planned with the old availability; run planner.py to re-plan "
+              "(until then the scheduler fills what the plan no longer covers).")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,251 @@
+from collections.abc import Mapping
+import numpy as np
+
+NO_CLEANUP = -1
+
+
+def _normalize_inhouse(val):
+    try:
+        return str(int(float(str(val))))
+    except ValueError:
+        return None
+
+
+class SchedulerState:
+    """
+    Compact, array-backed scheduler state.
+
+    People and cleanups get integer ids. Cumulative counts are a people x cleanups
+    int32 array, the last cleanup is an int16 array (-1 = none) and each in-house
+    group's base is stored once (one row per group) instead of per person. Each
+    scheduled week is kept as one int16 array of cleanup ids.
+
+    assigned_so_far, last_cleanup and base_by_person are dict-like views over the
+    arrays, so the state can be passed straight to schedule_one_week_final.
+    Converts to and from the checkpoint.json format.
+    """
+
+    def __init__(self, names, inhouse_by_name, cleanup_types, base_by_inhouse):
+        self.names = list(names)
+        self.person_id = {name: i for i, name in enumerate(self.names)}
+        self.cleanup_types = list(cleanup_types)
+        self.cleanup_id = {c: j for j, c in enumerate(self.cleanup_types)}
+
+        # One base row per in-house group; the extra last row is "no base" (out-of-house)
+        self.group_keys = sorted(base_by_inhouse)
+        group_index = {g: k for k, g in enumerate(self.group_keys)}
+        no_group = len(self.group_keys)
+        self.group_dicts = [base_by_inhouse[g] for g in self.group_keys] + [{}]
+        self.group_base = np.zeros((no_group + 1, len(self.cleanup_types)), dtype=np.int32)
+        self.group_eligible = np.zeros((no_group + 1, len(self.cleanup_types)), dtype=bool)
+        for k, g in enumerate(self.group_keys):
+            for c, b in base_by_inhouse[g].items():
+                self.group_base[k, self.cleanup_id[c]] = b
+                self.group_eligible[k, self.cleanup_id[c]] = True
+
+        self.group = np.array(
+            [group_index.get(_normalize_inhouse(inhouse_by_name.get(n)), no_group) for n in self.names],
+            dtype=np.int8
+        )
+        self.counts = np.zeros((len(self.names), len(self.cleanup_types)), dtype=np.int32)
+        self.last = np.full(len(self.names), NO_CLEANUP, dtype=np.int16)
+        self.history = {}  # week -> int16 array of cleanup ids (-1 = not assigned)
+        self.current_week = 0
+        self.round_robin_index = 0
+
+        self.assigned_so_far = _CountsView(self)
+        self.last_cleanup = _LastCleanupView(self)
+        self.base_by_person = _BaseView(self)
+
+    # ---------------------------
+    # Array accessors
+    # ---------------------------
+    def ids(self, people):
+        return np.fromiter((self.person_id[p] for p in people), dtype=np.int64, count=len(people))
+
+    def base_rows(self, ids):
+        return self.group_base[self.group[ids]]
+
+    def eligible_rows(self, ids):
+        return self.group_eligible[self.group[ids]]
+
+    def record_week(self, week, week_assignment):
+        """Store one scheduled week (person -> cleanup) as a cleanup-id array."""
+        row = np.full(len(self.names), NO_CLEANUP, dtype=np.int16)
+        for person, cleanup in week_assignment.items():
+            row[self.person_id[person]] = self.cleanup_id[cleanup]
+        self.history[int(week)] = row
+        self.current_week = max(self.current_week, int(week))
+
+    def week_assignments(self, week):
+        """One scheduled week as a person -> cleanup dict."""
+        row = self.history[int(week)]
+        return {self.names[i]: self.cleanup_types[row[i]] for i in np.flatnonzero(row != NO_CLEANUP)}
+
+    # ---------------------------
+    # checkpoint.json conversion
+    # ---------------------------
+    @classmethod
+    def from_checkpoint(cls, checkpoint, df, config):
+        """
+        Build the state for the roster in df. People that only appear in the
+        checkpoint (e.g. removed from actives.xlsx) are kept without a base.
+        """
+        names = df["name"].tolist()
+        extra = set(checkpoint.get("assigned_so_far", {})) | set(checkpoint.get("last_cleanup", {}))
+        extra_cleanups = {c for counts in checkpoint.get("assigned_so_far", {}).values() for c in counts}
+        extra_cleanups.update(checkpoint.get("last_cleanup", {}).values())
+        for assignments in checkpoint.get("weekly_history", {}).values():
+            extra.update(assignments)
+            extra_cleanups.update(assignments.values())
+        known = set(names)
+        names += sorted(p for p in extra if p not in known)
+
+        # Cleanups outside the config (e.g. a mistyped reassignment) get trailing ids
+        cleanup_types = list(config["cleanup_types"])
+        cleanup_types += sorted(c for c in extra_cleanups if c is not None and c not in set(cleanup_types))
+
+        state = cls(
+            names,
+            dict(zip(df["name"], df["inhouse"])),
+            cleanup_types,
+            config["base_by_inhouse"]
+        )
+
+        for person, counts in checkpoint.get("assigned_so_far", {}).items():
+            i = state.person_id[person]
+            for c, k in counts.items():
+                state.counts[i, state.cleanup_id[c]] = k
+
+        for person, cleanup in checkpoint.get("last_cleanup", {}).items():
+            state.last[state.person_id[person]] = state.cleanup_id.get(cleanup, NO_CLEANUP)
+
+        for wk, assignments in checkpoint.get("weekly_history", {}).items():
+            state.record_week(wk, assignments)
+
+        state.current_week = checkpoint.get("current_week", 0)
+        state.round_robin_index = checkpoint.get("round_robin_index", 0)
+        return state
+
+    def to_checkpoint(self, checkpoint=None):
+        """
+        Write the state into a checkpoint dict (existing keys are kept) and return it.
+        """
+        checkpoint = {} if checkpoint is None else checkpoint
+        cleanup_types = self.cleanup_types
+
+        assigned_so_far = {}
+        for i, name in enumerate(self.names):
+            keep = self.group_eligible[self.group[i]] | (self.counts[i] != 0)
+            assigned_so_far[name] = {
+                cleanup_types[j]: int(self.counts[i, j]) for j in np.flatnonzero(keep)
+            }
+
+        weekly_history = {}
+        for wk in sorted(self.history):
+            weekly_history[str(wk)] = self.week_assignments(wk)
+
+        checkpoint.update({
+            "current_week": int(self.current_week),
+            "assigned_so_far": assigned_so_far,
+            "last_cleanup": {
+                name: (cleanup_types[j] if j != NO_CLEANUP else None)
+                for name, j in zip(self.names, self.last.tolist())
+            },
+            "weekly_history": weekly_history,
+            "round_robin_index": int(self.round_robin_index),
+        })
+        return checkpoint
+
+
+# ---------------------------
+# Dict-like views used by schedule_one_week_final
+# ---------------------------
+class _CountsRow:
+    __slots__ = ("_state", "_i")
+
+    def __init__(self, state, i):
+        self._state = state
+        self._i = i
+
+    def get(self, cleanup, default=0):
+        j = self._state.cleanup_id.get(cleanup)
+        return default if j is None else self._state.counts.item(self._i, j)
+
+    def __getitem__(self, cleanup):
+        return self.get(cleanup, 0)
+
+    def __setitem__(self, cleanup, value):
+        self._state.counts[self._i, self._state.cleanup_id[cleanup]] = value
+
+    def keys(self):
+        state = self._state
+        keep = state.group_eligible[state.group[self._i]] | (state.counts[self._i] != 0)
+        return [state.cleanup_types[j] for j in np.flatnonzero(keep)]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def items(self):
+        return [(c, self[c]) for c in self.keys()]
+
+
+class _CountsView(Mapping):
+    def __init__(self, state):
+        self.state = state
+        # Row views are tiny (__slots__) and reused, so lookups allocate nothing
+        self._rows = [_CountsRow(state, i) for i in range(len(state.names))]
+
+    def __getitem__(self, person):
+        return self._rows[self.state.person_id[person]]
+
+    def __iter__(self):
+        return iter(self.state.names)
+
+    def __len__(self):
+        return len(self.state.names)
+
+
+class _LastCleanupView(Mapping):
+    def __init__(self, state):
+        self.state = state
+
+    def __getitem__(self, person):
+        j = self.state.last.item(self.state.person_id[person])
+        return self.state.cleanup_types[j] if j != NO_CLEANUP else None
+
+    def get(self, person, default=None):
+        i = self.state.person_id.get(person)
+        if i is None:
+            return default
+        j = self.state.last.item(i)
+        return self.state.cleanup_types[j] if j != NO_CLEANUP else None
+
+    def __setitem__(self, person, cleanup):
+        self.state.last[self.state.person_id[person]] = (
+            self.state.cleanup_id[cleanup] if cleanup is not None else NO_CLEANUP
+        )
+
+    def __iter__(self):
+        return iter(self.state.names)
+
+    def __len__(self):
+        return len(self.state.names)
+
+
+class _BaseView(Mapping):
+    def __init__(self, state):
+        self.state = state
+
+    def __getitem__(self, person):
+        return self.state.group_dicts[self.state.group.item(self.state.person_id[person])]
+
+    def get(self, person, default=None):
+        i = self.state.person_id.get(person)
+        return default if i is None else self.state.group_dicts[self.state.group.item(i)]
+
+    def __iter__(self):
+        return iter(self.state.names)
+
+    def __len__(self):
+        return len(self.state.names)
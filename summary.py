@@ -1,7 +1,10 @@
 import json
 import pandas as pd
+import database
+from roster import read_roster
+from journal import CHECKPOINT_FILE, load_checkpoint
+from metrics import IN_HOUSE_GROUPS, assignment_tables
 
-CHECKPOINT_FILE = "checkpoint.json"
 CONFIG_FILE = "cleanup_config.json"
 EXCEL_FILE = "actives.xlsx"
 OUTPUT_FILE = "summary.xlsx"
@@ -13,94 +16,59 @@ with open(CONFIG_FILE, "r") as f:
     config = json.load(f)
 
 cleanup_types = config["cleanup_types"]
-global_base = config["global_base"]
-base_by_inhouse = config["base_by_inhouse"]
 
 # ---------------------------
-# Load checkpoint
+# Load checkpoint & roster
 # ---------------------------
-with open(CHECKPOINT_FILE, "r") as f:
-    checkpoint = json.load(f)
-
-assigned_so_far = checkpoint["assigned_so_far"]
-names = list(assigned_so_far.keys())
+if database.uses_sqlite(config):
+    con = database.connect()
+    checkpoint = database.load_checkpoint(con)
+    df = database.load_members(con)
+    con.close()
+else:
+    checkpoint = load_checkpoint(CHECKPOINT_FILE)
+    df = read_roster(EXCEL_FILE)
 
 # ---------------------------
-# Load Excel & normalize inhouse
+# Assignment and base matrices (people × cleanups, shared with semester scoring)
 # ---------------------------
-df = pd.read_excel(EXCEL_FILE)
-
-def normalize_inhouse(val):
-    try:
-        return str(int(val))
-    except (ValueError, TypeError):
-        return "1"  # default: out-of-house
+groups, counts, base, applies = assignment_tables(df, config, checkpoint["assigned_so_far"])
 
-inhouse_map = {
-    row["name"]: normalize_inhouse(row["inhouse"])
-    for _, row in df.iterrows()
-}
+diff = counts - base.fillna(0).astype(int)
 
 # ---------------------------
 # 1️⃣ Illegal assignment checks
 # ---------------------------
-illegal_rows = []
-
-for name in names:
-    inhouse_val = inhouse_map.get(name, "1")
-    person_base = base_by_inhouse.get(inhouse_val, global_base)
-
-    for c, count in assigned_so_far[name].items():
-        if c not in person_base and count > 0:
-            illegal_rows.append({
-                "name": name,
-                "cleanup": c,
-                "assigned": count,
-                "allowed": "NO"
-            })
-
-illegal_df = pd.DataFrame(illegal_rows)
+illegal = counts.where(~applies & (counts > 0)).stack().dropna()
+illegal_df = pd.DataFrame({
+    "name": illegal.index.get_level_values(0),
+    "cleanup": illegal.index.get_level_values(1),
+    "assigned": illegal.to_numpy().astype(int),
+    "allowed": "NO"
+})
 
 # ---------------------------
 # 2️⃣ Deviation warnings (|diff| > 1)
 # ---------------------------
-deviation_warning_rows = []
-
-for name in names:
-    inhouse_val = inhouse_map.get(name, "1")
-    person_base = base_by_inhouse.get(inhouse_val, global_base)
-
-    for c, expected in person_base.items():
-        assigned = int(assigned_so_far[name].get(c, 0))
-        diff = assigned - expected
-
-        if abs(diff) > 1:
-            deviation_warning_rows.append({
-                "name": name,
-                "cleanup": c,
-                "assigned": assigned,
-                "expected": expected,
-                "diff": diff
-            })
-
-deviation_warning_df = pd.DataFrame(deviation_warning_rows)
+warn = diff.where(applies & (diff.abs() > 1)).stack().dropna()
+deviation_warning_df = pd.DataFrame({
+    "name": warn.index.get_level_values(0),
+    "cleanup": warn.index.get_level_values(1),
+    "assigned": counts.stack().reindex(warn.index).to_numpy(),
+    "expected": base.stack().reindex(warn.index).to_numpy().astype(int),
+    "diff": warn.to_numpy().astype(int)
+})
 
 # ---------------------------
 # Filter Names
 # ---------------------------
-in_house_names = [n for n in names if inhouse_map.get(n, "1") in {"2", "3"}]
-ooh_names = [n for n in names if inhouse_map.get(n, "1") in {"0", "1"}]
+in_house_names = groups.index[groups.isin(IN_HOUSE_GROUPS)].tolist()
+ooh_names = groups.index[groups.isin({"0", "1"})].tolist()
 
 # ---------------------------
 # 3️⃣ Assigned cleanups per person
 # ---------------------------
-summary = pd.DataFrame.from_dict(
-    assigned_so_far,
-    orient="index"
-).fillna(0)
-
-# Ensure all names are present, even if they had 0 cleanups
-summary = summary.reindex(index=names, columns=cleanup_types, fill_value=0)
+summary = counts[cleanup_types].copy()
 summary["total"] = summary.sum(axis=1)
 
 # Split summaries
@@ -110,19 +78,12 @@ ooh_summary = summary.loc[ooh_names]
 # ---------------------------
 # 4️⃣ Deviation from theoretical base (IN-HOUSE ONLY)
 # ---------------------------
-# Start as object type to allow both numbers and empty strings
-deviation = in_house_summary.copy().astype(object)
-
-for name in in_house_names:
-    inhouse_val = inhouse_map.get(name, "1")
-    person_base = base_by_inhouse.get(inhouse_val, global_base)
-
-    for c in cleanup_types:
-        if c in person_base:
-            deviation.loc[name, c] = in_house_summary.loc[name, c] - person_base[c]
-        else:
-            deviation.loc[name, c] = ""  # not applicable
-
+# Object type so cleanups that do not apply can be left blank
+deviation = (
+    diff.loc[in_house_names, cleanup_types]
+    .astype(object)
+    .where(applies.loc[in_house_names, cleanup_types], "")
+)
 deviation["total"] = in_house_summary["total"]
 
 # ---------------------------
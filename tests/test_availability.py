@@ -0,0 +1,63 @@
+import pandas as pd
+
+from availability import IN_HOUSE, calendar_config, week_availability
+from generate_roster import build_config, generate_roster
+from quotas import QuotaTracker
+
+
+def calendar_workspace(tmp_path, away_rows):
+    df = generate_roster(40, seed=1)
+    config = build_config(df, num_weeks=4)
+    config["start_date"] = "2026-01-05"
+    calendar_file = tmp_path / "availability_calendar.csv"
+    calendar_file.write_text("name,start,end\n" + "".join(f"{n},{s},{e}\n" for n, s, e in away_rows))
+    config.update(calendar_config(df, config, str(calendar_file)))
+    return df, config
+
+
+def inhouse_names(df):
+    return df.loc[pd.to_numeric(df["inhouse"]).isin(IN_HOUSE), "name"].tolist()
+
+
+def test_week_availability_reads_away_names_and_table_row(tmp_path):
+    df = generate_roster(40, seed=1)
+    a, b = inhouse_names(df)[:2]
+    # a misses week 2 only, b overlaps the last day of week 2 and all of week 3
+    df, config = calendar_workspace(tmp_path, [(a, "2026-01-12", "2026-01-14"), (b, "2026-01-18", "2026-01-25")])
+
+    assert sorted(config["per_week_table"]) == ["1", "2", "3", "4"]
+
+    away, quotas = week_availability(df, config, 1)
+    assert away == set()
+    assert quotas == config["per_week_actual"]
+
+    away, quotas = week_availability(df, config, 2)
+    assert away == {a, b}
+    assert quotas == QuotaTracker.from_config(config, 2).per_week_actual
+    assert sum(quotas.values()) == sum(config["per_week_actual"].values()) - 2
+
+    away, quotas = week_availability(df, config, 3)
+    assert away == {b}
+    assert quotas == QuotaTracker.from_config(config, 1).per_week_actual
+
+
+def test_week_availability_takes_roster_unavailability_on_top(tmp_path):
+    df = generate_roster(40, seed=1)
+    a, c = inhouse_names(df)[0], inhouse_names(df)[2]
+    df, config = calendar_workspace(tmp_path, [(a, "2026-01-12", "2026-01-18")])
+    df.loc[df["name"] == c, "availability"] = 0
+
+    away, quotas = week_availability(df, config, 2)
+    assert away == {a}
+    assert quotas == QuotaTracker.from_config(config, 2).per_week_actual
+
+    # Unavailable in the roster and away by the calendar counts once
+    df.loc[df["name"] == a, "availability"] = 0
+    df.loc[df["name"] == c, "availability"] = 1
+    assert week_availability(df, config, 2) == ({a}, config["per_week_table"]["2"])
+
+
+def test_week_availability_without_table(tmp_path):
+    df = generate_roster(40, seed=1)
+    config = build_config(df, num_weeks=4)
+    assert week_availability(df, config, 1) == (set(), None)
@@ -0,0 +1,94 @@
+import itertools
+import random
+
+import numpy as np
+
+from cleanup import ScheduleStats, _assign_in_house_flow, _min_cost_assignment
+
+
+def brute_force(cost, capacity):
+    """(rows placed, total cost) of the best assignment: most rows first, then least cost."""
+    n, m = cost.shape
+    best = None
+    for choice in itertools.product(range(-1, m), repeat=n):
+        if any(j != -1 and not np.isfinite(cost[i, j]) for i, j in enumerate(choice)):
+            continue
+        if any(choice.count(j) > capacity[j] for j in range(m)):
+            continue
+        placed = sum(j != -1 for j in choice)
+        total = sum(cost[i, j] for i, j in enumerate(choice) if j != -1)
+        if best is None or (-placed, total) < (-best[0], best[1]):
+            best = (placed, total)
+    return best
+
+
+def test_min_cost_assignment_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(300):
+        n, m = rng.randint(1, 6), rng.randint(1, 3)
+        # Few distinct values so identical rows (grouped by the solver) are common
+        cost = np.array([
+            [np.inf if rng.random() < 0.25 else float(rng.randint(-3, 3)) for _ in range(m)]
+            for _ in range(n)
+        ])
+        capacity = np.array([rng.randint(0, 3) for _ in range(m)])
+
+        slot_of = _min_cost_assignment(cost, capacity)
+
+        assert all(np.isfinite(cost[i, j]) for i, j in enumerate(slot_of) if j != -1)
+        assert all((slot_of == j).sum() <= capacity[j] for j in range(m))
+        placed = int((slot_of != -1).sum())
+        total = sum(cost[i, j] for i, j in enumerate(slot_of) if j != -1)
+        assert (placed, total) == brute_force(cost, capacity)
+
+
+def flow_week(people, per_week_actual, base_by_person, assigned_so_far=None, last_cleanup=None):
+    cleanup_types = list(per_week_actual)
+    assigned_so_far = assigned_so_far or {p: {} for p in people}
+    return _assign_in_house_flow(
+        people, cleanup_types, per_week_actual, base_by_person, assigned_so_far,
+        last_cleanup or {}, random.Random(0), ScheduleStats()
+    )
+
+
+def test_flow_fills_quotas_with_eligible_people():
+    people = [f"p{i}" for i in range(6)]
+    base_by_person = {p: {"kitchen": 2, "stairs": 2} for p in people[:4]}
+    base_by_person.update({p: {"kitchen": 2, "bathroom_2": 2} for p in people[4:]})
+    per_week_actual = {"kitchen": 2, "stairs": 2, "bathroom_2": 2}
+
+    selected = flow_week(people, per_week_actual, base_by_person)
+
+    assert len(selected) == 6
+    for cleanup, quota in per_week_actual.items():
+        assert list(selected.values()).count(cleanup) == quota
+    assert all(cleanup in base_by_person[p] for p, cleanup in selected.items())
+    assert selected["p4"] == selected["p5"] == "bathroom_2"
+
+
+def test_flow_skips_cleanups_at_the_base_cap():
+    people = ["a", "b"]
+    base_by_person = {p: {"kitchen": 1, "stairs": 1} for p in people}
+    assigned_so_far = {"a": {"kitchen": 2}, "b": {}}
+
+    selected = flow_week(people, {"kitchen": 1, "stairs": 1}, base_by_person, assigned_so_far)
+
+    assert selected == {"a": "stairs", "b": "kitchen"}
+
+
+def test_flow_avoids_back_to_backs_over_deficits():
+    people = ["a", "b"]
+    base_by_person = {p: {"kitchen": 3, "stairs": 3} for p in people}
+    # a is far behind on kitchen but did it last week
+    assigned_so_far = {"a": {"stairs": 2}, "b": {"kitchen": 2}}
+    last_cleanup = {"a": "kitchen", "b": "stairs"}
+
+    selected = flow_week(people, {"kitchen": 1, "stairs": 1}, base_by_person, assigned_so_far, last_cleanup)
+
+    assert selected == {"a": "stairs", "b": "kitchen"}
+
+
+def test_flow_takes_a_back_to_back_only_when_forced():
+    base_by_person = {"a": {"kitchen": 3}}
+    selected = flow_week(["a"], {"kitchen": 1}, base_by_person, last_cleanup={"a": "kitchen"})
+    assert selected == {"a": "kitchen"}
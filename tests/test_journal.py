@@ -0,0 +1,120 @@
+import json
+import os
+
+from journal import (
+    CHECKPOINT_FILE,
+    JOURNAL_FILE,
+    SNAPSHOT_EVERY,
+    append_event,
+    empty_checkpoint,
+    journal_path,
+    load_checkpoint,
+    save_checkpoint,
+)
+from quotas import QuotaTracker
+
+CONFIG = {
+    "cleanup_types": ["kitchen", "stairs"],
+    "per_week_actual": {"kitchen": 2, "stairs": 2},
+    "min_per_week": {"kitchen": 1, "stairs": 1},
+}
+
+
+def week_event(week, assignments):
+    return {"event": "week", "week": week, "assignments": assignments, "round_robin_index": week}
+
+
+EVENTS = [
+    week_event(2, {"a": "stairs", "b": "kitchen", "c": "kitchen"}),
+    week_event(3, {"a": "kitchen", "b": "stairs", "c": "stairs"}),
+    {"event": "reassign", "changes": [
+        {"week": 3, "person": "a", "old": "kitchen", "new": "stairs"},
+        {"week": 2, "person": "c", "old": "kitchen", "new": "stairs"},
+    ]},
+    {"event": "availability", "week": 4, "changes": {"c": 0},
+     "quotas": QuotaTracker.from_config(CONFIG, 1, 2).state()},
+    week_event(4, {"a": "kitchen", "b": "kitchen"}),
+    week_event(5, {"a": "stairs", "b": "stairs"}),
+    {"event": "rollback", "weeks": [5, 4]},
+    week_event(4, {"a": "stairs", "b": "kitchen"}),
+    week_event(5, {"a": "kitchen", "b": "stairs"}),
+    {"event": "reassign", "changes": [{"week": 5, "person": "b", "old": "stairs", "new": "kitchen"}]},
+]
+
+
+def snapshot(workdir):
+    """A snapshot with week 1 scheduled and the quota tracker state, no journal."""
+    checkpoint = empty_checkpoint()
+    checkpoint["quotas"] = QuotaTracker.from_config(CONFIG, 0, 5).state()
+    os.makedirs(workdir, exist_ok=True)
+    checkpoint_file = os.path.join(workdir, CHECKPOINT_FILE)
+    save_checkpoint(checkpoint, checkpoint_file)
+    append_event(checkpoint, week_event(1, {"a": "kitchen", "b": "stairs", "c": "kitchen"}), checkpoint_file, 1)
+    return checkpoint_file
+
+
+def replay(workdir, snapshot_every):
+    checkpoint_file = snapshot(workdir)
+    checkpoint = load_checkpoint(checkpoint_file)
+    for event in EVENTS:
+        append_event(checkpoint, event, checkpoint_file, snapshot_every)
+    return checkpoint_file, checkpoint
+
+
+def state(checkpoint):
+    return {k: v for k, v in checkpoint.items() if k != "snapshot_seq"}
+
+
+def test_replay_builds_the_expected_state(tmp_path):
+    checkpoint_file, checkpoint = replay(str(tmp_path), snapshot_every=1000)
+    loaded = load_checkpoint(checkpoint_file)
+
+    assert state(loaded) == state(checkpoint)
+    assert loaded["current_week"] == 5
+    assert loaded["round_robin_index"] == 5
+    assert loaded["journal_seq"] == 1 + len(EVENTS)
+    assert loaded["weekly_history"]["2"] == {"a": "stairs", "b": "kitchen", "c": "stairs"}
+    assert loaded["weekly_history"]["5"] == {"a": "kitchen", "b": "kitchen"}
+    assert loaded["assigned_so_far"] == {
+        "a": {"kitchen": 2, "stairs": 3},
+        "b": {"kitchen": 3, "stairs": 2},
+        "c": {"kitchen": 1, "stairs": 2},
+    }
+    assert loaded["last_cleanup"] == {"a": "kitchen", "b": "kitchen", "c": "stairs"}
+
+    # The availability event set the tracker; weeks 4-5 used up its slots
+    quotas = loaded["quotas"]
+    assert quotas["weeks_left"] == 0
+    assert quotas["per_week_actual"] == {"kitchen": 1, "stairs": 2}
+    assert quotas["remaining"] == {"kitchen": 0, "stairs": 0}
+
+
+def test_compaction_gives_the_same_state_as_the_uncompacted_replay(tmp_path):
+    plain_file, _ = replay(str(tmp_path / "plain"), snapshot_every=1000)
+    compact_file, _ = replay(str(tmp_path / "compact"), snapshot_every=SNAPSHOT_EVERY)
+
+    with open(compact_file) as f:
+        compacted = json.load(f)
+    # The snapshot was taken at seq 1, so it is compacted SNAPSHOT_EVERY events later
+    assert compacted["snapshot_seq"] == 1 + SNAPSHOT_EVERY
+    with open(journal_path(compact_file)) as f:
+        assert len(f.readlines()) == len(EVENTS) - SNAPSHOT_EVERY
+    with open(journal_path(plain_file)) as f:
+        assert len(f.readlines()) == len(EVENTS)
+
+    assert state(load_checkpoint(compact_file)) == state(load_checkpoint(plain_file))
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    checkpoint_file, _ = replay(str(tmp_path), snapshot_every=1000)
+    before = load_checkpoint(checkpoint_file)
+
+    with open(os.path.join(str(tmp_path), JOURNAL_FILE), "a") as f:
+        f.write('{"seq": 12, "event": "week", "week": 6, "assignm')
+
+    loaded = load_checkpoint(checkpoint_file)
+    assert state(loaded) == state(before)
+
+    # The next append starts on a fresh line and replays normally
+    append_event(loaded, week_event(6, {"a": "stairs"}), checkpoint_file, 1000)
+    assert load_checkpoint(checkpoint_file)["weekly_history"]["6"] == {"a": "stairs"}
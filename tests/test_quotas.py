@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from quotas import CLEANUP_TYPES, MIN_PER_WEEK, QuotaTracker, compute_per_week_actual
+
+
+def baseline_per_week_actual(config, unavailable_inhouse):
+    """schedule.py's original inline loop: one slot off the roomiest cleanup per unavailable member."""
+    per_week_actual = config["per_week_actual"].copy()
+    min_per_week = config.get("min_per_week", {})
+    for _ in range(unavailable_inhouse):
+        candidates = [c for c in config["cleanup_types"] if per_week_actual.get(c, 0) > min_per_week.get(c, 0)]
+        if candidates:
+            c_to_reduce = max(candidates, key=lambda c: per_week_actual[c] - min_per_week.get(c, 0))
+            per_week_actual[c_to_reduce] -= 1
+        else:
+            break
+    return per_week_actual
+
+
+def config_for(inhouse_count):
+    return {
+        "cleanup_types": CLEANUP_TYPES.copy(),
+        "min_per_week": MIN_PER_WEEK.copy(),
+        "per_week_actual": compute_per_week_actual(MIN_PER_WEEK, inhouse_count),
+    }
+
+
+@pytest.mark.parametrize("inhouse_count", [18, 19, 25, 40, 80])
+def test_tracker_matches_the_baseline_for_any_change_sequence(inhouse_count):
+    config = config_for(inhouse_count)
+    rng = random.Random(inhouse_count)
+    weeks_left = 10
+
+    for _ in range(20):
+        tracker = QuotaTracker.from_config(config, weeks_left=weeks_left)
+        unavailable = 0
+        for _ in range(30):
+            # Members becoming unavailable (possibly several at once) or coming back
+            delta = rng.choice([1, 1, 2, -1, -2])
+            delta = max(delta, -unavailable)
+            unavailable += delta
+            tracker.change(delta)
+
+            expected = baseline_per_week_actual(config, unavailable)
+            assert tracker.per_week_actual == expected
+            assert tracker.remaining == {c: expected[c] * weeks_left for c in CLEANUP_TYPES}
+            assert tracker.unavailable == unavailable
+
+            # A tracker built for the final count in one step agrees too
+            assert QuotaTracker.from_config(config, unavailable).per_week_actual == expected
+
+
+def test_tracker_reports_members_it_could_not_take_out():
+    config = config_for(20)  # two slots above the minimums
+    tracker = QuotaTracker.from_config(config, 5)
+    assert tracker.per_week_actual == MIN_PER_WEEK
+    assert tracker.short == 3
+
+    tracker.change(-4)
+    assert tracker.short == 0
+    assert tracker.per_week_actual == baseline_per_week_actual(config, 1)
+
+
+def test_tracker_state_round_trips():
+    config = config_for(40)
+    tracker = QuotaTracker.from_config(config, 4, weeks_left=7)
+    restored = QuotaTracker.from_state(config, tracker.state())
+    restored.change(-2)
+    tracker.change(-2)
+    assert restored.state() == tracker.state()
+    assert restored.per_week_actual == baseline_per_week_actual(config, 2)
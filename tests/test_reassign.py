@@ -0,0 +1,128 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import database
+from conftest import REPO_DIR
+from generate_roster import write_workspace
+from journal import JOURNAL_FILE, load_checkpoint
+from roster import read_roster
+from semester import load_inputs, run_semester
+
+WATCHED = ["checkpoint.json", "weekly_assignments.csv", "actives.xlsx"]
+
+
+def scheduled_workspace(workdir):
+    write_workspace(workdir, 30, seed=3, num_weeks=4)
+    return run_semester(workdir, seed=3)
+
+
+def other_cleanup(checkpoint, person, week, cleanup_types):
+    """A cleanup the person may take instead of their week `week` assignment."""
+    old = checkpoint["weekly_history"][str(week)][person]
+    return next(c for c in cleanup_types if c != old)
+
+
+def batch_rows(checkpoint, cleanup_types, picks):
+    return [
+        {"name": person, "week": week, "cleanup": other_cleanup(checkpoint, person, week, cleanup_types)}
+        for person, week in picks
+    ]
+
+
+def run_reassign(workdir, rows):
+    batch_file = os.path.join(workdir, "batch.json")
+    with open(batch_file, "w") as f:
+        json.dump(rows, f)
+    return subprocess.run(
+        [sys.executable, os.path.join(REPO_DIR, "reassign.py"), "--batch", batch_file],
+        cwd=workdir, capture_output=True, text=True
+    )
+
+
+def snapshot_files(workdir):
+    contents = {}
+    for name in WATCHED + [JOURNAL_FILE]:
+        path = os.path.join(workdir, name)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                contents[name] = f.read()
+    return contents
+
+
+def test_batch_with_an_invalid_row_changes_nothing(tmp_path):
+    workdir = str(tmp_path)
+    checkpoint = scheduled_workspace(workdir)
+    _, config, _ = load_inputs(workdir)
+    people = sorted(checkpoint["weekly_history"]["2"])
+    rows = batch_rows(checkpoint, config["cleanup_types"], [(people[0], 2), (people[1], 3)])
+    rows.append({"name": "Nobody", "week": 2, "cleanup": "kitchen"})
+    before = snapshot_files(workdir)
+
+    result = run_reassign(workdir, rows)
+
+    assert result.returncode != 0
+    assert "Nobody had no assignment in week 2" in result.stderr
+    assert snapshot_files(workdir) == before
+
+
+def test_valid_batch_is_one_event_with_its_count_deltas(tmp_path):
+    workdir = str(tmp_path)
+    checkpoint = scheduled_workspace(workdir)
+    _, config, _ = load_inputs(workdir)
+    people = sorted(checkpoint["weekly_history"]["2"])
+    picks = [(people[0], 2), (people[0], 4), (people[1], 3)]
+    rows = batch_rows(checkpoint, config["cleanup_types"], picks)
+
+    result = run_reassign(workdir, rows)
+    assert result.returncode == 0, result.stderr
+
+    with open(os.path.join(workdir, JOURNAL_FILE)) as f:
+        events = [json.loads(line) for line in f]
+    assert len(events) == 1
+    assert events[0]["event"] == "reassign"
+    assert [(c["person"], c["week"], c["new"]) for c in events[0]["changes"]] == [
+        (r["name"], r["week"], r["cleanup"]) for r in rows
+    ]
+
+    expected = {p: {c: k for c, k in counts.items() if k} for p, counts in checkpoint["assigned_so_far"].items()}
+    for r in rows:
+        old = checkpoint["weekly_history"][str(r["week"])][r["name"]]
+        counts = expected[r["name"]]
+        counts[old] -= 1
+        counts[r["cleanup"]] = counts.get(r["cleanup"], 0) + 1
+
+    after = load_checkpoint(os.path.join(workdir, "checkpoint.json"))
+    for person in {r["name"] for r in rows}:
+        assert {c: k for c, k in after["assigned_so_far"][person].items() if k} == \
+            {c: k for c, k in expected[person].items() if k}
+    # Week 4 is the latest, so that reassignment is people[0]'s last cleanup
+    assert after["last_cleanup"][people[0]] == rows[1]["cleanup"]
+
+    df = read_roster(os.path.join(workdir, "actives.xlsx")).set_index("name")
+    for person in {r["name"] for r in rows}:
+        for cleanup, count in expected[person].items():
+            assert int(df.at[person, cleanup]) == count
+
+
+def test_sqlite_batch_shares_the_validation(tmp_path):
+    workdir = str(tmp_path)
+    scheduled_workspace(workdir)
+    df, config, checkpoint = load_inputs(workdir)
+    con = database.connect(os.path.join(workdir, database.DB_FILE), create=True)
+    database.import_workspace(con, df, checkpoint)
+
+    person = sorted(checkpoint["weekly_history"]["2"])[0]
+    new = other_cleanup(checkpoint, person, 2, config["cleanup_types"])
+    with pytest.raises(RuntimeError, match="reassigned more than once"):
+        database.reassign_many(con, [(person, 2, new), (person, 2, new)], config["cleanup_types"])
+    assert database.week_assignments(con, 2)[person] == checkpoint["weekly_history"]["2"][person]
+
+    assert database.reassign_many(con, [(person, 2, new)], config["cleanup_types"]) == [
+        checkpoint["weekly_history"]["2"][person]
+    ]
+    assert database.week_assignments(con, 2)[person] == new
+    con.close()
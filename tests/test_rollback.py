@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+from collections import Counter
+
+import pytest
+
+from conftest import REPO_DIR
+from generate_roster import write_workspace
+from journal import JOURNAL_FILE, load_checkpoint
+from quotas import CLEANUP_TYPES
+from roster import read_roster
+from semester import run_semester
+from weekly import read_weeks
+
+NUM_WEEKS = 6
+
+
+def scheduled_workspace(workdir):
+    write_workspace(workdir, 30, seed=2, num_weeks=NUM_WEEKS)
+    return run_semester(workdir, seed=2)
+
+
+@pytest.mark.parametrize("args, target", [(["--weeks", "3"], 3), (["--to-week", "1"], 1)])
+def test_rollback_several_weeks_in_one_event(tmp_path, args, target):
+    workdir = str(tmp_path)
+    before = scheduled_workspace(workdir)
+    assert not os.path.exists(os.path.join(workdir, JOURNAL_FILE))
+
+    subprocess.run([sys.executable, os.path.join(REPO_DIR, "rollback.py")] + args, cwd=workdir, check=True,
+                   capture_output=True)
+
+    # One journal event for every removed week, latest first
+    with open(os.path.join(workdir, JOURNAL_FILE)) as f:
+        events = [json.loads(line) for line in f]
+    assert len(events) == 1
+    assert events[0]["event"] == "rollback"
+    assert events[0]["weeks"] == list(range(NUM_WEEKS, target, -1))
+
+    kept = {wk: a for wk, a in before["weekly_history"].items() if int(wk) <= target}
+    checkpoint = load_checkpoint(os.path.join(workdir, "checkpoint.json"))
+    assert checkpoint["current_week"] == target
+    assert checkpoint["weekly_history"] == kept
+
+    # Counts and last cleanups are those of the kept weeks alone
+    counts = {}
+    last_cleanup = {}
+    for wk in sorted(kept, key=int):
+        for person, cleanup in kept[wk].items():
+            counts.setdefault(person, Counter())[cleanup] += 1
+            last_cleanup[person] = cleanup
+    nonzero = {p: {c: k for c, k in cs.items() if k} for p, cs in checkpoint["assigned_so_far"].items()}
+    assert {p: dict(c) for p, c in counts.items()} == {p: cs for p, cs in nonzero.items() if cs}
+    for person in before["last_cleanup"]:
+        assert checkpoint["last_cleanup"].get(person) == last_cleanup.get(person)
+
+    assert read_weeks(os.path.join(workdir, "weekly_assignments.csv")) == kept
+
+    df = read_roster(os.path.join(workdir, "actives.xlsx")).set_index("name")
+    for person, row in df.iterrows():
+        assert {c: int(row[c]) for c in CLEANUP_TYPES if row[c]} == dict(counts.get(person, {}))
@@ -0,0 +1,56 @@
+import os
+import pickle
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+import roster
+from roster import cache_path, read_roster, write_roster
+
+
+def sample_roster():
+    return pd.DataFrame({
+        "name": [" Ann ", "Bob", "Cy"],
+        "inhouse": [2, 3, 0],
+        "availability": [1, 0, 1],
+        "kitchen": [1, 0, 2],
+        "phone": ["555-0100", None, "555-0102"],
+        "gpa": [3.5, float("nan"), 3.9],
+        "joined": pd.to_datetime(["2025-09-01", "2026-01-12", None]),
+    })
+
+
+def test_cached_roster_matches_the_parsed_workbook(tmp_path, monkeypatch):
+    excel_file = str(tmp_path / "actives.xlsx")
+    sample_roster().to_excel(excel_file, index=False)
+
+    parsed = read_roster(excel_file)
+    assert os.path.exists(cache_path(excel_file))
+
+    # The second read must come from the cache, not openpyxl
+    monkeypatch.setattr(roster.pd, "read_excel", lambda *a, **k: (_ for _ in ()).throw(AssertionError("parsed")))
+    cached = read_roster(excel_file)
+    assert_frame_equal(cached, parsed)
+    assert cached["name"].tolist() == ["Ann", "Bob", "Cy"]
+
+    cached.loc[0, "kitchen"] = 5
+    write_roster(cached, excel_file)
+    assert read_roster(excel_file).loc[0, "kitchen"] == 5
+
+
+class Exploit:
+    def __reduce__(self):
+        return (open, (os.path.join(os.environ["EXPLOIT_DIR"], "ran"), "w"))
+
+
+def test_pickled_cache_is_never_loaded(tmp_path, monkeypatch):
+    excel_file = str(tmp_path / "actives.xlsx")
+    sample_roster().to_excel(excel_file, index=False)
+    monkeypatch.setenv("EXPLOIT_DIR", str(tmp_path))
+    with open(cache_path(excel_file), "wb") as f:
+        pickle.dump({"version": roster.CACHE_VERSION, "df": Exploit()}, f)
+
+    df = read_roster(excel_file)
+
+    assert not os.path.exists(tmp_path / "ran")
+    assert df["name"].tolist() == ["Ann", "Bob", "Cy"]
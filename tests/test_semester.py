@@ -0,0 +1,23 @@
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "benchmarks"))
+
+from generate_roster import write_workspace
+from planner import PLAN_FILE, make_plan
+from semester import load_inputs, score_semester, search_semesters
+
+
+def test_search_commits_the_scored_semester_with_a_plan(tmp_path):
+    workdir = str(tmp_path)
+    write_workspace(workdir, 40, seed=1, num_weeks=6)
+    make_plan(workdir)
+    assert os.path.exists(os.path.join(workdir, PLAN_FILE))
+
+    best_seed, best_score = search_semesters(runs=3, workdir=workdir, workers=1)
+
+    df, config, checkpoint = load_inputs(workdir)
+    assert checkpoint["current_week"] == config["num_weeks"]
+    assert score_semester(df, config, checkpoint) == best_score
@@ -0,0 +1,32 @@
+import os
+
+from generate_roster import write_workspace
+from journal import load_checkpoint
+from service import Workspace
+from weekly import read_weeks
+
+
+def test_weekly_record_follows_the_journaled_history(tmp_path):
+    workdir = str(tmp_path)
+    write_workspace(workdir, 30, seed=4, num_weeks=5)
+    workspace = Workspace(workdir)
+    try:
+        workspace.schedule()
+        workspace.schedule()
+        workspace.writer.flush()
+
+        # A record lost between weeks is rebuilt from the history on the writer thread
+        os.remove(workspace.csv_file)
+        week = workspace.schedule()["week"]
+        person, old = next(iter(workspace.checkpoint["weekly_history"]["1"].items()))
+        new = next(c for c in workspace.config["cleanup_types"] if c != old)
+        workspace.reassign([(person, 1, new)])
+        workspace.writer.flush()
+
+        history = workspace.checkpoint["weekly_history"]
+        assert week == 3
+        assert history["1"][person] == new
+        assert read_weeks(workspace.csv_file) == history
+        assert load_checkpoint(workspace.checkpoint_file)["weekly_history"] == history
+    finally:
+        workspace.writer.close()
@@ -0,0 +1,77 @@
+import argparse
+import csv
+import os
+
+WEEKLY_CSV_FILE = "weekly_assignments.csv"      # canonical record, one row per assignment
+WEEKLY_EXCEL_FILE = "weekly_assignments.xlsx"   # pivoted view, written on demand
+FIELDS = ["week", "name", "cleanup"]
+
+
+# ---------------------------
+# Appendable weekly record
+# ---------------------------
+def append_week(week, assignments, csv_file=WEEKLY_CSV_FILE, weekly_history=None):
+    """
+    Append one scheduled week (person -> cleanup): O(people), whatever the week number.
+
+    weekly_history: the checkpoint's history; when the record does not exist
+    yet (a workspace scheduled before it was kept), the weeks before `week`
+    are written first so the record never starts mid-semester.
+    """
+    write_header = not os.path.exists(csv_file) or os.path.getsize(csv_file) == 0
+    if write_header and weekly_history:
+        earlier = {wk: a for wk, a in weekly_history.items() if int(wk) < int(week)}
+        if earlier:
+            write_weeks(earlier, csv_file)
+            write_header = False
+    with open(csv_file, "a", newline="") as f:
+        writer = csv.writer(f)
+        if write_header:
+            writer.writerow(FIELDS)
+        writer.writerows((int(week), person, cleanup) for person, cleanup in assignments.items())
+
+
+def write_weeks(weekly_history, csv_file=WEEKLY_CSV_FILE):
+    """
+    Rewrite the whole record (after a reassignment, rollback or removal).
+    """
+    tmp_file = csv_file + ".tmp"
+    with open(tmp_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        for wk in sorted(weekly_history, key=int):
+            writer.writerows((int(wk), person, cleanup) for person, cleanup in weekly_history[wk].items())
+    os.replace(tmp_file, csv_file)
+
+
+def read_weeks(csv_file=WEEKLY_CSV_FILE):
+    """
+    Returns weekly_history as in checkpoint.json: {"week": {person: cleanup}}.
+    """
+    weekly_history = {}
+    with open(csv_file, "r", newline="") as f:
+        for row in csv.DictReader(f):
+            weekly_history.setdefault(str(int(row["week"])), {})[row["name"]] = row["cleanup"]
+    return weekly_history
+
+
+def main():
+    # schedule.py imports this module, so its helpers are imported here
+    from schedule import save_weekly_excel
+
+    parser = argparse.ArgumentParser(description=f"Write the pivoted {WEEKLY_EXCEL_FILE} from {WEEKLY_CSV_FILE}.")
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("--csv", default=WEEKLY_CSV_FILE)
+    parser.add_argument("--output", default=WEEKLY_EXCEL_FILE)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.csv):
+        raise RuntimeError(f"❌ {args.csv} not found. Schedule a week first.")
+
+    weekly_history = read_weeks(args.csv)
+    save_weekly_excel({"weekly_history": weekly_history}, args.output)
+    print(f"✅ {len(weekly_history)} weeks exported to {args.output}")
+
+
+if __name__ == "__main__":
+    main()